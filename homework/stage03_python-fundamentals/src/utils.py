@@ -1,6 +1,7 @@
 # src/utils.py
 from pathlib import Path
 import pandas as pd
+from pandas.api.typing import DataFrameGroupBy
 import matplotlib.pyplot as plt
 
 def ensure_dir(path):
@@ -10,11 +11,50 @@ def get_summary_stats(df: pd.DataFrame) -> pd.DataFrame:
     """Return numeric summary stats (count, mean, std, min, quartiles, max)."""
     return df.describe(numeric_only=True)
 
-def groupby_mean(df: pd.DataFrame, by: str) -> pd.DataFrame:
-    """Group by a categorical column and compute mean of numeric columns."""
-    if by not in df.columns:
-        raise KeyError(f"Column '{by}' not in DataFrame")
-    return df.groupby(by).mean(numeric_only=True).reset_index()
+def make_groups(df: pd.DataFrame, by):
+    """Factorize the group key(s) once; pass the result as `by` / `keys` to grouped_stats / groupby_mean."""
+    keys = [by] if isinstance(by, str) else list(by)
+    missing = [k for k in keys if k not in df.columns]
+    if missing:
+        raise KeyError(f"Column(s) {missing} not in DataFrame")
+    return df.groupby(keys, sort=True, observed=True)
+
+def _quantile_name(q: float) -> str:
+    return f"p{q * 100:g}".replace(".", "_")
+
+def grouped_stats(df: pd.DataFrame, by, cols=None, stats=("count", "mean", "std", "min", "max"),
+                  quantiles=()) -> pd.DataFrame:
+    """
+    One row per group (sorted by key) with <col>_<stat> and <col>_p<q> columns (p2_5 for
+    2.5%), named as in the project's grouped_stats. `by` is a column name, a list of them,
+    or a make_groups() result to reuse.
+
+    A plain pandas version of the project API: one groupby-agg pass, plus one quantile
+    pass when `quantiles` are given, with no memory budget.
+    """
+    groups = by if isinstance(by, DataFrameGroupBy) else make_groups(df, by)
+    if len(groups.obj) != len(df):
+        raise ValueError(f"groups were built for {len(groups.obj)} rows, frame has {len(df)}")
+    keys = [groups.keys] if isinstance(groups.keys, str) else list(groups.keys)
+    if cols is None:
+        cols = df.select_dtypes("number").columns
+    cols = [c for c in cols if c not in keys]
+    g = groups[cols]
+    out = g.agg(list(stats))
+    out.columns = [f"{c}_{s}" for c, s in out.columns]
+    if quantiles:
+        q = g.quantile(list(quantiles)).unstack()
+        q.columns = [f"{c}_{_quantile_name(v)}" for c, v in q.columns]
+        out = out.join(q)
+    return out.reset_index()
+
+def groupby_mean(df: pd.DataFrame, by: str, cols=None, keys=None) -> pd.DataFrame:
+    """Group by a categorical column and compute mean of numeric (or selected) columns.
+    Pass `keys=make_groups(df, by)` to reuse the grouping across calls."""
+    if cols is None:
+        cols = [c for c in df.select_dtypes("number").columns if c != by]
+    out = grouped_stats(df, keys if keys is not None else by, cols, stats=("mean",))
+    return out.rename(columns={f"{c}_mean": c for c in cols})
 
 def save_table(df: pd.DataFrame, out_csv, out_json=None) -> None:
     """Save DataFrame to CSV (and optionally JSON)."""
@@ -122,4 +122,173 @@ def normalize_data(
         else:
             raise ValueError("method must be 'minmax' or 'zscore'")
 
-    return target
\ No newline at end of file
+    return target
+
+class CleaningPipeline:
+    """
+    Fused version of the drop / fill / normalize chain used in the notebooks.
+
+    Steps, in order (each optional):
+
+    1. drop columns whose non-null fraction is below `col_threshold`
+    2. fill numeric NaNs with the column median
+    3. drop rows whose non-null fraction is below `row_threshold`
+    4. scale `scale_cols` with 'minmax' or 'zscore'
+
+    ``fit`` learns the kept columns, medians and scaling statistics with NumPy
+    reductions over the contiguous columns of one float block (no per-step frame
+    copies). ``transform`` applies them to any frame with one copy of the numeric
+    block, which is filled and scaled in place.
+    ``fit_transform(df)`` gives the same result as chaining the functions above.
+
+    Parameters
+    ----------
+    col_threshold : float | None
+        Minimum non-null fraction to keep a column (as ``drop_missing(axis='columns')``).
+    fill : {'median', None}
+        Imputation for numeric columns.
+    row_threshold : float | None
+        Minimum non-null fraction to keep a row, counted after filling.
+    scale : {'minmax', 'zscore', None}
+    scale_cols : list[str] | None
+        Columns to scale. If None, all numeric columns.
+    """
+
+    def __init__(
+        self,
+        col_threshold: Optional[float] = None,
+        fill: Optional[str] = "median",
+        row_threshold: Optional[float] = None,
+        scale: Optional[str] = None,
+        scale_cols: Optional[Sequence[str]] = None,
+    ):
+        for t in (col_threshold, row_threshold):
+            if t is not None and not 0.0 <= t <= 1.0:
+                raise ValueError("threshold must be between 0 and 1")
+        if fill not in (None, "median"):
+            raise ValueError("fill must be 'median' or None")
+        if scale not in (None, "minmax", "zscore"):
+            raise ValueError("method must be 'minmax' or 'zscore'")
+        self.col_threshold, self.fill, self.row_threshold = col_threshold, fill, row_threshold
+        self.scale, self.scale_cols = scale, scale_cols
+
+    def fit(self, df: pd.DataFrame) -> "CleaningPipeline":
+        self._fit(df)
+        return self
+
+    def fit_transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        return self._assemble(df, *self._fit(df))
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Apply the fitted steps to `df` (e.g. new rows at serving time)."""
+        if not hasattr(self, "columns_"):
+            raise RuntimeError("CleaningPipeline is not fitted")
+        block, had_nan = self._fill(df)
+        keep = self._row_mask(df, block)
+        if keep is not None:
+            block = block[keep]
+        self._scale(block)
+        return self._assemble(df, block, had_nan, keep)
+
+    # ---------- internals ----------
+    def _fit(self, df: pd.DataFrame):
+        cols = df.columns
+        if self.col_threshold is not None:
+            nonnull = df.notna().to_numpy().sum(axis=0)
+            cols = cols[nonnull >= int(np.ceil(self.col_threshold * len(df)))]
+        self.columns_ = list(cols)
+        # from the dtypes only: df[cols].select_dtypes() would copy the frame
+        self.numeric_ = [c for c in self.columns_ if pd.api.types.is_numeric_dtype(df[c])
+                         and not pd.api.types.is_bool_dtype(df[c])]
+
+        block = self._block(df)
+        had_nan = np.isnan(block)
+        self.medians_ = np.full(block.shape[1], np.nan)
+        if self.fill == "median" and block.size:
+            cols_nan = had_nan.any(axis=0)
+            # one contiguous column at a time keeps the temporaries to a single column
+            for j in range(block.shape[1]):
+                col = block[:, j]
+                if not cols_nan[j]:
+                    self.medians_[j] = np.median(col)
+                elif not had_nan[:, j].all():
+                    self.medians_[j] = np.median(col[~had_nan[:, j]])
+            np.copyto(block, self.medians_, where=had_nan)
+
+        keep = self._row_mask(df, block)
+        if keep is not None:
+            block = block[keep]
+
+        self.center_ = np.zeros(block.shape[1])
+        self.scale_ = np.ones(block.shape[1])
+        self.scaled_ = np.zeros(block.shape[1], dtype=bool)
+        if self.scale is not None and block.shape[0]:
+            sel = self.numeric_ if self.scale_cols is None else set(self.scale_cols)
+            want = np.array([c in sel for c in self.numeric_], dtype=bool)
+            center = np.full(block.shape[1], np.nan)
+            scale = np.full(block.shape[1], np.nan)
+            for j in np.flatnonzero(want):
+                col = block[:, j]
+                if self.fill is None or np.isnan(self.medians_[j]):
+                    col = col[~np.isnan(col)]
+                if not len(col):
+                    continue
+                if self.scale == "minmax":
+                    center[j] = col.min()
+                    scale[j] = col.max() - center[j]
+                else:
+                    center[j] = col.mean()
+                    scale[j] = col.std()
+            # constant or all-NaN columns are left unscaled, as in normalize_data
+            ok = want & np.isfinite(scale) & (scale != 0)
+            self.center_[ok], self.scale_[ok], self.scaled_ = center[ok], scale[ok], ok
+        self._scale(block)
+        return block, had_nan if keep is None else had_nan[keep], keep
+
+    def _block(self, df: pd.DataFrame) -> np.ndarray:
+        # column by column into one Fortran-ordered array: a single copy of the data
+        block = np.empty((len(df), len(self.numeric_)), dtype=np.float64, order="F")
+        for j, c in enumerate(self.numeric_):
+            block[:, j] = df[c].to_numpy(dtype=np.float64, na_value=np.nan)
+        return block
+
+    def _fill(self, df: pd.DataFrame):
+        block = self._block(df)
+        had_nan = np.isnan(block)
+        if self.fill == "median":
+            np.copyto(block, self.medians_, where=had_nan)
+        return block, had_nan
+
+    def _row_mask(self, df: pd.DataFrame, block: np.ndarray) -> Optional[np.ndarray]:
+        if self.row_threshold is None:
+            return None
+        other = [c for c in self.columns_ if c not in set(self.numeric_)]
+        nonnull = (~np.isnan(block)).sum(axis=1)
+        if other:
+            nonnull += df[other].notna().to_numpy().sum(axis=1)
+        keep = nonnull >= int(np.ceil(self.row_threshold * len(self.columns_)))
+        return None if keep.all() else keep
+
+    def _scale(self, block: np.ndarray) -> None:
+        if self.scaled_.any():
+            idx = np.flatnonzero(self.scaled_)
+            if len(idx) == block.shape[1]:
+                block -= self.center_
+                block /= self.scale_
+            else:
+                block[:, idx] -= self.center_[idx]
+                block[:, idx] /= self.scale_[idx]
+
+    def _assemble(self, df: pd.DataFrame, block: np.ndarray, had_nan: np.ndarray,
+                  keep: Optional[np.ndarray]) -> pd.DataFrame:
+        index = df.index if keep is None else df.index[keep]
+        touched = had_nan.any(axis=0) | self.scaled_
+        original = lambda c: df[c] if keep is None else df[c][keep]
+        if len(self.numeric_) == len(self.columns_) and touched.all():
+            # wrap the block without another copy
+            return pd.DataFrame(block, index=index, columns=self.numeric_, copy=False)
+        pos = {c: j for j, c in enumerate(self.numeric_)}
+        # untouched numeric columns (e.g. ints without NaN) keep their original dtype
+        data = {c: block[:, pos[c]] if c in pos and touched[pos[c]] else original(c)
+                for c in self.columns_}
+        return pd.DataFrame(data, index=index)
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.outliers import (OnlineIQR, OnlineZScore, OutlierScreen, P2Quantile, RollingIQR,
+                          detect_outliers_grouped, detect_outliers_iqr, rolling_iqr_outliers,
+                          rolling_zscore_outliers)
+
+
+def _frame(n=24 * 60, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "location": np.where(rng.random(n) < 0.5, "a", "b"),
+        "time": pd.date_range("2024-01-01", periods=n, freq="h"),
+        "temp": rng.normal(10.0, 2.0, n),
+    })
+    df.loc[[5, 500], "temp"] = [60.0, -40.0]
+    return df
+
+
+@pytest.mark.parametrize("method", ["iqr", "zscore"])
+def test_grouped_missing_keys_are_not_flagged(method):
+    df = _frame()
+    df.loc[[10, 11], "location"] = np.nan
+    df.loc[12, "time"] = pd.NaT
+    out = detect_outliers_grouped(df, "temp", method=method)
+    assert out.index.equals(df.index)
+    assert not out[[10, 11, 12]].any()
+    assert out[[5, 500]].all()
+
+
+def test_grouped_iqr_matches_per_group_iqr():
+    df = _frame()
+    out = detect_outliers_grouped(df, "temp", method="iqr")
+    month = df["time"].dt.month
+    expected = df.groupby([df["location"], month])["temp"].transform(
+        lambda s: detect_outliers_iqr(s).astype(bool))
+    pd.testing.assert_series_equal(out, expected.astype(bool), check_names=False)
+
+
+def _heavy(n=5000, nan_rate=0.05, seed=1):
+    rng = np.random.default_rng(seed)
+    x = rng.standard_t(3, n)
+    x[rng.random(n) < nan_rate] = np.nan
+    return x
+
+
+def _stream(detector, x):
+    return np.array([detector.update(v) for v in x])
+
+
+@pytest.mark.parametrize("nan_rate", [0.0, 0.05])
+def test_windowed_zscore_matches_rolling(nan_rate):
+    x = _heavy(nan_rate=nan_rate)
+    got = _stream(OnlineZScore(window=500), x)
+    want = rolling_zscore_outliers(pd.Series(x), window=500).to_numpy()
+    assert got.sum() > 0
+    np.testing.assert_array_equal(got, want)
+
+
+def test_unwindowed_zscore_matches_expanding():
+    x = _heavy()
+    got = _stream(OnlineZScore(), x)
+    v = pd.Series(x).dropna()
+    r = v.shift(1).expanding(min_periods=30)
+    mu, sigma = r.mean(), r.std(ddof=0)
+    want = np.zeros(len(x), dtype=bool)
+    want[~np.isnan(x)] = ((v - mu).abs() / sigma.where(sigma > 0) > 3.0).to_numpy()
+    np.testing.assert_array_equal(got, want)
+
+
+@pytest.mark.parametrize("nan_rate", [0.0, 0.05])
+def test_rolling_iqr_matches_vectorised(nan_rate):
+    x = _heavy(nan_rate=nan_rate)
+    got = _stream(RollingIQR(window=500), x)
+    want = rolling_iqr_outliers(pd.Series(x), window=500).to_numpy()
+    assert got.sum() > 0
+    np.testing.assert_array_equal(got, want)
+
+
+@pytest.mark.parametrize("p", [0.25, 0.5, 0.75, 0.95])
+def test_p2_quantile_close_to_exact(p):
+    x = np.random.default_rng(2).normal(size=20000)
+    est = P2Quantile(p)
+    for i, v in enumerate(x):
+        est.add(v)
+        if i < 4:  # exact until the five markers exist
+            assert est.value() == pytest.approx(np.quantile(x[:i + 1], p))
+    assert est.count == len(x)
+    assert est.value() == pytest.approx(np.quantile(x, p), abs=0.02)
+
+
+def test_online_iqr_agrees_with_exact_iqr():
+    x = np.random.default_rng(3).normal(size=20000)
+    x[::1000] = 8.0
+    got = _stream(OnlineIQR(), x)
+    v = pd.Series(x).shift(1).expanding(min_periods=30)
+    q1, q3 = v.quantile(0.25), v.quantile(0.75)
+    want = ((x < q1 - 1.5 * (q3 - q1)) | (x > q3 + 1.5 * (q3 - q1))).to_numpy()
+    assert got[::1000][1:].all()
+    assert (got != want).mean() < 0.005
+
+
+@pytest.mark.parametrize("factory", [OnlineZScore, RollingIQR, OnlineIQR])
+def test_screen_push_in_chunks_matches_one_push(factory):
+    df = _frame(n=24 * 120)
+    df.loc[df.sample(frac=0.03, random_state=0).index, "temp"] = np.nan
+    df.loc[2000, "temp"] = 60.0  # late enough for every detector to be warmed up
+    whole = OutlierScreen(factory).push(df, "temp")
+    screen = OutlierScreen(factory)
+    parts = [screen.push(df.iloc[i:i + 500], "temp") for i in range(0, len(df), 500)]
+    pd.testing.assert_series_equal(pd.concat(parts), whole)
+    assert whole[2000]
+
+    # one detector per (location, month), fed in row order
+    for (loc, month), g in df.groupby([df["location"], df["time"].dt.month]):
+        det = factory()
+        np.testing.assert_array_equal(whole[g.index].to_numpy(), _stream(det, g["temp"].to_numpy()))
@@ -0,0 +1 @@
+# Lets `pytest` run from this stage folder import the stage's `src` package.
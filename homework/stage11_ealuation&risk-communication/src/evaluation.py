@@ -1,5 +1,9 @@
 # src/evaluation.py
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
+import pandas as pd
 
 def mean_impute(a: np.ndarray) -> np.ndarray:
     m = np.nanmean(a)
@@ -13,25 +17,219 @@ def median_impute(a: np.ndarray) -> np.ndarray:
     out[np.isnan(out)] = m
     return out
 
-class SimpleLinReg:
-    def fit(self, X, y):
-        X1 = np.c_[np.ones(len(X)), X.ravel()]
-        beta = np.linalg.pinv(X1) @ y
-        self.intercept_, self.coef_ = float(beta[0]), np.array([float(beta[1])])
+class LinearRegression:
+    """
+    Least squares / ridge (alpha > 0, intercept not penalised) from accumulated
+    normal equations, so rows can arrive in chunks via partial_fit.
+
+    With `groups` (one label per row, e.g. location) every group gets its own model;
+    all groups are solved in one batched Cholesky and predict() is vectorised across
+    them. Sums are kept about a per-group shift (the mean of the first chunk seen),
+    which keeps X'X well conditioned for features far from zero.
+    """
+    def __init__(self, alpha=0.0, fit_intercept=True):
+        self.alpha, self.fit_intercept = alpha, fit_intercept
+        self.reset()
+
+    def reset(self):
+        self._index = {}  # group label -> row in the stacked sums
+        self._n, self._kx, self._ky = [], [], []
+        self._sx, self._sy, self._sxx, self._sxy = [], [], [], []
+        return self
+
+    def _slot(self, g, X, y):
+        if g not in self._index:
+            p = X.shape[1]
+            self._index[g] = len(self._n)
+            kx = X.mean(axis=0) if self.fit_intercept else np.zeros(p)
+            ky = float(y.mean()) if self.fit_intercept else 0.0
+            self._n.append(0); self._kx.append(kx); self._ky.append(ky)
+            self._sx.append(np.zeros(p)); self._sy.append(0.0)
+            self._sxx.append(np.zeros((p, p))); self._sxy.append(np.zeros(p))
+        return self._index[g]
+
+    def _accumulate(self, X, y, groups, sign):
+        X = np.asarray(X, dtype=np.float64)
+        X = X.reshape(len(X), -1)
+        y = np.asarray(y, dtype=np.float64).ravel()
+        if groups is None:
+            parts = [(None, X, y)]
+        else:
+            codes, labels = _factorize(groups)
+            order = np.argsort(codes, kind="stable")
+            bounds = np.flatnonzero(np.diff(codes[order])) + 1
+            parts = [(labels[codes[ix[0]]], X[ix], y[ix]) for ix in np.split(order, bounds) if len(ix)]
+        for g, Xg, yg in parts:
+            i = self._slot(g, Xg, yg)
+            Xc, yc = Xg - self._kx[i], yg - self._ky[i]
+            self._n[i] += sign * len(yg)
+            self._sx[i] += sign * Xc.sum(axis=0)
+            self._sy[i] += sign * yc.sum()
+            self._sxx[i] += sign * (Xc.T @ Xc)
+            self._sxy[i] += sign * (Xc.T @ yc)
+            if self._n[i] == 0:
+                # every row taken out again: clear the rounding residue of add-then-subtract
+                self._sx[i][:] = 0.0; self._sy[i] = 0.0
+                self._sxx[i][:] = 0.0; self._sxy[i][:] = 0.0
+
+    def update(self, X, y, groups=None, remove=False):
+        """Add rows to the sums (or take earlier rows out, with `remove`) without solving.
+        Batch several updates, then call solve() once."""
+        self._accumulate(X, y, groups, -1 if remove else 1)
+        return self
+
+    def partial_fit(self, X, y, groups=None):
+        return self.update(X, y, groups).solve()
+
+    def forget(self, X, y, groups=None):
+        """Remove rows added earlier (sliding windows); the inverse of partial_fit."""
+        return self.update(X, y, groups, remove=True).solve()
+
+    def fit(self, X, y, groups=None):
+        return self.reset().partial_fit(X, y, groups)
+
+    def solve(self):
+        """Solve every group that currently holds rows. Groups whose rows have all been
+        removed (e.g. a site that left a sliding window) stay unfitted: coef_ and
+        intercept_ are NaN for them, so predict() returns NaN."""
+        n = np.asarray(self._n, dtype=np.float64)
+        fitted = n > 0
+        if not fitted.any():
+            raise ValueError("no rows to solve: add rows with update() or partial_fit() first")
+        kx, ky = np.asarray(self._kx)[fitted], np.asarray(self._ky)[fitted]
+        sxx, sxy = np.asarray(self._sxx)[fitted], np.asarray(self._sxy)[fitted]
+        nf = n[fitted]
+        if self.fit_intercept:
+            mx = np.asarray(self._sx)[fitted] / nf[:, None]
+            my = np.asarray(self._sy)[fitted] / nf
+            sxx = sxx - nf[:, None, None] * mx[:, :, None] * mx[:, None, :]
+            sxy = sxy - nf[:, None] * mx * my[:, None]
+        else:
+            mx, my = np.zeros_like(kx), np.zeros_like(ky)
+        A = sxx + self.alpha * np.eye(sxx.shape[-1])
+        try:
+            L = np.linalg.cholesky(A)
+            d = np.diagonal(L, axis1=-2, axis2=-1) ** 2
+            if (d <= 1e-12 * np.diagonal(A, axis1=-2, axis2=-1).max(axis=-1, keepdims=True)).any():
+                raise np.linalg.LinAlgError("numerically singular")
+            z = np.linalg.solve(L, sxy[..., None])
+            beta = np.linalg.solve(np.swapaxes(L, -1, -2), z)[..., 0]
+        except np.linalg.LinAlgError:
+            # singular for some group (collinear features, alpha=0): minimum-norm solve per group
+            beta = np.stack([np.linalg.lstsq(a, b, rcond=None)[0] for a, b in zip(A, sxy)])
+        coef = np.full((len(n), beta.shape[-1]), np.nan)
+        intercept = np.full(len(n), np.nan)
+        coef[fitted] = beta
+        intercept[fitted] = (ky + my) - np.einsum("gp,gp->g", kx + mx, beta)
+        self.groups_ = list(self._index)
+        self.fitted_ = fitted
+        if self.groups_ == [None]:
+            self.coef_, self.intercept_ = coef[0], float(intercept[0])
+        else:
+            self.coef_, self.intercept_ = coef, intercept
         return self
-    def predict(self, X):
-        return self.intercept_ + self.coef_[0] * X.ravel()
+
+    def predict(self, X, groups=None):
+        X = np.asarray(X, dtype=np.float64)
+        X = X.reshape(len(X), -1)
+        if groups is None:
+            return X @ self.coef_ + self.intercept_
+        codes, labels = _factorize(groups)
+        unseen = [g for g in labels if g not in self._index]
+        if unseen:
+            raise ValueError(f"no fitted model for group(s) {unseen[:5]}")
+        codes = np.array([self._index[g] for g in labels])[codes]
+        return np.einsum("np,np->n", X, self.coef_[codes]) + self.intercept_[codes]
+
+def _factorize(labels):
+    labels, codes = np.unique(np.asarray(labels), return_inverse=True)
+    return codes.ravel(), labels
+
+class SimpleLinReg(LinearRegression):
+    """Ordinary least squares (kept for the notebooks; now any number of features)."""
+    def __init__(self):
+        super().__init__(alpha=0.0)
 
 def mae(y_true, y_pred):
     return float(np.mean(np.abs(y_true - y_pred)))
 
-def bootstrap_metric(y_true, y_pred, fn, n_boot=500, seed=111, alpha=0.05):
+def rmse(y_true, y_pred):
+    return float(np.sqrt(np.mean((y_true - y_pred) ** 2)))
+
+def bias(y_true, y_pred):
+    return float(np.mean(y_pred - y_true))
+
+# metric -> (per-point term of e = y_pred - y_true, finaliser of the row mean).
+# The terms are computed once and gathered per resample; each row then reduces
+# exactly like the scalar metric on that resample (|a-b| == |b-a| bit for bit).
+BATCHED_METRICS = {
+    mae: (np.abs, None),
+    rmse: (np.square, np.sqrt),
+    bias: (None, None),
+}
+
+def bootstrap_indices(n, n_boot, seed=111, max_bytes=64 * 2**20):
+    """
+    Yield (block, n) resample index arrays, n_boot rows in total, each block within
+    roughly max_bytes (indices plus one gathered float column). Rows are the same
+    draws as n_boot calls to rng.choice(np.arange(n), size=n, replace=True).
+    """
     rng = np.random.default_rng(seed)
-    idx = np.arange(len(y_true))
-    stats = []
-    for _ in range(n_boot):
-        b = rng.choice(idx, size=len(idx), replace=True)
-        stats.append(fn(y_true[b], y_pred[b]))
+    block = int(min(n_boot, max(1, max_bytes // (16 * max(n, 1)))))
+    done = 0
+    while done < n_boot:
+        b = min(block, n_boot - done)
+        yield rng.integers(0, n, size=(b, n))
+        done += b
+
+_WORKER = {}
+
+def _pool_init(y_true, y_pred, fn):
+    _WORKER.update(y_true=y_true, y_pred=y_pred, fn=fn)
+
+def _pool_block(idx):
+    y_true, y_pred, fn = _WORKER["y_true"], _WORKER["y_pred"], _WORKER["fn"]
+    return [fn(y_true[b], y_pred[b]) for b in idx]
+
+def _picklable(fn):
+    try:
+        pickle.dumps(fn)
+        return True
+    except Exception:
+        return False
+
+def bootstrap_metric(y_true, y_pred, fn, n_boot=500, seed=111, alpha=0.05,
+                     max_bytes=64 * 2**20, workers=1):
+    y_true, y_pred = np.asarray(y_true), np.asarray(y_pred)
+    n = len(y_true)
+    blocks = bootstrap_indices(n, n_boot, seed, max_bytes)
+    if fn in BATCHED_METRICS:
+        term, finish = BATCHED_METRICS[fn]
+        u = y_pred - y_true
+        if term is not None:
+            u = term(u)
+        stats = np.concatenate([np.mean(u[idx], axis=1) for idx in blocks])
+        if finish is not None:
+            stats = finish(stats)
+    else:
+        # arbitrary metric: evaluate per resample. The process pool is opt-in (workers > 1, or
+        # None for all CPUs): on spawn platforms a metric defined in a notebook or __main__
+        # cannot be unpickled in the workers
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers > 1 and _picklable(fn):
+            stats, pending = [], []
+            with ProcessPoolExecutor(workers, initializer=_pool_init,
+                                     initargs=(y_true, y_pred, fn)) as ex:
+                # keep a few blocks in flight so index memory stays bounded; results stay in draw order
+                for idx in blocks:
+                    pending.append(ex.submit(_pool_block, idx))
+                    if len(pending) > 2 * workers:
+                        stats.extend(pending.pop(0).result())
+                for fut in pending:
+                    stats.extend(fut.result())
+        else:
+            stats = [fn(y_true[b], y_pred[b]) for idx in blocks for b in idx]
     lo, hi = np.percentile(stats, [100*alpha/2, 100*(1-alpha/2)])
     return {'mean': float(np.mean(stats)), 'lo': float(lo), 'hi': float(hi)}
 
@@ -39,4 +237,100 @@ def fit_fn(X, y):
     return SimpleLinReg().fit(X, y)
 
 def pred_fn(model, X):
-    return model.predict(X)
\ No newline at end of file
+    return model.predict(X)
+
+# ---------- Walk-forward backtest ----------
+def walk_forward_folds(n_periods, test_size, min_train, step=None, window=None, gap=0):
+    """
+    Time-ordered folds over periods 0..n_periods-1 as half-open position ranges
+    (train_lo, train_hi, test_lo, test_hi). Expanding train windows by default;
+    `window` makes them sliding. `gap` periods are left out between train and test.
+    """
+    step = step or test_size
+    folds = []
+    t = min_train + gap
+    while t + test_size <= n_periods:
+        hi = t - gap
+        lo = max(0, hi - window) if window else 0
+        folds.append((lo, hi, t, t + test_size))
+        t += step
+    return folds
+
+def _fold_init(X, y, fit, predict):
+    _WORKER.update(X=X, y=y, fit=fit, predict=predict)
+
+def _fold_run(rows):
+    (lo, hi), (tlo, thi) = rows
+    X, y = _WORKER["X"], _WORKER["y"]
+    model = _WORKER["fit"](X[lo:hi], y[lo:hi])
+    return _WORKER["predict"](model, X[tlo:thi])
+
+def backtest(df, features, target="target", date_col="date", group_col=None,
+             test_days=30, min_train_days=365, step_days=None, window_days=None, gap_days=0,
+             metrics=(mae, rmse, bias), alpha=0.0, fit=None, predict=None, workers=1):
+    """
+    Walk-forward evaluation over a processed feature table (one row per date, or per
+    date and `group_col`). Returns a tidy frame: one row per fold and metric.
+
+    By default the model is LinearRegression(alpha), one per group when group_col is
+    given. Its sums are updated between folds (rows entering the window are added,
+    rows leaving a sliding window removed), so each fold costs one small solve
+    instead of a refit. A group must have rows in some training window before it
+    shows up in a test fold. A group with no rows in the current window (a site that
+    stopped reporting) is not predicted for that fold.
+
+    Metrics skip test rows without a prediction (NaN); n_test counts the scored rows.
+
+    With `fit(X, y) -> model` and `predict(model, X)` any model can be used instead.
+    Each fold is then refitted from scratch, in-process by default. workers > 1 (or None
+    for all CPUs) opts in to a process pool; `fit`/`predict` must then be importable by
+    the workers, i.e. not defined in a notebook or __main__ on spawn platforms.
+    """
+    cols = [date_col, *features, target] + ([group_col] if group_col else [])
+    data = df[cols].dropna().sort_values(date_col, kind="stable")
+    X = data[features].to_numpy(np.float64)
+    y = data[target].to_numpy(np.float64)
+    g = data[group_col].to_numpy() if group_col else None
+    dates, first_row = np.unique(data[date_col].to_numpy(), return_index=True)
+    row_at = np.append(first_row, len(data))  # period p -> rows row_at[p]:row_at[p+1]
+
+    folds = walk_forward_folds(len(dates), test_days, min_train_days, step_days, window_days, gap_days)
+    spans = [((row_at[lo], row_at[hi]), (row_at[tlo], row_at[thi])) for lo, hi, tlo, thi in folds]
+
+    preds = []
+    if fit is None:
+        model = LinearRegression(alpha)
+        a = b = 0  # rows currently in the model: a:b
+        for (lo, hi), (tlo, thi) in spans:
+            if hi > b:
+                model.update(X[b:hi], y[b:hi], None if g is None else g[b:hi])
+            if lo > a:
+                model.update(X[a:lo], y[a:lo], None if g is None else g[a:lo], remove=True)
+            a, b = lo, hi
+            model.solve()
+            preds.append(model.predict(X[tlo:thi], None if g is None else g[tlo:thi]))
+    else:
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers > 1 and len(spans) > 1 and _picklable(fit) and _picklable(predict):
+            with ProcessPoolExecutor(min(workers, len(spans)), initializer=_fold_init,
+                                     initargs=(X, y, fit, predict)) as ex:
+                preds = list(ex.map(_fold_run, spans))
+        else:
+            _fold_init(X, y, fit, predict)
+            preds = [_fold_run(sp) for sp in spans]
+            _WORKER.clear()
+
+    rows = []
+    for k, ((lo, hi, tlo, thi), ((rlo, rhi), (tr0, tr1)), p) in enumerate(zip(folds, spans, preds)):
+        info = {"fold": k, "train_start": dates[lo], "train_end": dates[hi - 1],
+                "test_start": dates[tlo], "test_end": dates[thi - 1],
+                "n_train": int(rhi - rlo)}
+        p = np.asarray(p, dtype=np.float64)
+        scored = ~np.isnan(p)
+        yt, p = y[tr0:tr1][scored], p[scored]
+        info["n_test"] = len(p)
+        for fn in metrics:
+            rows.append({**info, "metric": fn.__name__, "value": fn(yt, p) if len(p) else np.nan})
+    return pd.DataFrame(rows, columns=["fold", "train_start", "train_end", "test_start", "test_end",
+                                       "n_train", "n_test", "metric", "value"])
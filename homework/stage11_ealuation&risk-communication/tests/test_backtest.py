@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.evaluation import LinearRegression, backtest, walk_forward_folds
+
+
+def _sites(days_a=400, days_b=100, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for name, days, slope in [("A", days_a, 2.0), ("B", days_b, -1.0)]:
+        x = rng.normal(size=days)
+        frames.append(pd.DataFrame({
+            "date": pd.date_range("2020-01-01", periods=days, freq="D"),
+            "g": name, "x": x, "target": slope * x + 3.0 + rng.normal(0, 0.1, days),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_predict_is_nan_for_group_with_no_rows_left():
+    df = _sites(200, 50)
+    X, y, g = df[["x"]].to_numpy(), df["target"].to_numpy(), df["g"].to_numpy()
+    b = g == "B"
+    model = LinearRegression().update(X, y, g).update(X[b], y[b], g[b], remove=True).solve()
+    assert model.fitted_.tolist() == [True, False]
+    p = model.predict(X, g)
+    assert np.isnan(p[b]).all() and np.isfinite(p[~b]).all()
+    ref = LinearRegression().fit(X[~b], y[~b])
+    np.testing.assert_allclose(p[~b], ref.predict(X[~b]), rtol=1e-9)
+
+
+def test_no_rows_at_all_still_raises():
+    model = LinearRegression().update(np.ones((3, 1)), np.ones(3))
+    model.update(np.ones((3, 1)), np.ones(3), remove=True)
+    with pytest.raises(ValueError):
+        model.solve()
+
+
+def test_sliding_backtest_with_group_leaving_the_window():
+    df = _sites()
+    kw = dict(features=["x"], group_col="g", test_days=30, min_train_days=60, window_days=60)
+    out = backtest(df, **kw)
+
+    # reference: refit every fold on the groups present in its training window
+    dates = np.sort(df["date"].unique())
+    folds = walk_forward_folds(len(dates), 30, 60, window=60)
+    assert out["fold"].nunique() == len(folds)
+    for k, (lo, hi, tlo, thi) in enumerate(folds):
+        train = df[(df["date"] >= dates[lo]) & (df["date"] <= dates[hi - 1])]
+        test = df[(df["date"] >= dates[tlo]) & (df["date"] <= dates[thi - 1])]
+        test = test[test["g"].isin(train["g"].unique())]
+        model = LinearRegression().fit(train[["x"]], train["target"], train["g"])
+        err = model.predict(test[["x"]], test["g"]) - test["target"].to_numpy()
+        got = out[out["fold"] == k].set_index("metric")
+        assert (got["n_test"] == len(test)).all()
+        assert got.loc["mae", "value"] == pytest.approx(np.abs(err).mean(), rel=1e-9)
+        assert got.loc["bias", "value"] == pytest.approx(err.mean(), rel=1e-9, abs=1e-12)
+    # B stops after day 100: later folds score site A only
+    assert (out.loc[out["test_start"] > dates[100], "n_test"] == 30).all()
@@ -0,0 +1 @@
+# Lets `pytest` run from this folder import the project's `src` package.
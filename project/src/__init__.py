@@ -1 +1,14 @@
-from .utils import *
\ No newline at end of file
+# Stage 03 helpers are re-exported lazily: `import src` (and every `python -m src.<module>`
+# run) no longer pays for pandas/matplotlib until a helper is actually used.
+_UTILS = (
+    "ensure_dir", "get_summary_stats", "groupby_mean", "save_table", "save_histogram",
+    "log_call", "calc_mean_std", "write_csv", "write_json_records", "histogram_counts",
+    "HistogramRenderer", "render_reports", "GroupKeys", "grouped_stats",
+)
+__all__ = list(_UTILS)
+
+def __getattr__(name):
+    if name in _UTILS:
+        from . import utils
+        return getattr(utils, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
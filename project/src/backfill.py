@@ -0,0 +1,282 @@
+# src/backfill.py
+"""
+Historical backfill from the Open-Meteo archive API into the raw store.
+
+The date range is cut into windows of `chunk_months` calendar months (so a request
+never spans more store partitions than needed). For every location the days
+already complete in the store are skipped; the remaining days of each window become
+runs, with gaps of up to `merge_gap` stored days fetched again rather than split
+into an extra request. Locations that need the same run are batched into one
+multi-coordinate request of at most `max_hours` location-hours.
+
+Chunks are fetched on a thread pool under a global request-rate limit, and results
+are written to the store by the main thread. Each written chunk is appended to a
+JSON-lines checkpoint, so an interrupted run resumes where it stopped:
+
+    python -m src backfill --locations locs.csv --start 2015-01-01 --end 2024-12-31 --workers 4 --rate 5
+    python -m src backfill ... --dry-run          # print the plan only
+
+Times are requested in GMT, matching the store's UTC keys. Point --url (or
+OPEN_METEO_ARCHIVE_URL) at `python -m src.bench.mock_api` to run it offline.
+"""
+from __future__ import annotations
+import argparse, hashlib, json, os, threading, time
+import datetime as dt
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Optional
+import pandas as pd
+
+from .http_cache import HTTP_CACHE, add_http_args, configure_http
+from .hourly_columns import hourly_frame
+from .ingest_open_meteo import _coord, load_locations, make_session
+from .paths import DATA, STORE
+from .profiling import PROFILER, add_profile_args, configure_from_args
+from .raw_store import RawStore, location_key
+
+ARCHIVE_URL = os.getenv("OPEN_METEO_ARCHIVE_URL", "https://archive-api.open-meteo.com/v1/archive")
+CHECKPOINTS = DATA / "backfill"
+MEASURES = ["temperature_2m", "precipitation"]
+ARCHIVE_LAG_DAYS = 5  # the reanalysis trails real time by a few days
+
+def fetch_archive(latitude, longitude, start: str, end: str, session=None, url: str = ARCHIVE_URL):
+    """Raw response body for one location or several, over the inclusive UTC date range."""
+    params = {
+        "latitude": _coord(latitude),
+        "longitude": _coord(longitude),
+        "start_date": start,
+        "end_date": end,
+        "hourly": MEASURES,
+        "timezone": "GMT",
+    }
+    return HTTP_CACHE.get(url, params, session=session, timeout=120)
+
+# ---------- Plan ----------
+def month_windows(start: dt.date, end: dt.date, chunk_months: int) -> list[tuple[dt.date, dt.date]]:
+    """Inclusive [w0, w1] windows of `chunk_months` calendar months covering start..end."""
+    out, w0 = [], start
+    while w0 <= end:
+        m = w0.year * 12 + w0.month - 1 + chunk_months
+        nxt = dt.date(m // 12, m % 12 + 1, 1)
+        w1 = min(nxt - dt.timedelta(days=1), end)
+        out.append((w0, w1))
+        w0 = nxt
+    return out
+
+def missing_runs(w0: dt.date, w1: dt.date, have: set[dt.date], merge_gap: int) -> list[tuple[dt.date, dt.date]]:
+    """Runs of days in [w0, w1] not in `have`; runs separated by <= merge_gap stored days are joined."""
+    runs: list[list[dt.date]] = []
+    d = w0
+    while d <= w1:
+        if d not in have:
+            if runs and (d - runs[-1][1]).days <= merge_gap + 1:
+                runs[-1][1] = d
+            else:
+                runs.append([d, d])
+        d += dt.timedelta(days=1)
+    return [(a, b) for a, b in runs]
+
+def plan(locations: pd.DataFrame, start: dt.date, end: dt.date, store: Optional[RawStore] = None,
+         chunk_months: int = 12, batch_size: int = 50, max_hours: int = 100_000, merge_gap: int = 7,
+         done: frozenset = frozenset()) -> list[dict]:
+    """
+    Chunks still to fetch, each {"id", "start", "end", "location", "latitude", "longitude",
+    "tasks", "hours"}. A task is one location's run ("<location>/<start>/<end>"); tasks in
+    `done` (from the checkpoint) are left out even when the archive returned nothing for them.
+    """
+    store = store or RawStore()
+    man = store.manifest()
+    windows = month_windows(start, end, chunk_months)
+    runs: dict[tuple[dt.date, dt.date], list[tuple[str, float, float]]] = {}
+    for loc, lat, lon in locations[["location", "latitude", "longitude"]].itertuples(index=False):
+        have = store.covered_days(loc, start, end, man)
+        for w0, w1 in windows:
+            for r in missing_runs(w0, w1, have, merge_gap):
+                if f"{loc}/{r[0]}/{r[1]}" not in done:
+                    runs.setdefault(r, []).append((loc, lat, lon))
+
+    chunks = []
+    for (r0, r1), members in sorted(runs.items()):
+        hours = ((r1 - r0).days + 1) * 24
+        size = max(1, min(batch_size, max_hours // hours))
+        for i in range(0, len(members), size):
+            part = members[i:i + size]
+            names = [m[0] for m in part]
+            chunks.append({
+                "id": f"{r0}/{r1}/{i // size}",
+                "start": r0.isoformat(),
+                "end": r1.isoformat(),
+                "location": names,
+                "latitude": [m[1] for m in part],
+                "longitude": [m[2] for m in part],
+                "tasks": [f"{n}/{r0}/{r1}" for n in names],
+                "hours": hours * len(part),
+            })
+    return chunks
+
+# ---------- Checkpoint ----------
+class Checkpoint:
+    """Append-only JSON lines of finished chunks; `done` is the set of their tasks."""
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self.done: set[str] = set()
+        if self.path.exists():
+            with open(self.path) as fh:
+                for line in fh:
+                    try:
+                        self.done.update(json.loads(line)["tasks"])
+                    except (ValueError, KeyError):
+                        continue  # torn last line after a crash
+
+    def mark(self, chunk: dict, rows: int) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a") as fh:
+            fh.write(json.dumps({"id": chunk["id"], "tasks": chunk["tasks"], "rows": rows,
+                                 "ts": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds")}) + "\n")
+        self.done.update(chunk["tasks"])
+
+def checkpoint_path(locations: pd.DataFrame, start: dt.date, end: dt.date, url: str) -> Path:
+    key = json.dumps([sorted(locations["location"].astype(str)), str(start), str(end), url])
+    return CHECKPOINTS / f"backfill_{hashlib.sha256(key.encode()).hexdigest()[:16]}.jsonl"
+
+# ---------- Execute ----------
+class RateLimiter:
+    """Spaces request starts at least 1/rate seconds apart across threads (rate <= 0: unlimited)."""
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            at = max(now, self._next)
+            self._next = at + self.interval
+        if at > now:
+            time.sleep(at - now)
+
+def _parse(chunk: dict, body: bytes) -> pd.DataFrame:
+    # multi-year archives: decoded straight into preallocated columns (see hourly_columns)
+    df = hourly_frame(body, MEASURES, locations=chunk["location"])
+    return df.dropna(subset=MEASURES, how="all")  # hours the archive has not published yet
+
+def execute(chunks: list[dict], checkpoint: Checkpoint, store: Optional[RawStore] = None,
+            url: str = ARCHIVE_URL, workers: int = 4, rate: float = 5.0, retries: int = 5,
+            progress: bool = True) -> dict:
+    """Fetch chunks concurrently; upsert and checkpoint each one as it completes."""
+    store = store or RawStore()
+    session = make_session(pool_size=workers, retries=retries)
+    limiter = RateLimiter(rate)
+
+    def _one(chunk: dict) -> pd.DataFrame:
+        limiter.wait()
+        body = fetch_archive(chunk["latitude"], chunk["longitude"], chunk["start"], chunk["end"],
+                             session=session, url=url)
+        return _parse(chunk, body)
+
+    stats = {"chunks": len(chunks), "done": 0, "failed": 0, "rows": 0, "rows_written": 0}
+    t0 = last = time.perf_counter()
+    todo = iter(chunks)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            # a bounded number of chunks in flight keeps finished frames from piling up
+            pending = {ex.submit(_one, c): c for c in (next(todo, None) for _ in range(2 * workers)) if c}
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    chunk = pending.pop(fut)
+                    nxt = next(todo, None)
+                    if nxt is not None:
+                        pending[ex.submit(_one, nxt)] = nxt
+                    try:
+                        df = fut.result()
+                    except Exception as e:  # one bad chunk should not stop the backfill
+                        stats["failed"] += 1
+                        print(f"[backfill] chunk {chunk['id']} failed: {e}")
+                        continue
+                    with PROFILER.stage("write", rows_in=len(df)) as st:
+                        up = store.upsert(df)
+                        st.rows_out = up["rows_written"]
+                    checkpoint.mark(chunk, len(df))
+                    stats["done"] += 1
+                    stats["rows"] += len(df)
+                    stats["rows_written"] += up["rows_written"]
+
+                    now = time.perf_counter()
+                    if progress and (now - last >= 1.0 or not pending):
+                        last = now
+                        n = stats["done"] + stats["failed"]
+                        eta = (now - t0) / n * (len(chunks) - n)
+                        print(f"[backfill] {n}/{len(chunks)} chunks  {stats['rows']:,} rows  "
+                              f"{stats['rows'] / (now - t0):,.0f} rows/s  eta {eta:.0f}s")
+    finally:
+        session.close()
+    stats["wall_s"] = round(time.perf_counter() - t0, 3)
+    stats["rows_per_s"] = round(stats["rows"] / stats["wall_s"]) if stats["wall_s"] > 0 else None
+    return stats
+
+def main():
+    ap = argparse.ArgumentParser(description="Backfill hourly history from the Open-Meteo archive into the raw store.")
+    ap.add_argument("--locations", type=str, default=None, help="CSV of locations (location, latitude, longitude).")
+    ap.add_argument("--lat", type=float, default=float(os.getenv("LAT", "40.7128")))
+    ap.add_argument("--lon", type=float, default=float(os.getenv("LON", "-74.0060")))
+    ap.add_argument("--start", type=dt.date.fromisoformat, required=True, help="First day (YYYY-MM-DD, UTC).")
+    ap.add_argument("--end", type=dt.date.fromisoformat, default=None,
+                    help=f"Last day, inclusive (default: {ARCHIVE_LAG_DAYS} days ago).")
+    ap.add_argument("--chunk-months", type=int, default=12, help="Calendar months per request window.")
+    ap.add_argument("--batch-size", type=int, default=50, help="Max coordinates per request.")
+    ap.add_argument("--max-hours", type=int, default=100_000, help="Max location-hours per request.")
+    ap.add_argument("--merge-gap", type=int, default=7, help="Refetch up to this many stored days to avoid a split.")
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--rate", type=float, default=5.0, help="Max requests started per second (0: unlimited).")
+    ap.add_argument("--retries", type=int, default=5, help="Retries on 429/5xx with exponential backoff.")
+    ap.add_argument("--url", type=str, default=ARCHIVE_URL, help="Archive endpoint (e.g. a local mock server).")
+    ap.add_argument("--store", type=str, default=str(STORE))
+    ap.add_argument("--checkpoint", type=str, default=None, help="Checkpoint file (default: derived from the plan).")
+    ap.add_argument("--fresh", action="store_true", help="Ignore an existing checkpoint.")
+    ap.add_argument("--dry-run", action="store_true", help="Print the plan and exit.")
+    add_http_args(ap)
+    add_profile_args(ap)
+    args = ap.parse_args()
+    configure_http(args)
+    configure_from_args(args)
+
+    if args.locations:
+        locs = load_locations(args.locations)
+    else:
+        locs = pd.DataFrame({"location": [location_key(args.lat, args.lon)],
+                             "latitude": [args.lat], "longitude": [args.lon]})
+    end = args.end or dt.date.today() - dt.timedelta(days=ARCHIVE_LAG_DAYS)
+    if end < args.start:
+        raise SystemExit(f"--end {end} is before --start {args.start}")
+
+    store = RawStore(args.store)
+    ck_path = Path(args.checkpoint) if args.checkpoint else checkpoint_path(locs, args.start, end, args.url)
+    if args.fresh and ck_path.exists() and not args.dry_run:
+        ck_path.unlink()
+    ck = Checkpoint(ck_path)
+    with PROFILER.stage("plan", rows_in=len(locs)) as st:
+        chunks = plan(locs, args.start, end, store, args.chunk_months, args.batch_size,
+                      args.max_hours, args.merge_gap, frozenset(ck.done))
+        st.rows_out = len(chunks)
+    hours = sum(c["hours"] for c in chunks)
+    print(f"[backfill] {len(locs)} location(s) {args.start}..{end}: {len(chunks)} request(s), "
+          f"{hours:,} location-hours to fetch ({len(ck.done)} task(s) already checkpointed)")
+    if args.dry_run:
+        for c in chunks:
+            print(f"  {c['start']}..{c['end']}  {len(c['location']):3d} location(s)  {c['hours']:8,} h")
+        return
+    if not chunks:
+        return
+
+    print(f"[backfill] checkpoint → {ck_path}")
+    stats = execute(chunks, ck, store, args.url, args.workers, args.rate, args.retries)
+    print(f"[backfill] {stats['done']}/{stats['chunks']} chunks, {stats['rows']:,} rows "
+          f"({stats['rows_written']:,} written) in {stats['wall_s']:.1f}s, {stats['rows_per_s'] or 0:,} rows/s")
+    print(HTTP_CACHE.summary())
+    PROFILER.report()
+    if stats["failed"]:
+        raise SystemExit(f"[backfill] {stats['failed']} chunk(s) failed; rerun to resume")
+
+if __name__ == "__main__":
+    main()
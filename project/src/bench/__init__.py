@@ -0,0 +1,13 @@
+"""Benchmarks for the project pipeline (run as `python -m src.bench.<name>`)."""
+from __future__ import annotations
+import time, tracemalloc
+
+def measure(fn, *args, **kwargs) -> tuple[object, float, float]:
+    """Run fn once; return (result, wall seconds, peak traced MiB)."""
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    wall = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return out, wall, peak
@@ -0,0 +1,62 @@
+# src/bench/cleaning.py
+"""
+Cleaning benchmark: stage06 `CleaningPipeline` (fused fit/transform) vs chaining
+drop_missing -> fill_missing_median -> drop_missing -> normalize_data as the
+notebook does. Checks both give the same frame.
+
+    python -m src.bench.cleaning --rows 5000000 --cols 50
+"""
+from __future__ import annotations
+import argparse, gc
+import numpy as np
+import pandas as pd
+
+from . import measure
+from .suite import _homework
+
+def wide_frame(rows: int, cols: int, missing_rate: float, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    data = {}
+    for j in range(cols):
+        x = rng.normal(10.0 * j, 1.0 + j, rows)
+        x[rng.random(rows) < missing_rate] = np.nan
+        data[f"x{j:02d}"] = x
+    data[f"x{cols - 1:02d}"][rng.random(rows) < 0.8] = np.nan  # one mostly-missing column
+    return pd.DataFrame(data)
+
+def chained(cl, df: pd.DataFrame, method: str) -> pd.DataFrame:
+    out = cl.drop_missing(df, threshold=0.6, axis="columns")
+    out = cl.fill_missing_median(out, cols=None)
+    out = cl.drop_missing(out, threshold=1.0, axis="rows")
+    return cl.normalize_data(out, cols=list(out.columns), method=method)
+
+def fused(cl, df: pd.DataFrame, method: str) -> pd.DataFrame:
+    return cl.CleaningPipeline(col_threshold=0.6, row_threshold=1.0, scale=method).fit_transform(df)
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark fused cleaning vs the chained functions.")
+    ap.add_argument("--rows", type=int, default=5_000_000)
+    ap.add_argument("--cols", type=int, default=50)
+    ap.add_argument("--missing-rate", type=float, default=0.02)
+    ap.add_argument("--method", type=str, choices=["minmax", "zscore"], default="zscore")
+    ap.add_argument("--skip-check", action="store_true", help="Do not compare the two outputs.")
+    args = ap.parse_args()
+
+    cl = _homework("stage06_datapreprocessing", "cleaning")
+    df = wide_frame(args.rows, args.cols, args.missing_rate)
+    print(f"rows={args.rows:,}  cols={args.cols}  frame {df.memory_usage().sum() / 2**20:,.0f} MiB")
+
+    new, t_new, m_new = measure(fused, cl, df, args.method)
+    print(f"fused  : {t_new:7.2f} s   peak {m_new:9.1f} MiB")
+    if args.skip_check:
+        del new
+    gc.collect()
+    old, t_old, m_old = measure(chained, cl, df, args.method)
+    print(f"chained: {t_old:7.2f} s   peak {m_old:9.1f} MiB")
+    print(f"speedup: {t_old / t_new:.1f}x   peak memory {m_old / m_new:.1f}x lower")
+    if not args.skip_check:
+        pd.testing.assert_frame_equal(old, new, check_exact=False, rtol=1e-9)
+        print("outputs identical (rtol 1e-9)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# src/bench/daily_agg.py
+"""
+Daily aggregation benchmark: shared engine (`aggregate_daily`, one grouped pass over
+all locations) vs the previous per-location path (copy + four `resample("D")` calls).
+
+    python -m src.bench.daily_agg --locations 1000 --years 10
+"""
+from __future__ import annotations
+import argparse, json
+import pandas as pd
+
+from ..features_weather import aggregate_daily
+from . import measure
+from .synth import hourly_weather
+
+def legacy_resample(df_hourly: pd.DataFrame, tz: str = "America/New_York") -> pd.DataFrame:
+    df = df_hourly.copy()
+    df["time"] = pd.to_datetime(df["time"], utc=True, errors="coerce")
+    df = df.dropna(subset=["time"]).set_index("time").sort_index()
+    if tz:
+        df = df.tz_convert(tz)
+    daily = pd.DataFrame({
+        "temp_max_c": df["temperature_2m"].resample("D").max(),
+        "temp_min_c": df["temperature_2m"].resample("D").min(),
+        "temp_mean_c": df["temperature_2m"].resample("D").mean(),
+        "precip_mm":  df["precipitation"].resample("D").sum(),
+    }).reset_index().rename(columns={"time": "date"})
+    daily["date"] = daily["date"].dt.tz_localize(None)
+    return daily
+
+def legacy_all(df: pd.DataFrame, tz: str) -> pd.DataFrame:
+    parts = [legacy_resample(g.drop(columns="location"), tz).assign(location=loc)
+             for loc, g in df.groupby("location", observed=True, sort=True)]
+    return pd.concat(parts, ignore_index=True)
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark daily aggregation engine vs legacy resample.")
+    ap.add_argument("--locations", type=int, default=1000)
+    ap.add_argument("--years", type=float, default=10.0)
+    ap.add_argument("--timezone", type=str, default="America/New_York")
+    ap.add_argument("--skip-legacy", action="store_true", help="Only time the engine.")
+    ap.add_argument("--json", type=str, default=None, help="Also write results to this JSON file.")
+    args = ap.parse_args()
+
+    df = hourly_weather(args.locations, args.years)
+    print(f"rows={len(df):,}  locations={args.locations}  years={args.years}")
+
+    results = {"rows": len(df), "locations": args.locations, "years": args.years}
+    new, t_new, m_new = measure(aggregate_daily, df, tz=args.timezone, by="location")
+    results["engine"] = {"seconds": round(t_new, 3), "peak_mib": round(m_new, 1)}
+    print(f"engine : {t_new:8.2f} s   peak {m_new:9.1f} MiB   {len(df) / t_new / 1e6:6.1f} M rows/s")
+
+    if not args.skip_legacy:
+        old, t_old, m_old = measure(legacy_all, df, args.timezone)
+        results["legacy"] = {"seconds": round(t_old, 3), "peak_mib": round(m_old, 1)}
+        results["speedup"] = round(t_old / t_new, 1)
+        print(f"legacy : {t_old:8.2f} s   peak {m_old:9.1f} MiB   {len(df) / t_old / 1e6:6.1f} M rows/s")
+        print(f"speedup: {t_old / t_new:.1f}x")
+        old = old[new.columns].sort_values(["location", "date"]).reset_index(drop=True)
+        pd.testing.assert_frame_equal(new.astype({"location": str}), old.astype({"location": str}),
+                                      check_freq=False, check_dtype=False)
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+if __name__ == "__main__":
+    main()
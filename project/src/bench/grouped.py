@@ -0,0 +1,71 @@
+# src/bench/grouped.py
+"""
+Grouped statistics benchmark: `utils.grouped_stats` with keys factorized once
+(`GroupKeys`) vs the pandas round trips it replaces (groupby-mean + reset/sort,
+and groupby-describe), per location and per location x month.
+
+    python -m src.bench.grouped --rows 100000000 --locations 500 --max-mib 256
+"""
+from __future__ import annotations
+import argparse, gc
+import numpy as np
+import pandas as pd
+
+from ..utils import GroupKeys, grouped_stats
+from . import measure
+
+def long_frame(rows: int, locations: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    names = pd.Index([f"site{i:04d}" for i in range(locations)])
+    loc = pd.Categorical.from_codes(rng.integers(0, locations, rows, dtype=np.int16), categories=names)
+    month = rng.integers(1, 13, rows, dtype=np.int8)
+    temp = rng.normal(12.0, 8.0, rows) + month
+    temp[rng.random(rows) < 0.01] = np.nan
+    precip = np.where(rng.random(rows) < 0.2, rng.gamma(0.6, 2.0, rows), 0.0)
+    return pd.DataFrame({"location": loc, "month": month, "temperature_2m": temp, "precipitation": precip})
+
+def pandas_stats(df: pd.DataFrame, by: list[str], cols: list[str]) -> pd.DataFrame:
+    g = df.groupby(by, observed=True)[cols]
+    means = g.mean().reset_index().sort_values(by)
+    desc = g.describe()
+    return means, desc
+
+def fused_stats(df: pd.DataFrame, keys: GroupKeys, cols: list[str], max_bytes: int) -> pd.DataFrame:
+    return grouped_stats(df, keys, cols, stats=("count", "mean", "std", "min", "max"),
+                         quantiles=(0.25, 0.5, 0.75), max_bytes=max_bytes)
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark grouped_stats vs pandas groupby mean + describe.")
+    ap.add_argument("--rows", type=int, default=20_000_000)
+    ap.add_argument("--locations", type=int, default=500)
+    ap.add_argument("--max-mib", type=int, default=256, help="Working-memory budget for grouped_stats.")
+    ap.add_argument("--skip-pandas", action="store_true")
+    args = ap.parse_args()
+
+    df = long_frame(args.rows, args.locations)
+    cols = ["temperature_2m", "precipitation"]
+    budget = args.max_mib * 2**20
+    print(f"rows={args.rows:,}  locations={args.locations}  frame {df.memory_usage().sum() / 2**20:,.0f} MiB")
+
+    for by in (["location"], ["location", "month"]):
+        label = " x ".join(by)
+        keys, t_keys, m_keys = measure(GroupKeys, df, by, budget)
+        new, t_new, m_new = measure(fused_stats, df, keys, cols, budget)
+        _, t_again, _ = measure(fused_stats, df, keys, cols, budget)
+        print(f"{label:18s} keys {t_keys:6.2f} s ({m_keys:7.1f} MiB) | stats {t_new:6.2f} s ({m_new:7.1f} MiB)"
+              f" | reused keys {t_again:6.2f} s  → {keys.ngroups:,} groups")
+        if args.skip_pandas:
+            continue
+        gc.collect()
+        (means, desc), t_old, m_old = measure(pandas_stats, df, by, cols)
+        print(f"{'':18s} pandas mean+describe {t_old:6.2f} s ({m_old:7.1f} MiB)  → {t_old / (t_keys + t_new):.1f}x")
+        for c in cols:
+            np.testing.assert_allclose(new[f"{c}_mean"], means[c], rtol=1e-9)
+            np.testing.assert_allclose(new[f"{c}_p50"], desc[(c, "50%")], rtol=1e-9)
+            np.testing.assert_allclose(new[f"{c}_std"], desc[(c, "std")], rtol=1e-7)
+        del means, desc
+        gc.collect()
+    print("results match pandas" if not args.skip_pandas else "")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# src/bench/importtime.py
+"""
+Import-time budget check for the `weather` CLI subcommands.
+
+Each command's module is imported in a fresh `python -X importtime` process. The
+check fails (exit 1) when the project's import cost is over budget, or when a heavy
+dependency the command should not need at startup gets loaded (matplotlib
+anywhere, requests before a fetch, pandas for the bare CLI).
+
+    python -m src.bench.importtime
+    python -m src.bench.importtime --scale 2 --json data/bench/importtime.json
+"""
+from __future__ import annotations
+import argparse, json, statistics, subprocess, sys
+
+from ..paths import ROOT
+
+HEAVY = ("numpy", "pandas", "pyarrow", "requests", "matplotlib")
+NO_PLOT_NO_NET = frozenset({"matplotlib", "requests"})
+
+# command -> (module under src, budget in ms, heavy modules that must not be imported)
+BUDGETS = {
+    "cli": ("cli", 30, frozenset(HEAVY)),
+    "ingest": ("ingest_open_meteo", 700, NO_PLOT_NO_NET),
+    "backfill": ("backfill", 700, NO_PLOT_NO_NET),
+    "build": ("build_dataset", 700, NO_PLOT_NO_NET),
+    "build-many": ("build_many", 700, NO_PLOT_NO_NET),
+    "summarize": ("pipeline", 700, NO_PLOT_NO_NET),
+    "daemon": ("daemon", 700, NO_PLOT_NO_NET),
+    "store": ("raw_store", 700, NO_PLOT_NO_NET),
+    "http": ("http_cache", 30, frozenset(HEAVY)),
+    "bench": ("bench.suite", 700, NO_PLOT_NO_NET),
+}
+
+def parse_importtime(stderr: str, package: str = "src") -> tuple[float, set[str]]:
+    """(ms spent in top-level `package` imports incl. their dependencies, top-level names imported)."""
+    total_us, names = 0, set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cum, name = line.split("|", 2)
+        if not cum.strip().isdigit():
+            continue  # header line
+        mod = name.strip()
+        names.add(mod.split(".")[0])
+        top_level = name[1:2] != " "  # nested imports are indented by two spaces per level
+        if top_level and (mod == package or mod.startswith(package + ".")):
+            total_us += int(cum)
+    return total_us / 1000, names
+
+def measure_command(module: str, repeat: int = 3) -> tuple[float, set[str]]:
+    code = f"import src.cli, src.{module}"
+    times, loaded = [], set()
+    for _ in range(max(repeat, 1)):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT,
+                              capture_output=True, text=True, check=True)
+        ms, loaded = parse_importtime(proc.stderr)
+        times.append(ms)
+    return statistics.median(times), loaded
+
+def main():
+    ap = argparse.ArgumentParser(description="Check import-time budgets of the CLI subcommands.")
+    ap.add_argument("--commands", type=str, nargs="+", choices=list(BUDGETS), default=list(BUDGETS))
+    ap.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per command (median is used).")
+    ap.add_argument("--scale", type=float, default=1.0, help="Multiply every budget (slow CI machines).")
+    ap.add_argument("--json", type=str, default=None, help="Also write results to this JSON file.")
+    args = ap.parse_args()
+
+    results, failed = [], 0
+    for cmd in args.commands:
+        module, budget, forbidden = BUDGETS[cmd]
+        ms, loaded = measure_command(module, args.repeat)
+        bad = sorted(forbidden & loaded)
+        ok = ms <= budget * args.scale and not bad
+        failed += not ok
+        heavy = [h for h in HEAVY if h in loaded]
+        results.append({"command": cmd, "module": f"src.{module}", "ms": round(ms, 1),
+                        "budget_ms": budget * args.scale, "heavy": heavy, "forbidden": bad, "ok": ok})
+        note = f"  loads forbidden {', '.join(bad)}" if bad else ""
+        print(f"{cmd:11s} {ms:8.1f} ms / {budget * args.scale:6.0f} ms  "
+              f"{'ok  ' if ok else 'FAIL'}  [{', '.join(heavy) or 'no heavy deps'}]{note}")
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+    if failed:
+        raise SystemExit(f"[importtime] {failed} command(s) over budget")
+
+if __name__ == "__main__":
+    main()
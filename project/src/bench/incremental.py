@@ -0,0 +1,45 @@
+# src/bench/incremental.py
+"""
+Appending one day: incremental lag/rolling state vs full `add_features` recompute.
+Also checks that day-by-day updates reproduce the full recompute.
+
+    python -m src.bench.incremental --years 10 --check-days 400
+"""
+from __future__ import annotations
+import argparse, time
+import pandas as pd
+
+from ..features_weather import resample_hourly_to_daily, add_features
+from ..incremental_features import IncrementalFeatures
+from .synth import hourly_weather
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark incremental feature updates.")
+    ap.add_argument("--years", type=float, default=10.0)
+    ap.add_argument("--check-days", type=int, default=400, help="Days appended one at a time for the equality check.")
+    args = ap.parse_args()
+
+    daily = resample_hourly_to_daily(hourly_weather(1, args.years).drop(columns="location"))
+    hist, new = daily.iloc[:-1], daily.iloc[-1:]
+
+    t0 = time.perf_counter()
+    full = add_features(daily)
+    t_full = time.perf_counter() - t0
+
+    inc = IncrementalFeatures()
+    inc.update(hist)
+    t0 = time.perf_counter()
+    row = inc.update(new)
+    t_inc = time.perf_counter() - t0
+    pd.testing.assert_frame_equal(full.iloc[-1:], row, rtol=1e-9)
+    print(f"days={len(daily)}  full recompute {t_full * 1e3:8.2f} ms | incremental append {t_inc * 1e3:6.3f} ms")
+
+    n = min(args.check_days, len(daily))
+    inc = IncrementalFeatures()
+    got = [inc.update(daily.iloc[:len(daily) - n])]
+    got += [inc.update(daily.iloc[i:i + 1]) for i in range(len(daily) - n, len(daily))]
+    pd.testing.assert_frame_equal(full, pd.concat(got, ignore_index=True), rtol=1e-9)
+    print(f"day-by-day append of last {n} days matches full recompute")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# src/bench/linreg.py
+"""
+Linear regression benchmark: stage11 `evaluation.LinearRegression` (normal equations,
+batched Cholesky) vs the previous `SimpleLinReg` (pinv on the full design matrix).
+Uses the build_dataset feature table for every synthetic location.
+
+    python -m src.bench.linreg --locations 100 --years 10
+"""
+from __future__ import annotations
+import argparse, time
+import numpy as np
+import pandas as pd
+
+from ..features_weather import resample_hourly_to_daily, add_features, add_target
+from .suite import _homework
+from .synth import hourly_weather
+
+class LegacySimpleLinReg:
+    def fit(self, X, y):
+        X1 = np.c_[np.ones(len(X)), X.ravel()]
+        beta = np.linalg.pinv(X1) @ y
+        self.intercept_, self.coef_ = float(beta[0]), np.array([float(beta[1])])
+        return self
+    def predict(self, X):
+        return self.intercept_ + self.coef_[0] * X.ravel()
+
+def legacy_pinv(X, y):
+    """SimpleLinReg's solver generalised to many features."""
+    return np.linalg.pinv(np.c_[np.ones(len(X)), X]) @ y
+
+def feature_table(locations: int, years: float) -> pd.DataFrame:
+    daily = resample_hourly_to_daily(hourly_weather(locations, years), by="location")
+    parts = [add_target(add_features(g.drop(columns="location")), "reg_temp_max_nextday").assign(location=loc)
+             for loc, g in daily.groupby("location", observed=True)]
+    return pd.concat(parts, ignore_index=True).dropna().reset_index(drop=True)
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, time.perf_counter() - t0
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark batched normal-equation regression vs SimpleLinReg.")
+    ap.add_argument("--locations", type=int, default=100)
+    ap.add_argument("--years", type=float, default=10.0)
+    ap.add_argument("--chunk", type=int, default=10_000, help="Rows per partial_fit call.")
+    args = ap.parse_args()
+
+    ev = _homework("stage11_ealuation&risk-communication", "evaluation")
+    tab = feature_table(args.locations, args.years)
+    feats = [c for c in tab.columns if c not in ("date", "location", "target")]
+    X, y = tab[feats].to_numpy(np.float64), tab["target"].to_numpy()
+    groups = tab["location"].astype(str).to_numpy()
+    print(f"rows={len(tab):,}  features={len(feats)}  locations={args.locations}")
+
+    # one feature, all rows
+    x1 = tab[["temp_max_c"]].to_numpy()
+    old, t_old = timed(LegacySimpleLinReg().fit, x1, y)
+    new, t_new = timed(ev.LinearRegression().fit, x1, y)
+    assert np.allclose([old.intercept_, *old.coef_], [new.intercept_, *new.coef_])
+    print(f"1 feature      pinv {t_old * 1e3:9.1f} ms | normal eq {t_new * 1e3:8.1f} ms | {t_old / t_new:6.1f}x")
+
+    # every feature, one model per location
+    loop, t_old = timed(lambda: {g: legacy_pinv(X[groups == g], y[groups == g]) for g in np.unique(groups)})
+    model, t_new = timed(ev.LinearRegression().fit, X, y, groups=groups)
+    err = max(np.abs(model.coef_[model.groups_.index(g)] - b[1:]).max() for g, b in loop.items())
+    print(f"per location   pinv {t_old * 1e3:9.1f} ms | batched   {t_new * 1e3:8.1f} ms | {t_old / t_new:6.1f}x"
+          f"  (max |coef diff| {err:.1e})")
+
+    # streamed in row chunks gives the same coefficients
+    inc = ev.LinearRegression()
+    _, t_inc = timed(lambda: [inc.partial_fit(X[i:i + args.chunk], y[i:i + args.chunk], groups[i:i + args.chunk])
+                             for i in range(0, len(y), args.chunk)])
+    assert np.allclose(inc.coef_, model.coef_, rtol=1e-6, atol=1e-8)
+    print(f"partial_fit    {len(y) // args.chunk + 1} chunks {t_inc * 1e3:8.1f} ms, matches the one-shot fit")
+
+    loop_pred, t_old = timed(lambda: np.concatenate(
+        [np.c_[np.ones((groups == g).sum()), X[groups == g]] @ b for g, b in loop.items()]))
+    pred, t_new = timed(model.predict, X, groups=groups)
+    print(f"predict        loop {t_old * 1e3:9.1f} ms | vectorised {t_new * 1e3:7.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# src/bench/mock_api.py
+"""
+Local stand-in for the Open-Meteo forecast and archive endpoints.
+
+Values are a deterministic function of (latitude, longitude, UTC hour), so overlapping
+requests agree and any window can be regenerated. A named `timezone` shifts the
+stamps to that zone's current offset (reported as `utc_offset_seconds`), as the
+real API does. Optional latency and periodic
+failures (503 by default, or 429 with `fail_status`) exercise the clients' retry paths; `revise` perturbs a random share of the
+forecast hours on every call, like a model update between polls.
+
+    python -m src.bench.mock_api --port 8765 --fail-every 10 --latency 0.05
+    OPEN_METEO_ARCHIVE_URL=http://127.0.0.1:8765/v1/archive python -m src backfill --start 2020-01-01
+
+In tests, `with MockOpenMeteo() as api: ... api.url("archive")` runs it on a free port.
+"""
+from __future__ import annotations
+import argparse, json, threading, time
+import datetime as dt
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+import numpy as np
+
+def utc_offset(timezone: str) -> int:
+    try:
+        return int(dt.datetime.now(ZoneInfo(timezone)).utcoffset().total_seconds())
+    except (ZoneInfoNotFoundError, ValueError):  # GMT/UTC are found; "auto" etc. fall back to UTC
+        return 0
+
+def hourly_values(lat: float, lon: float, start: np.datetime64, hours: int, utc_offset: int = 0) -> dict:
+    """`hours` values from wall-clock `start` of a zone at UTC + `utc_offset` seconds."""
+    wall = start.astype("datetime64[h]") + np.arange(hours)
+    t = wall - np.timedelta64(utc_offset, "s").astype("timedelta64[m]")
+    h = t.astype("datetime64[h]").astype(np.int64).astype(np.float64)  # UTC hours since the epoch
+    noise = np.modf(np.abs(np.sin(h * 12.9898 + lat * 78.233 + lon * 37.719)) * 43758.5453)[0]
+    temp = (12.0 - 0.4 * (abs(lat) - 40) + 10 * np.sin(2 * np.pi * (h / 24 - 110) / 365.25)
+            + 4 * np.sin(2 * np.pi * (h - 9) / 24) + 3 * (noise - 0.5))
+    precip = np.where(noise > 0.9, (noise - 0.9) * 20, 0.0)
+    return {
+        "time": np.datetime_as_string(wall.astype("datetime64[m]"), unit="m").tolist(),
+        "temperature_2m": np.round(temp, 1).tolist(),
+        "precipitation": np.round(precip, 1).tolist(),
+    }
+
+
+class MockOpenMeteo:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, fail_every: int = 0,
+                 revise: float = 0.0, seed: int = 0, fail_status: int = 503):
+        self.latency, self.fail_every, self.revise = latency, fail_every, revise
+        self.fail_status = fail_status
+        self._rng = np.random.default_rng(seed)
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self._thread = None
+
+    def url(self, endpoint: str = "archive") -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v1/{endpoint}"
+
+    def _respond(self, path: str, q: dict) -> tuple[int, object]:
+        with self._lock:
+            self.calls += 1
+            n = self.calls
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail_every and n % self.fail_every == 0:
+            return self.fail_status, {"error": True, "reason": "mock overload"}
+        try:
+            lats = [float(v) for v in q["latitude"].split(",")]
+            lons = [float(v) for v in q["longitude"].split(",")]
+            if path.endswith("/archive"):
+                d0 = dt.date.fromisoformat(q["start_date"])
+                days = (dt.date.fromisoformat(q["end_date"]) - d0).days + 1
+            elif path.endswith("/forecast"):
+                d0, days = dt.date.today(), int(q.get("forecast_days", 7))
+            else:
+                return 404, {"error": True, "reason": f"unknown endpoint {path}"}
+        except (KeyError, ValueError) as e:
+            return 400, {"error": True, "reason": f"bad parameters: {e}"}
+        if len(lats) != len(lons) or days <= 0:
+            return 400, {"error": True, "reason": "coordinate lists or dates do not match"}
+        tz = q.get("timezone", "GMT")
+        off = utc_offset(tz)
+        if path.endswith("/forecast"):
+            d0 = (dt.datetime.now(dt.timezone.utc) + dt.timedelta(seconds=off)).date()  # local today
+        body = [{"latitude": a, "longitude": b, "utc_offset_seconds": off, "timezone": tz,
+                 "hourly": hourly_values(a, b, np.datetime64(d0), 24 * days, off)} for a, b in zip(lats, lons)]
+        if self.revise and path.endswith("/forecast"):
+            with self._lock:
+                for loc in body:
+                    temp = loc["hourly"]["temperature_2m"]
+                    for i in np.flatnonzero(self._rng.random(len(temp)) < self.revise):
+                        temp[i] = round(temp[i] + float(self._rng.normal(0, 1.5)), 1)
+        return 200, body[0] if len(body) == 1 else body
+
+    def _handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                q = {k: ",".join(v) for k, v in parse_qs(parts.query).items()}
+                status, body = api._respond(parts.path, q)
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, fmt, *args):
+                pass
+        return Handler
+
+    def __enter__(self) -> "MockOpenMeteo":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+        return False
+
+def main():
+    ap = argparse.ArgumentParser(description="Serve synthetic Open-Meteo forecast/archive responses locally.")
+    ap.add_argument("--host", type=str, default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response.")
+    ap.add_argument("--fail-every", type=int, default=0, help="Answer every Nth request with --fail-status.")
+    ap.add_argument("--fail-status", type=int, default=503, help="Status of the failed answers (e.g. 429).")
+    ap.add_argument("--revise", type=float, default=0.0, help="Share of forecast hours changed per call.")
+    args = ap.parse_args()
+
+    api = MockOpenMeteo(args.host, args.port, args.latency, args.fail_every, args.revise,
+                        fail_status=args.fail_status)
+    print(f"[mock] Open-Meteo stand-in on {api.url('forecast')} and {api.url('archive')}")
+    try:
+        api.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api.server.server_close()
+
+if __name__ == "__main__":
+    main()
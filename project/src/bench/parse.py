@@ -0,0 +1,111 @@
+# src/bench/parse.py
+"""
+Response parsing benchmark: `hourly_columns.hourly_frame` on raw bodies and on
+decoded JSON vs the former `json.loads` + per-location `to_hourly_df` + concat
+(ISO strings through `pd.to_datetime`). Checks all paths build the same frame, on
+the large regular body and on small irregular ones (duplicated, skipped, null or
+unreadable stamps).
+
+    python -m src.bench.parse --hours 1000000 --locations 1
+    python -m src.bench.parse --hours 2000000 --locations 50
+"""
+from __future__ import annotations
+import argparse, json, time
+import numpy as np
+import pandas as pd
+
+from ..hourly_columns import hourly_frame
+from . import measure
+from .mock_api import hourly_values
+
+def legacy_hourly_df(js: dict) -> pd.DataFrame:
+    hourly = js.get("hourly", {})
+    df = pd.DataFrame({
+        "time": hourly.get("time", []),
+        "temperature_2m": hourly.get("temperature_2m", []),
+        "precipitation": hourly.get("precipitation", []),
+    })
+    if df.empty:
+        return df
+    df["time"] = pd.to_datetime(df["time"], utc=True, errors="coerce")
+    return df
+
+def legacy_parse(body: bytes, names: list[str]) -> pd.DataFrame:
+    js = json.loads(body)
+    js = [js] if isinstance(js, dict) else js
+    frames = [legacy_hourly_df(j).assign(location=n) for j, n in zip(js, names)]
+    return pd.concat(frames, ignore_index=True)
+
+def archive_body(locations: int, hours: int) -> bytes:
+    """A compact multi-location archive response as Open-Meteo sends it."""
+    start = np.datetime64("2000-01-01")
+    out = []
+    for i in range(locations):
+        lat, lon = 30.0 + i * 0.25, -100.0 + i * 0.5
+        h = hourly_values(lat, lon, start, hours)
+        h["temperature_2m"][::997] = [None] * len(h["temperature_2m"][::997])  # gaps the archive leaves
+        out.append({"latitude": lat, "longitude": lon, "utc_offset_seconds": 0, "timezone": "GMT",
+                    "hourly_units": {"time": "iso8601", "temperature_2m": "°C", "precipitation": "mm"},
+                    "hourly": h})
+    return json.dumps(out[0] if locations == 1 else out, separators=(",", ":")).encode()
+
+def irregular_bodies(hours: int = 240) -> dict[str, bytes]:
+    """Bodies whose stamps break the regular hourly pattern somewhere between the ends."""
+    h = hourly_values(40.7, -74.0, np.datetime64("2024-03-01"), hours)
+    t, mid = h["time"], hours // 2
+    cases = {
+        "duplicate": t[:mid] + [t[mid - 1]] + t[mid + 1:],
+        "skip+repeat": t[:mid // 2] + t[mid // 2 + 1:mid] + [t[mid - 1]] + t[mid:],
+        "null stamp": t[:mid] + [None] + t[mid + 1:],
+        "unreadable": t[:mid] + ["not a time"] + t[mid + 1:],
+        "utc suffix": [s + "Z" for s in t],
+    }
+    return {name: json.dumps({"utc_offset_seconds": 0, "hourly": {**h, "time": ts}},
+                             separators=(",", ":")).encode() for name, ts in cases.items()}
+
+def best_of(repeat: int, fn, *args, **kwargs) -> float:
+    """Untraced wall time (tracemalloc slows the allocation-heavy legacy path far more)."""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(*args, **kwargs)
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark columnar Open-Meteo parsing vs to_hourly_df.")
+    ap.add_argument("--hours", type=int, default=1_000_000, help="Total hourly rows across all locations.")
+    ap.add_argument("--locations", type=int, default=1)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    per = args.hours // args.locations
+    names = [f"site{i:03d}" for i in range(args.locations)]
+    body = archive_body(args.locations, per)
+    print(f"rows={per * args.locations:,}  locations={args.locations}  body {len(body) / 2**20:,.1f} MiB")
+
+    old, _, m_old = measure(legacy_parse, body, names)
+    new, _, m_new = measure(hourly_frame, body, locations=names)
+    js = json.loads(body)
+    dec, _, m_dec = measure(hourly_frame, js, locations=names)
+    t_old = best_of(args.repeat, legacy_parse, body, names)
+    t_new = best_of(args.repeat, hourly_frame, body, locations=names)
+    t_json = best_of(args.repeat, json.loads, body)
+    t_dec = best_of(args.repeat, hourly_frame, js, locations=names)
+    print(f"json.loads + to_hourly_df    {t_old:6.3f} s (peak {m_old:6.1f} MiB)")
+    print(f"hourly_frame(raw bytes)      {t_new:6.3f} s (peak {m_new:6.1f} MiB)  → {t_old / t_new:.1f}x")
+    print(f"json.loads + hourly_frame    {t_json + t_dec:6.3f} s (peak {m_dec:6.1f} MiB"
+          f" + json)  → {t_old / (t_json + t_dec):.1f}x")
+    old = old[new.columns].astype({"location": new["location"].dtype})
+    pd.testing.assert_frame_equal(new, old)
+    pd.testing.assert_frame_equal(dec, old)
+    print("frames identical")
+
+    for name, irregular in irregular_bodies().items():
+        want = legacy_parse(irregular, ["x"]).drop(columns="location")
+        pd.testing.assert_frame_equal(hourly_frame(irregular), want)
+        pd.testing.assert_frame_equal(hourly_frame(json.loads(irregular)), want)
+    print(f"irregular stamps identical ({', '.join(irregular_bodies())})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# src/bench/reports.py
+"""
+Per-site report benchmark: `utils.render_reports` (reused Agg figure, NumPy bins,
+chunked table writers, process pool) vs the former loop of `save_histogram` and
+`save_table` calls per location. Checks both write the same tables.
+
+    python -m src.bench.reports --locations 200 --years 1 --workers 4
+"""
+from __future__ import annotations
+import argparse, json, shutil, tempfile, time
+from pathlib import Path
+import pandas as pd
+
+from ..features_weather import resample_hourly_to_daily
+from ..utils import render_reports
+from .synth import hourly_weather
+
+def legacy_histogram(series: pd.Series, out_path: Path, bins: int = 30, title=None, xlabel=None) -> None:
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    fig, ax = plt.subplots()
+    ax.hist(series.dropna(), bins=bins)
+    ax.set_title(title or "Histogram")
+    ax.set_xlabel(xlabel or (series.name or ""))
+    ax.set_ylabel("Count")
+    fig.tight_layout()
+    fig.savefig(out_path, dpi=144)
+    plt.close(fig)
+
+def legacy_table(df: pd.DataFrame, csv_path: Path, json_path: Path, float_round: int) -> None:
+    out = df.copy()
+    for c in out.select_dtypes("number").columns:
+        out[c] = out[c].round(float_round)
+    out.to_csv(csv_path, index=False)
+    json_path.write_text(out.to_json(orient="records", indent=2))
+
+def legacy_reports(daily: pd.DataFrame, out: Path, cols: list[str]) -> None:
+    for name, g in daily.groupby("location", sort=True, observed=True):
+        d = out / str(name)
+        for c in cols:
+            legacy_histogram(g[c], d / f"{c}_hist.png", title=f"{name}: {c}", xlabel=c)
+        legacy_table(g.drop(columns="location"), d / "table.csv", d / "table.json", 2)
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark batch report rendering vs per-call helpers.")
+    ap.add_argument("--locations", type=int, default=200)
+    ap.add_argument("--years", type=float, default=1.0)
+    ap.add_argument("--workers", type=int, default=1, help="Process pool size (default: in-process; 0 for all CPUs).")
+    ap.add_argument("--skip-legacy", action="store_true")
+    args = ap.parse_args()
+
+    daily = resample_hourly_to_daily(hourly_weather(args.locations, args.years), by="location")
+    cols = ["temp_max_c", "temp_min_c", "precip_mm"]
+    n_files = args.locations * (len(cols) + 2)
+    print(f"locations={args.locations}  daily rows={len(daily):,}  artifacts={n_files:,}")
+    tmp = Path(tempfile.mkdtemp(prefix="bench_reports_"))
+    try:
+        t0 = time.perf_counter()
+        timings = render_reports(daily, "location", tmp / "new", hist_cols=cols, workers=args.workers or None)
+        t_new = time.perf_counter() - t0
+        print(f"render_reports: {t_new:7.2f} s  ({n_files / t_new:,.0f} artifacts/s)")
+        per = timings.assign(kind=timings["artifact"].str.rsplit(".", n=1).str[-1])
+        print(per.groupby("kind")["seconds"].agg(["count", "sum", "mean"])
+                 .assign(mean_ms=lambda t: t["mean"] * 1e3).drop(columns="mean").round(3).to_string())
+        if args.skip_legacy:
+            return
+        t0 = time.perf_counter()
+        legacy_reports(daily, tmp / "old", cols)
+        t_old = time.perf_counter() - t0
+        print(f"per-call loop : {t_old:7.2f} s  ({n_files / t_old:,.0f} artifacts/s)  → {t_old / t_new:.1f}x")
+
+        for d in sorted((tmp / "old").iterdir()):
+            new = tmp / "new" / d.name
+            assert (d / "table.csv").read_text() == (new / "table.csv").read_text()
+            assert json.loads((d / "table.json").read_text()) == json.loads((new / "table.json").read_text())
+        print("tables identical")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
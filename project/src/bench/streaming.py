@@ -0,0 +1,44 @@
+# src/bench/streaming.py
+"""
+Streamed vs in-memory build_dataset on one synthetic location: checks the outputs
+agree and reports wall time and peak traced memory for each path.
+
+    python -m src.bench.streaming --years 20 --chunksize 100000
+"""
+from __future__ import annotations
+import argparse, os, tempfile
+import pandas as pd
+
+from ..features_weather import resample_hourly_to_daily, add_features, add_target, TASKS
+from ..io_utils import read_csv_dt
+from ..streaming import build_streaming, iter_hourly_csv
+from . import measure
+from .synth import hourly_weather
+
+def in_memory(path: str, task: str, tz: str) -> pd.DataFrame:
+    daily = resample_hourly_to_daily(read_csv_dt(path), tz=tz)
+    return add_target(add_features(daily), task).dropna().reset_index(drop=True)
+
+def streamed(path: str, task: str, tz: str, chunksize: int) -> pd.DataFrame:
+    return build_streaming(iter_hourly_csv(path, chunksize), task, tz=tz)
+
+def main():
+    ap = argparse.ArgumentParser(description="Compare streamed and in-memory dataset builds.")
+    ap.add_argument("--years", type=float, default=20.0)
+    ap.add_argument("--chunksize", type=int, default=100_000)
+    ap.add_argument("--timezone", type=str, default="America/New_York")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "hourly.csv")
+        hourly_weather(1, args.years).drop(columns="location").to_csv(path, index=False)
+        print(f"hourly rows={int(args.years * 365.25 * 24):,}  chunksize={args.chunksize:,}")
+        for task in TASKS:
+            ref, t_mem, m_mem = measure(in_memory, path, task, args.timezone)
+            got, t_str, m_str = measure(streamed, path, task, args.timezone, args.chunksize)
+            pd.testing.assert_frame_equal(ref, got)
+            print(f"{task:22s} in-memory {t_mem:6.2f} s {m_mem:8.1f} MiB | "
+                  f"streamed {t_str:6.2f} s {m_str:8.1f} MiB | rows={len(got)} identical")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+# src/bench/suite.py
+"""
+Pipeline benchmark suite: times each stage on synthetic hourly data at several
+sizes. Results go to a JSON file (seconds, rows/s, peak traced MiB), and a second
+file can be compared against a stored baseline.
+
+    python -m src.bench.suite run --sizes 10x1 100x1 100x5 --missing-rate 0.02
+    python -m src.bench.suite run --save-baseline          # data/bench/baseline.json
+    python -m src.bench.suite compare data/bench/suite_<ts>.json
+
+Sizes are LOCATIONSxYEARS. By default the timestamps are naive America/New_York
+wall-clock times, as the API returns them, so DST days have 23 or 25 rows.
+`compare` exits with status 1 when any stage regresses beyond the tolerances.
+"""
+from __future__ import annotations
+import argparse, gc, importlib.util, json, os, platform, subprocess, sys, time
+import datetime as dt
+from pathlib import Path
+from typing import Callable, Optional
+import numpy as np
+import pandas as pd
+
+from ..features_weather import resample_hourly_to_daily, add_features
+from ..paths import ROOT, DATA
+from . import measure
+from .synth import hourly_weather
+
+BENCH_DIR = DATA / "bench"
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+HOMEWORK = ROOT.parent / "homework"
+STAGES = (
+    "resample", "summarize", "features",
+    "fill_median", "drop_missing", "normalize",
+    "outliers_iqr", "outliers_zscore", "winsorize", "outliers_grouped",
+)
+
+def _homework(stage_dir: str, name: str):
+    """Import homework/<stage_dir>/src/<name>.py (None if it is not in this checkout)."""
+    path = HOMEWORK / stage_dir / "src" / f"{name}.py"
+    if not path.exists():
+        return None
+    spec = importlib.util.spec_from_file_location(f"_bench_{name}", path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+def parse_size(s: str) -> tuple[int, float]:
+    try:
+        loc, yrs = s.lower().split("x")
+        return int(loc), float(yrs)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"size must look like 100x2.5 (locations x years), got {s!r}")
+
+def stage_calls(df: pd.DataFrame, local: bool, tz: str) -> dict[str, tuple[Callable[[], object], int]]:
+    """stage -> (zero-arg callable, input rows). Inputs for later stages are built untimed."""
+    from ..pipeline import summarize_daily
+    cleaning = _homework("stage06_datapreprocessing", "cleaning")
+    outliers = _homework("stage07_outliers-risk-assumptions", "outliers")
+
+    # naive local times are already wall clock; UTC input is converted to tz
+    day_tz = None if local else tz
+    daily = resample_hourly_to_daily(df, tz=day_tz, by="location")
+    feats = add_features(daily)  # stacked locations; lag values at boundaries don't matter for timing
+    num = feats.select_dtypes("number").columns.tolist()
+    hourly_no_loc = df.drop(columns="location")
+    temp = df["temperature_2m"]
+
+    calls = {
+        "resample": (lambda: resample_hourly_to_daily(df, tz=day_tz, by="location"), len(df)),
+        "summarize": (lambda: summarize_daily(hourly_no_loc), len(df)),
+        "features": (lambda: add_features(daily), len(daily)),
+    }
+    if cleaning is not None:
+        calls["fill_median"] = (lambda: cleaning.fill_missing_median(feats), len(feats))
+        calls["drop_missing"] = (lambda: cleaning.drop_missing(feats, threshold=0.9), len(feats))
+        calls["normalize"] = (lambda: cleaning.normalize_data(feats, num, method="zscore"), len(feats))
+    if outliers is not None:
+        calls["outliers_iqr"] = (lambda: outliers.detect_outliers_iqr(temp), len(temp))
+        calls["outliers_zscore"] = (lambda: outliers.detect_outliers_zscore(temp), len(temp))
+        calls["winsorize"] = (lambda: outliers.winsorize_series(temp), len(temp))
+        if hasattr(outliers, "detect_outliers_grouped"):
+            calls["outliers_grouped"] = (lambda: outliers.detect_outliers_grouped(df, "temperature_2m"), len(df))
+    return calls
+
+def time_call(fn: Callable[[], object], repeat: int) -> tuple[float, float]:
+    """Best-of-`repeat` wall seconds (untraced), then one traced run for peak MiB."""
+    best = float("inf")
+    for _ in range(max(repeat, 1)):
+        gc.collect()
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    gc.collect()
+    _, _, peak = measure(fn)
+    return best, peak
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+def run(sizes: list[tuple[int, float]], stages: Optional[list[str]] = None, missing_rate: float = 0.0,
+        tz: Optional[str] = "America/New_York", local: bool = True, repeat: int = 3,
+        seed: int = 0) -> dict:
+    results = []
+    for locations, years in sizes:
+        df = hourly_weather(locations, years, seed=seed, missing_rate=missing_rate, tz=tz if local else None)
+        size = f"{locations}x{years:g}"
+        print(f"[bench] size {size}: {len(df):,} hourly rows")
+        for stage, (fn, rows) in stage_calls(df, local, tz).items():
+            if stages and stage not in stages:
+                continue
+            secs, peak = time_call(fn, repeat)
+            results.append({
+                "stage": stage, "size": size, "locations": locations, "years": years, "rows": rows,
+                "seconds": round(secs, 6), "rows_per_s": round(rows / secs) if secs else None,
+                "peak_mib": round(peak, 2),
+            })
+            print(f"  {stage:16s} {secs * 1e3:10.2f} ms  {rows / secs / 1e6:8.2f} M rows/s  peak {peak:9.1f} MiB")
+        del df
+    return {
+        "env": environment(),
+        "params": {"missing_rate": missing_rate, "timezone": tz, "local_times": local,
+                   "repeat": repeat, "seed": seed},
+        "results": results,
+    }
+
+def compare(baseline: dict, current: dict, time_tol: float = 0.15, mem_tol: float = 0.25,
+            min_seconds: float = 0.005) -> pd.DataFrame:
+    """
+    Join two result files on (stage, size). A row regresses when its time grows by more
+    than time_tol (and by at least min_seconds, to ignore timer noise on tiny stages),
+    or its peak memory grows by more than mem_tol.
+    """
+    keys = ["stage", "size"]
+    cols = [*keys, "seconds", "peak_mib"]
+    base = pd.DataFrame(baseline["results"], columns=cols)
+    cur = pd.DataFrame(current["results"], columns=cols)
+    out = base.merge(cur, on=keys, how="outer", suffixes=("_base", "_cur"), sort=False)
+    order = {s: i for i, s in enumerate(STAGES)}
+    out = out.sort_values(["size", "stage"], key=lambda c: c.map(order) if c.name == "stage" else c)
+    out["time_ratio"] = out["seconds_cur"] / out["seconds_base"]
+    out["mem_ratio"] = out["peak_mib_cur"] / out["peak_mib_base"]
+    slower = (out["time_ratio"] > 1 + time_tol) & (out["seconds_cur"] - out["seconds_base"] >= min_seconds)
+    bigger = out["mem_ratio"] > 1 + mem_tol
+    out["status"] = np.select(
+        [out["seconds_base"].isna(), out["seconds_cur"].isna(), slower | bigger,
+         out["time_ratio"] < 1 / (1 + time_tol)],
+        ["new", "missing", "REGRESSION", "faster"], default="ok")
+    return out.round({"time_ratio": 3, "mem_ratio": 3})
+
+def _load(path: Path | str) -> dict:
+    with open(path) as fh:
+        return json.load(fh)
+
+def _print_compare(table: pd.DataFrame, baseline: dict, current: dict) -> int:
+    for k, v in current.get("params", {}).items():
+        if baseline.get("params", {}).get(k) != v:
+            print(f"[bench] warning: {k} differs (baseline {baseline['params'].get(k)!r}, current {v!r})")
+    print(table.to_string(index=False))
+    n_bad = int((table["status"] == "REGRESSION").sum())
+    print(f"\n[bench] {n_bad} regression(s) in {len(table)} stage/size pair(s)")
+    return n_bad
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark pipeline stages on synthetic hourly weather.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    r = sub.add_parser("run", help="Run the suite and write a JSON result file.")
+    r.add_argument("--sizes", type=parse_size, nargs="+", default=[(10, 1.0), (100, 1.0), (100, 5.0)],
+                   help="LOCATIONSxYEARS, e.g. 100x5 (default: 10x1 100x1 100x5).")
+    r.add_argument("--stages", type=str, nargs="+", choices=STAGES, default=None)
+    r.add_argument("--missing-rate", type=float, default=0.01)
+    r.add_argument("--timezone", type=str, default="America/New_York")
+    r.add_argument("--utc", action="store_true", help="UTC timestamps instead of naive local (no DST days).")
+    r.add_argument("--repeat", type=int, default=3, help="Timed runs per stage; the best is kept.")
+    r.add_argument("--seed", type=int, default=0)
+    r.add_argument("--out", type=str, default=None, help="Result file (default: data/bench/suite_<ts>.json).")
+    r.add_argument("--save-baseline", action="store_true", help=f"Also write the results to {DEFAULT_BASELINE}.")
+    r.add_argument("--compare", action="store_true", help="Compare against the baseline after running.")
+
+    c = sub.add_parser("compare", help="Flag regressions of a result file against a baseline.")
+    c.add_argument("current", type=str)
+    c.add_argument("--baseline", type=str, default=str(DEFAULT_BASELINE))
+    for p in (r, c):
+        p.add_argument("--time-tol", type=float, default=0.15, help="Allowed relative slowdown (default 0.15).")
+        p.add_argument("--mem-tol", type=float, default=0.25, help="Allowed relative peak-memory growth.")
+    args = ap.parse_args()
+
+    if args.cmd == "compare":
+        base, cur = _load(args.baseline), _load(args.current)
+        table = compare(base, cur, args.time_tol, args.mem_tol)
+        sys.exit(1 if _print_compare(table, base, cur) else 0)
+
+    res = run(args.sizes, args.stages, args.missing_rate, args.timezone, not args.utc, args.repeat, args.seed)
+    out = Path(args.out) if args.out else BENCH_DIR / f"suite_{dt.datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(res, indent=2))
+    print(f"[bench] results → {out}")
+    if args.save_baseline:
+        DEFAULT_BASELINE.parent.mkdir(parents=True, exist_ok=True)
+        DEFAULT_BASELINE.write_text(json.dumps(res, indent=2))
+        print(f"[bench] baseline → {DEFAULT_BASELINE}")
+    elif args.compare:
+        if not DEFAULT_BASELINE.exists():
+            raise SystemExit(f"No baseline at {DEFAULT_BASELINE}; run with --save-baseline first.")
+        base = _load(DEFAULT_BASELINE)
+        table = compare(base, res, args.time_tol, args.mem_tol)
+        sys.exit(1 if _print_compare(table, base, res) else 0)
+
+if __name__ == "__main__":
+    main()
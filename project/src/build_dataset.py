@@ -1,68 +1,202 @@
 from __future__ import annotations
-import argparse
+import argparse, copy
 from pathlib import Path
 import pandas as pd
 
-from paths import ensure_dirs, RAW, PROC, latest_raw
-from io_utils import read_csv_dt, write_csv, write_parquet
-from validation import validate_weather_df
-from features_weather import (
-    resample_hourly_to_daily, add_calendar_features,
-    add_lags, add_rollings, make_regression_target, make_rain_label
-)
+from .paths import ensure_dirs, RAW, PROC, MODELS, CACHE, latest_raw
+from .io_utils import FORMATS, read_csv_dt, write_parquet, write_table, downcast
+from .preprocessing import Preprocessor, default_path
+from .raw_store import RawStore
+from .validation import validate_weather_df
+from .feature_cache import FeatureCache, file_digest, store_digest
+from .features_weather import resample_hourly_to_daily, add_features, add_target, TASKS, ROLL_FUNCS
+from .incremental_features import IncrementalFeatures
+from .profiling import PROFILER, add_profile_args, configure_from_args, peak_rss_mib
+from .streaming import build_streaming, iter_hourly_csv
+
+def _incremental_features(stem: str, load_daily, lags, windows, tz: str) -> pd.DataFrame:
+    """
+    Extend the saved feature table with days after the saved state's last date.
+    Only the new days are aggregated and featurised; state and table live in models/.
+    The newest day may still be incomplete, so it is featurised from a copy of the
+    state and left uncommitted until a later run. A state with no committed day yet
+    (e.g. the first run saw one partial day) is rebuilt from a full load.
+    """
+    state_path, table_path = MODELS / f"{stem}.json", MODELS / f"{stem}.parquet"
+    inc = IncrementalFeatures.load(state_path) if state_path.exists() and table_path.exists() else None
+    if inc is not None and (inc.params()["lags"] != list(lags) or inc.params()["windows"] != list(windows)
+                            or inc.meta.get("tz") != tz):
+        print("[incremental] feature parameters changed; rebuilding state")
+        inc = None
+    if inc is not None and not inc.last_date:
+        inc = None  # nothing committed yet: there is no last date to resume from
+
+    if inc is None:
+        inc, prev = IncrementalFeatures(lags, windows), None
+        inc.meta["tz"] = tz
+        daily = load_daily()
+    else:
+        prev = pd.read_parquet(table_path)
+        last = pd.Timestamp(next(iter(inc.last_date.values())))
+        daily = load_daily(last - pd.Timedelta(days=1))
+        daily = daily[daily["date"] > last]
+    daily = daily.reset_index(drop=True)
+
+    new = inc.update(daily.iloc[:-1])
+    table = new if prev is None else pd.concat([prev, new], ignore_index=True)
+    inc.save(state_path)
+    write_parquet(table, table_path)
+    open_day = copy.deepcopy(inc).update(daily.iloc[-1:])
+    print(f"[incremental] {len(new)} new day(s) committed; {len(table)} in table")
+    return pd.concat([table, open_day], ignore_index=True)
+
+def _validated(chunks):
+    for chunk in chunks:
+        validate_weather_df(chunk)
+        yield chunk
 
 def main():
     ap = argparse.ArgumentParser(description="Build supervised dataset from hourly weather CSV(s).")
     ap.add_argument("--input", type=str, default=None,
-                    help="Path to raw hourly CSV (columns: time, temperature_2m, precipitation, ...). If omitted, uses latest in data/raw.")
+                    help="Path to raw hourly CSV (columns: time, temperature_2m, precipitation, ...). If omitted, reads the raw store.")
+    ap.add_argument("--location", type=str, default=None,
+                    help="Raw store location key (required if the store holds several locations).")
+    ap.add_argument("--start", type=str, default=None, help="Raw store: first UTC timestamp to read (inclusive).")
+    ap.add_argument("--end", type=str, default=None, help="Raw store: last UTC timestamp to read (exclusive).")
     ap.add_argument("--pattern", type=str, default="weather_hourly_*.csv",
-                    help="Glob for selecting latest raw file if --input not provided.")
+                    help="Glob for selecting latest legacy raw CSV if --input not provided and the store is empty.")
     ap.add_argument("--timezone", type=str, default="America/New_York",
                     help="Timezone for daily resampling (e.g., America/New_York).")
-    ap.add_argument("--task", type=str, choices=["reg_temp_max_nextday", "clf_rain10_nextday"],
+    ap.add_argument("--task", type=str, choices=TASKS,
                     default="reg_temp_max_nextday", help="Which target to create.")
     ap.add_argument("--lags", type=int, nargs="+", default=[1, 2, 3], help="Lag days to add.")
     ap.add_argument("--windows", type=int, nargs="+", default=[3, 7, 14], help="Rolling windows to add.")
     ap.add_argument("--outstem", type=str, default="weather_features", help="Output filename stem.")
+    ap.add_argument("--format", type=str, nargs="+", choices=FORMATS, default=["csv", "parquet"],
+                    help="Output format(s); 'arrow' is an uncompressed IPC file for zero-copy memory-mapping.")
+    ap.add_argument("--compression", type=str, default=None,
+                    help="Codec (zstd, snappy, lz4, gzip, ..., none); formats that lack it keep their default.")
+    ap.add_argument("--compression-level", type=int, default=None, help="Codec level, where supported.")
+    ap.add_argument("--no-downcast", action="store_true",
+                    help="Keep float64/int64 (default: smaller ints, float32 for columns at 0.01 resolution).")
+    ap.add_argument("--stream", action="store_true",
+                    help="Process hourly input in chunks (bounded memory; same output as the in-memory path).")
+    ap.add_argument("--chunksize", type=int, default=500_000,
+                    help="Hourly rows per CSV chunk in --stream mode and --incremental CSV reads.")
+    ap.add_argument("--incremental", action="store_true",
+                    help="Append features for days after the last run using saved lag/rolling state "
+                         "(assumes earlier days are final). Raw-store reads cover only the new days; "
+                         "an --input CSV is still scanned in full (in --chunksize chunks).")
+    ap.add_argument("--fit-preprocessor", type=str, choices=["zscore", "minmax"], default=None,
+                    help="Fit median-fill + scaling on the feature columns and save it to models/<outstem>_<task>.prep.")
+    ap.add_argument("--no-cache", action="store_true", help="Recompute daily aggregates and features from scratch.")
+    ap.add_argument("--cache-dir", type=str, default=str(CACHE), help="Feature cache directory.")
+    ap.add_argument("--cache-max-mb", type=int, default=512, help="Evict least-recently-used entries beyond this size.")
+    add_profile_args(ap)
     args = ap.parse_args()
+    configure_from_args(args)
 
     ensure_dirs()
 
-    # Locate raw
-    raw_path = Path(args.input) if args.input else latest_raw(args.pattern)
-    if raw_path is None or not raw_path.exists():
-        raise SystemExit("No raw file found. Provide --input or place a file under data/raw matching the pattern.")
+    # Locate hourly source: explicit file, else raw store, else latest legacy CSV snapshot
+    store = RawStore()
+    locations = [] if args.input else store.locations()
+    loc, raw_path = None, None
+    if locations:
+        loc = args.location or (locations[0] if len(locations) == 1 else None)
+        if loc is None:
+            raise SystemExit(f"Raw store holds {len(locations)} locations; pass --location.")
+    else:
+        raw_path = Path(args.input) if args.input else latest_raw(args.pattern)
+        if raw_path is None or not raw_path.exists():
+            raise SystemExit("No raw data found. Run ingestion, provide --input, or place a file under data/raw matching the pattern.")
 
-    # Read + validate hourly
-    dfh = read_csv_dt(raw_path, parse_dates=("time",), assume_utc=True)
-    validate_weather_df(dfh)
+    if args.stream:
+        # Store partitions (one month each) or CSV chunks, folded day by day
+        if loc is not None:
+            chunks = (c.drop(columns="location") for c in store.iter_read([loc], start=args.start, end=args.end))
+        else:
+            chunks = iter_hourly_csv(raw_path, chunksize=args.chunksize)
+        with PROFILER.stage("stream") as st:
+            out = build_streaming(_validated(chunks), args.task, tz=args.timezone,
+                                  lags=args.lags, windows=args.windows)
+            st.rows_out = len(out)
+        if out.empty:
+            raise SystemExit("No rows left after feature building.")
+    else:
+        def load_daily(since=None):
+            # Read + validate hourly from `since` (default --start), then aggregate to local-timezone days
+            with PROFILER.stage("parse") as st:
+                if loc is not None:
+                    start = since if since is not None else args.start
+                    dfh = store.read([loc], start=start, end=args.end).drop(columns="location")
+                elif since is None:
+                    dfh = read_csv_dt(raw_path, parse_dates=("time",), assume_utc=True)
+                else:
+                    # a CSV has no index: it is still scanned to the end, in chunks, keeping
+                    # only rows from `since` on (the store reads just the partitions needed)
+                    dfh = pd.concat(iter_hourly_csv(raw_path, args.chunksize, since=since), ignore_index=True)
+                st.rows_out = len(dfh)
+            with PROFILER.stage("validate", rows_in=len(dfh)):
+                validate_weather_df(dfh)
+            with PROFILER.stage("resample", rows_in=len(dfh)) as st:
+                daily = resample_hourly_to_daily(dfh, tz=args.timezone)
+                st.rows_out = len(daily)
+            return daily
 
-    # Daily aggregation in local timezone
-    daily = resample_hourly_to_daily(dfh, tz=args.timezone)
-    daily = add_calendar_features(daily)
+        if args.incremental:
+            stem = f"{args.outstem}_state_{loc or 'input'}"
+            with PROFILER.stage("features") as st:
+                feats = _incremental_features(stem, load_daily, args.lags, args.windows, args.timezone)
+                st.rows_out = len(feats)
+        else:
+            # Cache keys: raw data identity + daily/feature parameters (the task is applied after)
+            cache = None if args.no_cache else FeatureCache(args.cache_dir, max_bytes=args.cache_max_mb * 2**20)
+            if cache is not None:
+                raw_id = (store_digest(store.manifest(), loc, args.start, args.end) if loc is not None
+                          else file_digest(raw_path))
+                daily_key = cache.key("daily", raw_id, tz=args.timezone)
+                feat_key = cache.key("features", raw_id, tz=args.timezone, lags=args.lags,
+                                     windows=args.windows, funcs=ROLL_FUNCS)
 
-    # Feature set
-    base_cols = ["temp_max_c", "temp_mean_c", "precip_mm"]
-    daily = add_lags(daily, cols=base_cols, lags=args.lags)
-    daily = add_rollings(daily, cols=["temp_max_c", "precip_mm"], windows=args.windows, funcs=("mean", "max", "sum"))
+            feats = cache.get(feat_key) if cache is not None else None
+            if feats is None:
+                daily = cache.get(daily_key) if cache is not None else None
+                if daily is None:
+                    daily = load_daily()
+                    if cache is not None:
+                        cache.put(daily_key, daily)
+                with PROFILER.stage("features", rows_in=len(daily)) as st:
+                    feats = add_features(daily, lags=args.lags, windows=args.windows)
+                    st.rows_out = len(feats)
+                if cache is not None:
+                    cache.put(feat_key, feats)
+            elif cache is not None:
+                print(f"[cache] hit: {feat_key}")
 
-    # Targets
-    if args.task == "reg_temp_max_nextday":
-        daily = make_regression_target(daily, base_col="temp_max_c", horizon=1)
-    elif args.task == "clf_rain10_nextday":
-        daily = make_rain_label(daily, threshold_mm=10.0, horizon=1)
+        with PROFILER.stage("targets", rows_in=len(feats)) as st:
+            daily = add_target(feats, args.task)
 
-    # Drop rows with NaNs introduced by lags/rollings/targets
-    out = daily.dropna().reset_index(drop=True)
+            # Drop rows with NaNs introduced by lags/rollings/targets
+            out = daily.dropna().reset_index(drop=True)
+            st.rows_out = len(out)
 
     # Save
-    stem = f"{args.outstem}_{args.task}"
-    csv_path = PROC / f"{stem}.csv"
-    pq_path  = PROC / f"{stem}.parquet"
-    write_csv(out, csv_path)
-    write_parquet(out, pq_path)
-    print(f"Saved: {csv_path}")
-    print(f"Saved: {pq_path}")
+    with PROFILER.stage("write", rows_in=len(out)):
+        if not args.no_downcast:
+            out = downcast(out)
+        stem = PROC / f"{args.outstem}_{args.task}"
+        for fmt in dict.fromkeys(args.format):
+            res = write_table(out, stem, fmt, compression=args.compression, level=args.compression_level)
+            print(f"Saved: {res['path']}  [{res['codec']}, {res['bytes'] / 2**20:.2f} MiB, {res['seconds']:.3f} s]")
+    if args.fit_preprocessor:
+        cols = [c for c in out.columns if c not in ("date", "target")]
+        prep = Preprocessor(fill="median", scale=args.fit_preprocessor).fit(out, cols=cols)
+        print(f"Saved preprocessor: {prep.save(default_path(f'{args.outstem}_{args.task}'))}")
+    PROFILER.report()
+    rss = peak_rss_mib()
+    if rss is not None:
+        print(f"Peak RSS: {rss:.1f} MiB ({len(out)} rows, {'streamed' if args.stream else 'in-memory'})")
 
 if __name__ == "__main__":
     main()
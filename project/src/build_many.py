@@ -0,0 +1,160 @@
+# src/build_many.py
+"""
+Build supervised datasets for many locations and tasks in one run.
+
+Each location (a raw file or a raw-store location) is one job on a process pool.
+A job reads and aggregates its hourly data once, builds the shared feature frame
+once, then derives every requested task from it. Outputs are partitioned as
+
+    data/processed/<outstem>/task=<task>/location=<name>.<ext>
+
+and a per-stage timing table is printed at the end.
+"""
+from __future__ import annotations
+import argparse, glob, os, time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Sequence
+import pandas as pd
+
+from .features_weather import resample_hourly_to_daily, add_features, add_target, TASKS
+from .io_utils import FORMATS, read_csv_dt, write_table, downcast
+from .paths import ensure_dirs, PROC, STORE
+from .raw_store import RawStore
+from .validation import validate_weather_df
+
+STAGES = ("read", "validate", "resample", "features", "targets", "write")
+
+def expand_inputs(patterns: Sequence[str]) -> list[Path]:
+    paths = []
+    for pat in patterns:
+        hits = sorted(glob.glob(pat)) if glob.has_magic(pat) else [pat]
+        paths.extend(Path(h) for h in hits)
+    return list(dict.fromkeys(paths))
+
+INPUT_SUFFIXES = (".csv", ".parquet")
+COMPRESSION_SUFFIXES = (".gz", ".bz2", ".xz", ".zip", ".zst")
+
+def input_name(path: Path | str) -> str:
+    """Location name of a raw file: its file name minus known table/compression suffixes.
+    Only those are stripped, because legacy names carry coordinates with dots
+    (weather_hourly_40.7128_-74.0060_<ts>.csv)."""
+    name = Path(path).name
+    if name.lower().endswith(COMPRESSION_SUFFIXES):
+        name = name.rsplit(".", 1)[0]
+    if name.lower().endswith(INPUT_SUFFIXES):
+        name = name.rsplit(".", 1)[0]
+    return name
+
+def _read_hourly(source: str, kind: str, store_root: str) -> pd.DataFrame:
+    if kind == "store":
+        return RawStore(store_root).read([source]).drop(columns="location")
+    if source.endswith(".parquet"):
+        df = pd.read_parquet(source)
+        df["time"] = pd.to_datetime(df["time"], utc=True, errors="coerce")
+    else:
+        df = read_csv_dt(source, parse_dates=("time",), assume_utc=True)
+    return df.drop(columns="location", errors="ignore")
+
+def build_location(job: dict) -> dict:
+    """Worker: one location -> every task. Returns per-stage seconds and row counts."""
+    t = {}
+    clock = time.perf_counter()
+    def lap(stage: str) -> None:
+        nonlocal clock
+        now = time.perf_counter()
+        t[stage] = t.get(stage, 0.0) + (now - clock)
+        clock = now
+
+    dfh = _read_hourly(job["source"], job["kind"], job["store_root"]); lap("read")
+    validate_weather_df(dfh); lap("validate")
+    daily = resample_hourly_to_daily(dfh, tz=job["tz"]); lap("resample")
+    feats = add_features(daily, lags=job["lags"], windows=job["windows"]); lap("features")
+
+    rows_out = 0
+    for task in job["tasks"]:
+        out = add_target(feats, task).dropna().reset_index(drop=True)
+        if job["downcast"]:
+            out = downcast(out)
+        lap("targets")
+        stem = Path(job["outdir"]) / f"task={task}" / f"location={job['name']}"
+        for fmt in job["formats"]:
+            write_table(out, stem, fmt, compression=job["compression"])
+        rows_out += len(out)
+        lap("write")
+    return {"name": job["name"], "rows_in": len(dfh), "rows_out": rows_out, "seconds": t}
+
+def timing_table(results: list[dict]) -> pd.DataFrame:
+    secs = pd.DataFrame([r["seconds"] for r in results]).reindex(columns=STAGES).fillna(0.0)
+    table = pd.DataFrame({
+        "total_s": secs.sum(),
+        "mean_ms": secs.mean() * 1e3,
+        "max_ms": secs.max() * 1e3,
+    })
+    table["share"] = table["total_s"] / table["total_s"].sum()
+    table.loc["all stages"] = [table["total_s"].sum(), secs.sum(axis=1).mean() * 1e3,
+                               secs.sum(axis=1).max() * 1e3, 1.0]
+    return table.round({"total_s": 3, "mean_ms": 1, "max_ms": 1, "share": 3})
+
+def run(jobs: list[dict], workers: int) -> tuple[list[dict], float]:
+    t0 = time.perf_counter()
+    if workers <= 1 or len(jobs) <= 1:
+        results = [build_location(j) for j in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            results = list(ex.map(build_location, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    return results, time.perf_counter() - t0
+
+def main():
+    ap = argparse.ArgumentParser(description="Build supervised datasets for many locations/tasks on a process pool.")
+    ap.add_argument("--inputs", type=str, nargs="+", default=None,
+                    help="Raw hourly files or globs (CSV/Parquet, one location each). If omitted, uses every raw-store location.")
+    ap.add_argument("--locations", type=str, nargs="+", default=None, help="Restrict raw-store locations.")
+    ap.add_argument("--store-root", type=str, default=str(STORE))
+    ap.add_argument("--tasks", type=str, nargs="+", choices=TASKS, default=list(TASKS))
+    ap.add_argument("--timezone", type=str, default="America/New_York")
+    ap.add_argument("--lags", type=int, nargs="+", default=[1, 2, 3])
+    ap.add_argument("--windows", type=int, nargs="+", default=[3, 7, 14])
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Process pool size (1 = in-process).")
+    ap.add_argument("--format", type=str, nargs="+", choices=FORMATS, default=["parquet"])
+    ap.add_argument("--compression", type=str, default=None)
+    ap.add_argument("--no-downcast", action="store_true")
+    ap.add_argument("--outstem", type=str, default="weather_features")
+    args = ap.parse_args()
+
+    ensure_dirs()
+    if args.inputs:
+        sources = [(str(p), "file", input_name(p)) for p in expand_inputs(args.inputs)]
+        missing = [s for s, _, _ in sources if not Path(s).exists()]
+        if missing:
+            raise SystemExit(f"Input(s) not found: {missing}")
+        by_name: dict[str, list[str]] = {}
+        for src, _, name in sources:
+            by_name.setdefault(name, []).append(src)
+        clashes = {n: srcs for n, srcs in by_name.items() if len(srcs) > 1}
+        if clashes:
+            # each name is one output partition; a clash would silently overwrite
+            raise SystemExit(f"Inputs map to the same location name: {clashes}")
+    else:
+        locs = args.locations or RawStore(args.store_root).locations()
+        sources = [(loc, "store", loc) for loc in locs]
+    if not sources:
+        raise SystemExit("Nothing to build: pass --inputs or ingest into the raw store first.")
+
+    common = {
+        "store_root": args.store_root, "tz": args.timezone, "lags": args.lags, "windows": args.windows,
+        "tasks": list(dict.fromkeys(args.tasks)), "formats": list(dict.fromkeys(args.format)),
+        "compression": args.compression, "downcast": not args.no_downcast,
+        "outdir": str(PROC / args.outstem),
+    }
+    jobs = [{"source": s, "kind": k, "name": n, **common} for s, k, n in sources]
+    results, wall = run(jobs, args.workers)
+
+    rows_in = sum(r["rows_in"] for r in results)
+    print(timing_table(results).to_string())
+    print(f"\n{len(jobs)} location(s) x {len(common['tasks'])} task(s) with {args.workers} worker(s): "
+          f"{wall:.2f} s wall, {len(jobs) / wall:.1f} locations/s, {rows_in / wall / 1e6:.2f} M hourly rows/s")
+    print(f"Saved under: {common['outdir']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# src/cli.py
+"""
+One entry point for the project scripts (`alias weather="python -m src"`):
+
+    python -m src ingest --locations locations.csv --workers 8
+    python -m src backfill --locations locations.csv --start 2015-01-01 --workers 4
+    python -m src build --task clf_rain10_nextday --format parquet
+    python -m src build-many --workers 8
+    python -m src summarize
+    python -m src store info
+    python -m src http serve --port 8765
+    python -m src bench suite run --sizes 10x1 100x1
+
+Each subcommand is the existing script's own argparse `main`. Its module is imported
+only when dispatched, so `python -m src --help` starts without pandas, and only
+`ingest`/`summarize` load requests. matplotlib is loaded only by the plotting helpers.
+"""
+from __future__ import annotations
+import importlib, pkgutil, sys
+from pathlib import Path
+from typing import Optional, Sequence
+
+# subcommand -> (module, summary)
+COMMANDS = {
+    "ingest": ("ingest_open_meteo", "Fetch Open-Meteo forecasts into the raw store."),
+    "build": ("build_dataset", "Build one supervised dataset from raw hourly data."),
+    "build-many": ("build_many", "Build datasets for many locations/tasks on a process pool."),
+    "backfill": ("backfill", "Backfill multi-year history from the archive API into the raw store."),
+    "daemon": ("daemon", "Resident scheduled ingestion with an in-memory summary query API."),
+    "summarize": ("pipeline", "Fetch the 7-day forecast and write the daily summary."),
+    "store": ("raw_store", "Inspect, compact or import into the partitioned raw store."),
+    "http": ("http_cache", "Inspect/clear the response cache or serve recorded fixtures."),
+    "bench": (None, "Run a benchmark: bench <name> [args] (see `bench --help`)."),
+}
+
+def bench_names() -> list[str]:
+    # runnable modules of the bench package, found without importing them
+    path = Path(__file__).with_name("bench")
+    return sorted(m.name for m in pkgutil.iter_modules([str(path)])
+                  if "\ndef main(" in (path / f"{m.name}.py").read_text())
+
+def usage() -> str:
+    lines = ["usage: weather <command> [args...]", "", "commands:"]
+    lines += [f"  {name:<11} {summary}" for name, (_, summary) in COMMANDS.items()]
+    lines += ["", "Run `weather <command> --help` for the command's options."]
+    return "\n".join(lines)
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return
+    cmd, rest = argv[0], argv[1:]
+    if cmd not in COMMANDS:
+        print(usage(), file=sys.stderr)
+        raise SystemExit(f"\nweather: unknown command {cmd!r}")
+
+    module, prog = COMMANDS[cmd][0], f"weather {cmd}"
+    if cmd == "bench":
+        names = bench_names()
+        if not rest or rest[0] in ("-h", "--help"):
+            print(f"usage: weather bench <name> [args...]\n\nbenchmarks: {', '.join(names)}")
+            return
+        if rest[0] not in names:
+            raise SystemExit(f"weather bench: unknown benchmark {rest[0]!r} (choose from {', '.join(names)})")
+        module, prog, rest = f"bench.{rest[0]}", f"weather bench {rest[0]}", rest[1:]
+
+    mod = importlib.import_module(f".{module}", __package__)
+    # the scripts parse sys.argv themselves
+    sys.argv = [prog, *rest]
+    mod.main()
+
+if __name__ == "__main__":
+    main()
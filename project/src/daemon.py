@@ -0,0 +1,318 @@
+# src/daemon.py
+"""
+Resident ingestion service: polls Open-Meteo for every configured location on a
+schedule, keeps each site's latest forecast window in memory and writes only the
+hours that changed since the previous poll.
+
+    python -m src daemon --locations locations.csv --interval 900 --query-port 8780
+    curl 'localhost:8780/summary?location=40.7128_-74.0060'
+
+Each site holds an `HourlyRing`: flat NumPy arrays indexed by hour % capacity, so
+a poll is diffed against the previous one with a few vector comparisons, without
+re-reading the store. The daily summary (hottest / wettest day, as printed by
+`pipeline.main`) is recomputed per site when its window changes; `summary()`
+returns that cached result, so queries take microseconds. The optional query port
+serves the same summaries as JSON to other processes.
+
+The rings are keyed by UTC hour, the same keys `weather ingest` writes to the raw
+store. The API's wall clock is converted using each response's `utc_offset_seconds`.
+Summary days are local days of that offset.
+"""
+from __future__ import annotations
+import argparse, asyncio, json, os, signal, time
+import datetime as dt
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+import numpy as np
+import pandas as pd
+
+from .hourly_columns import NS_PER_HOUR, decode_hourly
+from .http_cache import ENV_MODE, HTTP_CACHE, add_http_args, configure_http
+from .ingest_open_meteo import FORECAST_URL, fetch_open_meteo, load_locations, make_session
+from .paths import STORE
+from .raw_store import RawStore, location_key
+
+MEASURES = ("temperature_2m", "precipitation")
+SUMMARY_DAYS = 7
+
+class HourlyRing:
+    """Fixed-capacity hourly window in flat arrays; hour h lives in slot h % capacity."""
+    __slots__ = ("capacity", "hours", "values", "first", "last")
+
+    def __init__(self, capacity: int, n_measures: int = len(MEASURES)):
+        self.capacity = capacity
+        self.hours = np.full(capacity, -1, dtype=np.int64)
+        self.values = np.full((n_measures, capacity), np.nan)
+        self.first: Optional[int] = None
+        self.last: Optional[int] = None
+
+    def update(self, hours: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Store a poll (sorted hours, values shaped (measures, n)); True where an hour is new or changed."""
+        if len(hours) > self.capacity:
+            hours, values = hours[-self.capacity:], values[:, -self.capacity:]
+        slots = hours % self.capacity
+        old = self.values[:, slots]
+        same = ((old == values) | (np.isnan(old) & np.isnan(values))).all(axis=0)
+        changed = ~(same & (self.hours[slots] == hours))
+        self.hours[slots] = hours
+        self.values[:, slots] = values
+        if len(hours):
+            self.first, self.last = int(hours[0]), int(hours[-1])
+        return changed
+
+    def window(self) -> tuple[np.ndarray, np.ndarray]:
+        """(hours, values) of the latest polled range, in time order (gaps dropped)."""
+        if self.first is None:
+            return np.empty(0, dtype=np.int64), self.values[:, :0]
+        hours = np.arange(self.first, self.last + 1, dtype=np.int64)
+        slots = hours % self.capacity
+        keep = self.hours[slots] == hours
+        return hours[keep], self.values[:, slots[keep]]
+
+
+def _tz_offset(timezone: str) -> int:
+    """Current UTC offset (s) of a timezone name; 0 for names only the API knows (e.g. "auto")."""
+    try:
+        return int(pd.Timestamp.now(tz=timezone).utcoffset().total_seconds())
+    except (KeyError, ValueError):  # unknown zone names raise KeyError subclasses
+        return 0
+
+def daily_summary(hours: np.ndarray, values: np.ndarray, days: int = SUMMARY_DAYS,
+                  utc_offset: int = 0) -> Optional[dict]:
+    """Per-day max temperature / precipitation sum and the hottest and wettest of the first `days`
+    local days (UTC hours shifted by `utc_offset` seconds)."""
+    if not len(hours):
+        return None
+    day = (hours * 3600 + utc_offset) // 86400
+    starts = np.flatnonzero(np.r_[True, day[1:] != day[:-1]])[:days]
+    end = starts[-1] + np.count_nonzero(day == day[starts[-1]])
+    temp, precip = values[0, :end], values[1, :end]
+    tmax = np.fmax.reduceat(temp, starts)
+    psum = np.add.reduceat(np.nan_to_num(precip), starts)
+    dates = [str(np.datetime64(int(d), "D")) for d in day[starts]]
+    out = {"days": dates, "temp_max": tmax.tolist(), "precip_sum": psum.tolist(), "hottest": None,
+           "wettest": {"date": dates[int(np.argmax(psum))], "precip_sum": float(psum.max())}}
+    if not np.isnan(tmax).all():
+        i = int(np.nanargmax(tmax))
+        out["hottest"] = {"date": dates[i], "temp_max": float(tmax[i])}
+    return out
+
+
+class IngestDaemon:
+    def __init__(self, locations: pd.DataFrame, timezone: str = "America/New_York", forecast_days: int = 7,
+                 interval: float = 3600.0, url: str = FORECAST_URL, batch_size: int = 50,
+                 concurrency: int = 4, retries: int = 5, store: Optional[RawStore] = None):
+        self.locations = locations.reset_index(drop=True)
+        self.timezone, self.forecast_days, self.interval = timezone, forecast_days, interval
+        self.url, self.batch_size, self.concurrency, self.retries = url, batch_size, concurrency, retries
+        self.store = store or RawStore()
+        # one spare day so a window that has slid by a day still diffs against the last poll
+        cap = (forecast_days + 1) * 24
+        self.rings = {name: HourlyRing(cap) for name in self.locations["location"]}
+        self._summaries: dict[str, dict] = {}
+        # per-site offset of the API's wall clock; until the first poll, the timezone's current one
+        self._utc_offsets = dict.fromkeys(self.rings, _tz_offset(timezone))
+        self.stats = {"polls": 0, "requests": 0, "errors": 0, "rows_fetched": 0,
+                      "rows_changed": 0, "rows_written": 0, "last_poll": None, "last_poll_s": None}
+        self._stop = asyncio.Event()
+
+    # ---------- Query API ----------
+    def summary(self, location: str) -> Optional[dict]:
+        """Cached daily summary of a site (None before its first poll). Treat as read-only."""
+        return self._summaries.get(location)
+
+    def summaries(self) -> dict[str, dict]:
+        return self._summaries
+
+    def hourly(self, location: str) -> pd.DataFrame:
+        hours, values = self.rings[location].window()
+        df = pd.DataFrame({m: values[i] for i, m in enumerate(MEASURES)})
+        df.insert(0, "time", pd.to_datetime(hours.astype("datetime64[h]"), utc=True))
+        return df
+
+    # ---------- Ingest ----------
+    def warm(self) -> int:
+        """Fill the rings from the store so the first poll only writes real changes."""
+        since = pd.Timestamp(dt.date.today() - dt.timedelta(days=1), tz="UTC")
+        df = self.store.read(list(self.rings), start=since, columns=list(MEASURES))
+        for loc, g in df.groupby("location", sort=False):
+            hours = g["time"].dt.tz_localize(None).to_numpy("datetime64[h]").astype(np.int64)
+            self._apply(loc, hours, g[list(MEASURES)].to_numpy(np.float64).T)
+        return len(df)
+
+    def _apply(self, loc: str, hours: np.ndarray, values: np.ndarray,
+               utc_offset: Optional[int] = None) -> np.ndarray:
+        changed = self.rings[loc].update(hours, values)
+        moved = utc_offset is not None and utc_offset != self._utc_offsets[loc]
+        if moved:
+            self._utc_offsets[loc] = utc_offset
+        if changed.any() or moved or loc not in self._summaries:
+            self._summaries[loc] = daily_summary(*self.rings[loc].window(), utc_offset=self._utc_offsets[loc])
+        return changed
+
+    def _fetch(self, session, chunk: pd.DataFrame):
+        body = fetch_open_meteo(chunk["latitude"].tolist(), chunk["longitude"].tolist(), self.timezone,
+                                self.forecast_days, session=session, url=self.url, raw=True)
+        offsets, times, values, utc_offsets = decode_hourly(body, MEASURES, to_utc=True)
+        if len(offsets) - 1 != len(chunk):
+            raise RuntimeError(f"expected {len(chunk)} locations in response, got {len(offsets) - 1}")
+        return offsets, times // NS_PER_HOUR, np.vstack([values[m] for m in MEASURES]), utc_offsets
+
+    async def poll(self, session) -> dict:
+        """Fetch every location once, diff against the rings and persist the changed hours."""
+        t0 = time.perf_counter()
+        sem = asyncio.Semaphore(self.concurrency)
+        chunks = [self.locations.iloc[i:i + self.batch_size] for i in range(0, len(self.locations), self.batch_size)]
+
+        async def one(chunk: pd.DataFrame):
+            async with sem:
+                return chunk, await asyncio.to_thread(self._fetch, session, chunk)
+
+        fetched, changed_parts = 0, []
+        for res in await asyncio.gather(*(one(c) for c in chunks), return_exceptions=True):
+            self.stats["requests"] += 1
+            if isinstance(res, BaseException):
+                self.stats["errors"] += 1
+                print(f"[daemon] fetch failed: {res}")
+                continue
+            chunk, (offsets, all_hours, all_values, utc_offsets) = res
+            for loc, lo, hi, utc_offset in zip(chunk["location"], offsets[:-1], offsets[1:], utc_offsets):
+                hours, values = all_hours[lo:hi], all_values[:, lo:hi]
+                fetched += len(hours)
+                mask = self._apply(loc, hours, values, int(utc_offset))
+                if mask.any():
+                    changed_parts.append((loc, hours[mask], values[:, mask]))
+
+        written = 0
+        n_changed = sum(len(p[1]) for p in changed_parts)
+        if changed_parts:
+            df = pd.DataFrame({
+                "location": np.repeat([p[0] for p in changed_parts], [len(p[1]) for p in changed_parts]),
+                "time": pd.to_datetime(np.concatenate([p[1] for p in changed_parts]).astype("datetime64[h]"), utc=True),
+                **{m: np.concatenate([p[2][i] for p in changed_parts]) for i, m in enumerate(MEASURES)},
+            })
+            written = (await asyncio.to_thread(self.store.upsert, df))["rows_written"]
+
+        wall = time.perf_counter() - t0
+        self.stats["polls"] += 1
+        self.stats["rows_fetched"] += fetched
+        self.stats["rows_changed"] += n_changed
+        self.stats["rows_written"] += written
+        self.stats["last_poll"] = dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds")
+        self.stats["last_poll_s"] = round(wall, 3)
+        return {"rows": fetched, "changed": n_changed, "written": written, "wall_s": wall}
+
+    async def run(self, iterations: Optional[int] = None) -> None:
+        """Poll every `interval` seconds (measured from poll start) until stopped."""
+        session = make_session(pool_size=self.concurrency, retries=self.retries)
+        try:
+            n = 0
+            while not self._stop.is_set():
+                started = time.monotonic()
+                res = await self.poll(session)
+                n += 1
+                print(f"[daemon] poll {n}: {res['rows']:,} hours from {len(self.rings)} site(s), "
+                      f"{res['changed']:,} changed, {res['written']:,} written in {res['wall_s']:.2f}s")
+                if iterations is not None and n >= iterations:
+                    break
+                delay = max(0.0, self.interval - (time.monotonic() - started))
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            session.close()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    # ---------- Query server ----------
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            line = (await reader.readline()).decode("latin-1").split()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass  # headers are not needed
+            parts = urlsplit(line[1] if len(line) > 1 else "/")
+            q = parse_qs(parts.query)
+            status, body = 200, None
+            if parts.path == "/summary":
+                if "location" in q:
+                    loc = q["location"][0]
+                    body = self.summary(loc)
+                    if body is None:
+                        status, body = 404, {"error": f"no data for location {loc!r}"}
+                else:
+                    body = self._summaries
+            elif parts.path == "/health":
+                body = {"sites": len(self.rings), **self.stats}
+            else:
+                status, body = 404, {"error": "use /summary[?location=...] or /health"}
+            data = json.dumps(body).encode()
+            writer.write(f"HTTP/1.1 {status} {'OK' if status == 200 else 'Not Found'}\r\n"
+                         f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                         f"Connection: close\r\n\r\n".encode() + data)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8780):
+        return await asyncio.start_server(self._handle, host, port)
+
+
+async def _main(args, locs: pd.DataFrame) -> None:
+    d = IngestDaemon(locs, args.timezone, args.days, args.interval, args.url, args.batch_size,
+                     args.concurrency, args.retries, RawStore(args.store))
+    if not args.no_warm:
+        print(f"[daemon] warmed from store: {d.warm():,} hours")
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, d.stop)
+        except (NotImplementedError, RuntimeError):  # Windows
+            pass
+    server = None
+    if args.query_port:
+        server = await d.serve(args.query_host, args.query_port)
+        print(f"[daemon] query API on http://{args.query_host}:{args.query_port}/summary")
+    try:
+        await d.run(args.iterations)
+    finally:
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+    print(f"[daemon] stopped after {d.stats['polls']} poll(s): {d.stats['rows_fetched']:,} hours fetched, "
+          f"{d.stats['rows_written']:,} written, {d.stats['errors']} error(s)")
+    print(HTTP_CACHE.summary())
+
+def main():
+    ap = argparse.ArgumentParser(description="Poll Open-Meteo on a schedule and persist only changed hours.")
+    ap.add_argument("--locations", type=str, default=None, help="CSV of locations (location, latitude, longitude).")
+    ap.add_argument("--lat", type=float, default=float(os.getenv("LAT", "40.7128")))
+    ap.add_argument("--lon", type=float, default=float(os.getenv("LON", "-74.0060")))
+    ap.add_argument("--timezone", type=str, default=os.getenv("TIMEZONE", "America/New_York"))
+    ap.add_argument("--days", type=int, default=7, help="Forecast days per poll.")
+    ap.add_argument("--interval", type=float, default=3600.0, help="Seconds between poll starts.")
+    ap.add_argument("--iterations", type=int, default=None, help="Stop after N polls (default: run until signalled).")
+    ap.add_argument("--batch-size", type=int, default=50, help="Coordinates per request.")
+    ap.add_argument("--concurrency", type=int, default=4, help="Requests in flight.")
+    ap.add_argument("--retries", type=int, default=5)
+    ap.add_argument("--url", type=str, default=FORECAST_URL)
+    ap.add_argument("--store", type=str, default=str(STORE))
+    ap.add_argument("--no-warm", action="store_true", help="Do not preload the current window from the store.")
+    ap.add_argument("--query-host", type=str, default="127.0.0.1")
+    ap.add_argument("--query-port", type=int, default=0, help="Serve summaries as JSON on this port (0: off).")
+    add_http_args(ap)
+    args = ap.parse_args()
+    configure_http(args)
+    if args.http_cache is None and not os.getenv(ENV_MODE):
+        HTTP_CACHE.configure(mode="off")  # the rings already dedupe; record/replay stay available
+
+    if args.locations:
+        locs = load_locations(args.locations)
+    else:
+        locs = pd.DataFrame({"location": [location_key(args.lat, args.lon)],
+                             "latitude": [args.lat], "longitude": [args.lon]})
+    asyncio.run(_main(args, locs))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# src/feature_cache.py
+"""
+Content-addressed cache for build_dataset intermediates.
+
+Entries are Parquet files named by a SHA-256 of (kind, raw data id, params), so a
+changed raw file or feature setting simply misses. Reads touch the file's mtime;
+`put` evicts least-recently-used entries once the directory exceeds `max_bytes`.
+"""
+from __future__ import annotations
+import hashlib, json, os
+from pathlib import Path
+from typing import Optional
+import pandas as pd
+
+from .paths import CACHE
+
+SCHEMA = 1  # bump when feature definitions change
+
+def file_digest(path: Path | str, block: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        while chunk := fh.read(block):
+            h.update(chunk)
+    return h.hexdigest()
+
+def store_digest(manifest: dict, location: str, start=None, end=None) -> str:
+    """Identify a raw-store slice by its manifest entry (part names are unique per write)."""
+    rec = manifest["locations"].get(location, {})
+    payload = {"location": location, "start": start, "end": end,
+               "parts": {m: e["parts"] for m, e in sorted(rec.get("partitions", {}).items())}}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+class FeatureCache:
+    def __init__(self, root: Path | str = CACHE, max_bytes: int = 512 * 2**20):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(kind: str, raw_id: str, **params) -> str:
+        payload = {"schema": SCHEMA, "kind": kind, "raw": raw_id, **params}
+        return f"{kind}-" + hashlib.sha256(json.dumps(payload, sort_keys=True, default=list).encode()).hexdigest()[:32]
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        import pyarrow as pa
+        p = self.root / f"{key}.parquet"
+        try:
+            df = pd.read_parquet(p)
+        except FileNotFoundError:
+            return None
+        except (OSError, pa.ArrowException):
+            # truncated or corrupt entry (ArrowInvalid, bad footer): drop it so the caller rebuilds
+            p.unlink(missing_ok=True)
+            return None
+        os.utime(p)  # LRU recency
+        return df
+
+    def put(self, key: str, df: pd.DataFrame) -> Path:
+        self.root.mkdir(parents=True, exist_ok=True)
+        p = self.root / f"{key}.parquet"
+        tmp = p.with_suffix(".tmp")
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, p)
+        self.evict(keep=p)
+        return p
+
+    def evict(self, keep: Optional[Path] = None) -> int:
+        """Delete least-recently-used entries until the cache fits max_bytes."""
+        entries = [(e.stat().st_mtime, e.stat().st_size, e) for e in self.root.glob("*.parquet")]
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, e in sorted(entries, key=lambda t: t[0]):
+            if total <= self.max_bytes:
+                break
+            if e == keep:
+                continue
+            e.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
@@ -1,17 +1,197 @@
 from __future__ import annotations
+from typing import Mapping, Optional, Sequence, Tuple
+import numpy as np
 import pandas as pd
 
-def resample_hourly_to_daily(df_hourly: pd.DataFrame, tz: str = "America/New_York") -> pd.DataFrame:
-    df = df_hourly.copy()
-    df["time"] = pd.to_datetime(df["time"], utc=True, errors="coerce")
-    df = df.dropna(subset=["time"]).set_index("time").sort_index()
+DAY_NS = 86_400 * 10**9
+
+# output column -> (hourly source column, statistic)
+DAILY_SPEC: Mapping[str, Tuple[str, str]] = {
+    "temp_max_c": ("temperature_2m", "max"),
+    "temp_min_c": ("temperature_2m", "min"),
+    "temp_mean_c": ("temperature_2m", "mean"),
+    "precip_mm": ("precipitation", "sum"),
+}
+STATS = ("max", "min", "mean", "sum", "count")
+
+def _local_day(time, tz: Optional[str]) -> np.ndarray:
+    """Local calendar day number (days since epoch) per timestamp; NaT -> -2**63."""
+    if not pd.api.types.is_datetime64_any_dtype(time):
+        time = pd.to_datetime(time, utc=True, errors="coerce")
+    idx = pd.DatetimeIndex(time)
     if tz:
-        df = df.tz_convert(tz)
-    daily = pd.DataFrame({
-        "temp_max_c": df["temperature_2m"].resample("D").max(),
-        "temp_min_c": df["temperature_2m"].resample("D").min(),
-        "temp_mean_c": df["temperature_2m"].resample("D").mean(),
-        "precip_mm":  df["precipitation"].resample("D").sum(),
-    }).reset_index().rename(columns={"time": "date"})
-    daily["date"] = daily["date"].dt.tz_localize(None)
-    return daily
\ No newline at end of file
+        idx = (idx.tz_localize("UTC") if idx.tz is None else idx).tz_convert(tz)
+    if idx.tz is not None:
+        idx = idx.tz_localize(None)  # wall clock, so DST days are 23/25 hours
+    ns = idx.as_unit("ns").asi8
+    nat = idx.isna()
+    days = np.floor_divide(ns, DAY_NS)
+    days[nat] = np.iinfo(np.int64).min
+    return days
+
+def aggregate_daily(
+    df_hourly: pd.DataFrame,
+    tz: Optional[str] = "America/New_York",
+    spec: Mapping[str, Tuple[str, str]] = DAILY_SPEC,
+    by: Optional[str] = None,
+    fill_gaps: bool = True,
+) -> pd.DataFrame:
+    """
+    Daily statistics for every (by, local day) group in one grouped pass.
+
+    Works on NumPy views of the needed columns (no frame copy). The group key is
+    computed once; when input is already ordered by (by, time) no sort is done and
+    each statistic is a single `reduceat` over contiguous runs. NaNs are skipped
+    (sum of an all-NaN day is 0, like `resample().sum()`).
+
+    Returns [by?, date, *spec] sorted by (by, date). With fill_gaps, days missing
+    inside each group's range are emitted (NaN stats, 0 sum) as `resample("D")` does.
+    """
+    for out_col, (src, stat) in spec.items():
+        if stat not in STATS:
+            raise ValueError(f"unknown statistic '{stat}' for '{out_col}'")
+    lead = [by] if by else []
+    if df_hourly.empty:
+        return pd.DataFrame(columns=[*lead, "date", *spec])
+
+    days = _local_day(df_hourly["time"], tz)
+    valid = days != np.iinfo(np.int64).min
+    if by:
+        codes, uniques = pd.factorize(df_hourly[by], sort=True)
+        codes = codes.astype(np.int64, copy=False)
+        valid &= codes >= 0
+    else:
+        codes, uniques = np.zeros(len(days), dtype=np.int64), None
+
+    sel = None if valid.all() else np.flatnonzero(valid)
+    if sel is not None:
+        days, codes = days[sel], codes[sel]
+    if len(days) == 0:
+        return pd.DataFrame(columns=[*lead, "date", *spec])
+    d0 = days.min()
+    span = int(days.max() - d0) + 1
+    # key = code * span + (day - d0), built in place to keep peak memory down
+    key = codes
+    key *= span
+    key += days
+    key -= d0
+    days = None
+
+    order = None
+    if len(key) > 1 and (key[1:] < key[:-1]).any():
+        order = np.argsort(key, kind="stable")
+        key = key[order]
+    starts = np.concatenate(([0], np.flatnonzero(key[1:] != key[:-1]) + 1))
+    gkey = key[starts]
+
+    def column(src: str) -> np.ndarray:
+        s = df_hourly[src]
+        a = s.to_numpy() if s.dtype == np.float64 else s.to_numpy(dtype=np.float64, na_value=np.nan)
+        if sel is not None:
+            a = a[sel]
+        return a if order is None else a[order]
+
+    # per source: values, NaN mask, NaN-zeroed values, non-NaN counts (computed lazily)
+    cache: dict = {}
+    def stat(src: str, name: str) -> np.ndarray:
+        c = cache.setdefault(src, {})
+        if "x" not in c:
+            c["x"] = column(src)
+            c["nan"] = np.isnan(c["x"])
+        if name in ("sum", "mean", "count") and "count" not in c:
+            c["count"] = np.add.reduceat(~c["nan"], starts).astype(np.float64)
+            c["sum"] = np.add.reduceat(np.where(c["nan"], 0.0, c["x"]), starts)
+        if name == "max":
+            return np.fmax.reduceat(c["x"], starts)
+        if name == "min":
+            return np.fmin.reduceat(c["x"], starts)
+        if name == "mean":
+            with np.errstate(invalid="ignore", divide="ignore"):
+                return np.where(c["count"] > 0, c["sum"] / c["count"], np.nan)
+        return c[name]
+
+    gloc, gday = gkey // span, gkey % span
+    if fill_gaps:
+        # each group gets a contiguous block covering its first..last day
+        first = np.concatenate(([True], gloc[1:] != gloc[:-1]))
+        bstart = np.flatnonzero(first)
+        lo = gday[bstart]
+        hi = np.append(gday[bstart[1:] - 1], gday[-1])
+        size = hi - lo + 1
+        offset = np.concatenate(([0], np.cumsum(size)[:-1]))
+        block = np.cumsum(first) - 1
+        pos = offset[block] + gday - lo[block]
+        n_out = int(size.sum())
+        out_loc = np.repeat(gloc[bstart], size)
+        out_day = np.repeat(lo - offset, size) + np.arange(n_out)
+    else:
+        pos, n_out, out_loc, out_day = None, len(gkey), gloc, gday
+
+    out = {}
+    if by:
+        out[by] = uniques.take(out_loc)
+    out["date"] = ((out_day + d0) * DAY_NS).astype("datetime64[ns]")
+    for out_col, (src, name) in spec.items():
+        vals = stat(src, name)
+        if pos is not None:
+            full = np.full(n_out, 0.0 if name in ("sum", "count") else np.nan)
+            full[pos] = vals
+            vals = full
+        out[out_col] = vals
+    return pd.DataFrame(out)
+
+def resample_hourly_to_daily(df_hourly: pd.DataFrame, tz: str = "America/New_York",
+                             by: Optional[str] = None) -> pd.DataFrame:
+    return aggregate_daily(df_hourly, tz=tz, by=by, fill_gaps=True)
+
+# ---------- Features & targets ----------
+BASE_COLS = ("temp_max_c", "temp_mean_c", "precip_mm")
+ROLL_COLS = ("temp_max_c", "precip_mm")
+ROLL_FUNCS = ("mean", "max", "sum")
+TASKS = ("reg_temp_max_nextday", "clf_rain10_nextday")
+
+def add_calendar_features(daily: pd.DataFrame) -> pd.DataFrame:
+    d = pd.to_datetime(daily["date"])
+    return daily.assign(
+        dow=d.dt.dayofweek.astype(np.int64),
+        month=d.dt.month.astype(np.int64),
+        doy=d.dt.dayofyear.astype(np.int64),
+        is_weekend=(d.dt.dayofweek >= 5).astype(np.int64),
+    )
+
+def add_lags(daily: pd.DataFrame, cols: Sequence[str], lags: Sequence[int]) -> pd.DataFrame:
+    """`{col}_lag{k}` = value k days earlier (rows must be consecutive days)."""
+    new = {f"{c}_lag{k}": daily[c].shift(k) for c in cols for k in lags}
+    return daily.assign(**new)
+
+def add_rollings(daily: pd.DataFrame, cols: Sequence[str], windows: Sequence[int],
+                 funcs: Sequence[str] = ROLL_FUNCS) -> pd.DataFrame:
+    """`{col}_roll{w}_{f}` over the trailing w days including today (NaN until w values exist)."""
+    new = {}
+    for c in cols:
+        for w in windows:
+            r = daily[c].rolling(w, min_periods=w)
+            for f in funcs:
+                new[f"{c}_roll{w}_{f}"] = getattr(r, f)()
+    return daily.assign(**new)
+
+def make_regression_target(daily: pd.DataFrame, base_col: str = "temp_max_c", horizon: int = 1) -> pd.DataFrame:
+    return daily.assign(target=daily[base_col].shift(-horizon))
+
+def make_rain_label(daily: pd.DataFrame, threshold_mm: float = 10.0, horizon: int = 1) -> pd.DataFrame:
+    fut = daily["precip_mm"].shift(-horizon)
+    return daily.assign(target=np.where(fut.isna(), np.nan, (fut >= threshold_mm).astype(np.float64)))
+
+def add_features(daily: pd.DataFrame, lags: Sequence[int] = (1, 2, 3),
+                 windows: Sequence[int] = (3, 7, 14)) -> pd.DataFrame:
+    """Calendar + lag + rolling features as used by build_dataset."""
+    daily = add_calendar_features(daily)
+    daily = add_lags(daily, cols=BASE_COLS, lags=lags)
+    return add_rollings(daily, cols=ROLL_COLS, windows=windows, funcs=ROLL_FUNCS)
+
+def add_target(daily: pd.DataFrame, task: str) -> pd.DataFrame:
+    if task == "reg_temp_max_nextday":
+        return make_regression_target(daily, base_col="temp_max_c", horizon=1)
+    if task == "clf_rain10_nextday":
+        return make_rain_label(daily, threshold_mm=10.0, horizon=1)
+    raise ValueError(f"unknown task '{task}' (expected one of {TASKS})")
@@ -0,0 +1,215 @@
+# src/hourly_columns.py
+"""
+Columnar decoding of Open-Meteo hourly responses.
+
+The old `to_hourly_df` built a frame from the decoded JSON lists, then ran
+`pd.to_datetime` over every ISO string. This module decodes the hourly block
+straight into typed arrays instead:
+
+- timestamps are parsed by one vectorized NumPy cast. A raw span of fixed-width
+  stamps is viewed in place as a bytes array, with no per-stamp Python objects.
+  Every stamp is read, so duplicated or missing hours keep their real labels.
+  Unreadable stamps fall back to pandas and become NaT;
+- each measure becomes a float64 array, with null stored as NaN. Raw spans go
+  through Arrow's CSV number parser;
+- multi-location responses fill one preallocated array per column, so a batch of
+  sites becomes one frame with no per-site frames and no concat;
+- with `utc` the API's wall-clock stamps are shifted back by the response's
+  `utc_offset_seconds`. Everything written to the raw store is true UTC.
+
+Given the raw response bytes (`HTTP_CACHE.get`), the large arrays never pass
+through `json.loads`: each hourly array is located in the body and parsed from
+there. Already-decoded dicts (`HTTP_CACHE.get_json`) take the same path, minus
+that step.
+
+    python -m src.bench.parse --hours 1000000
+"""
+from __future__ import annotations
+import json, re, warnings
+from typing import Optional, Sequence, Union
+import numpy as np
+import pandas as pd
+
+HOURLY = ("temperature_2m", "precipitation")
+NS_PER_HOUR = 3_600_000_000_000
+
+Payload = Union[bytes, dict, list]
+
+# Open-Meteo writes flat arrays of numbers or ISO strings inside "hourly": no nesting
+# and no escaped quotes, so the end of a block or array is the next "}" or "]".
+_HOURLY = re.compile(rb'"hourly"\s*:\s*\{')
+_KEY = re.compile(rb'"([^"]+)"\s*:\s*\[')
+_UTC_OFFSET = re.compile(rb'"utc_offset_seconds"\s*:\s*(-?\d+)')
+_TOKEN = re.compile(rb'"(?:[^"\\]|\\.)*"|[{}]')  # a JSON string, or a brace outside one
+
+# ---------- Locate ----------
+def _object_end(body: bytes, pos: int) -> int:
+    """Index just past the "}" closing the object that `pos` is inside (strings skipped)."""
+    depth = 1
+    for t in _TOKEN.finditer(body, pos):
+        tok = t.group()
+        if tok == b"{":
+            depth += 1
+        elif tok == b"}":
+            depth -= 1
+            if depth == 0:
+                return t.end()
+    return len(body)
+
+def _raw_blocks(body: bytes) -> list[tuple[dict, int]]:
+    blocks, pos = [], 0
+    while True:
+        m = _HOURLY.search(body, pos)
+        if m is None:
+            return blocks
+        end = body.find(b"}", m.end())
+        arrays, k_pos = {}, m.end()
+        while True:
+            k = _KEY.search(body, k_pos, end)
+            if k is None:
+                break
+            close = body.find(b"]", k.end(), end)
+            arrays[k.group(1).decode()] = body[k.end():close]
+            k_pos = close + 1  # jump over the array instead of scanning it
+        # the location object runs from the previous one's end to the "}" closing it; its
+        # utc_offset_seconds may sit on either side of "hourly" (the small metadata is scanned,
+        # the arrays are not)
+        obj_end = _object_end(body, end + 1)
+        off = _UTC_OFFSET.search(body, pos, m.start()) or _UTC_OFFSET.search(body, end, obj_end)
+        blocks.append((arrays, int(off.group(1)) if off else 0))
+        pos = obj_end
+
+def _blocks(js: Payload) -> list[tuple[dict, int]]:
+    """Per location: (hourly key → list (decoded JSON) or bytes span (raw body), utc offset s)."""
+    if isinstance(js, (bytes, bytearray, memoryview)):
+        return _raw_blocks(bytes(js))
+    if isinstance(js, dict):
+        js = [js]
+    return [(j.get("hourly", {}), int(j.get("utc_offset_seconds") or 0)) for j in js]
+
+def _length(v) -> int:
+    if isinstance(v, list):
+        return len(v)
+    return v.count(b",") + 1 if v.strip() else 0
+
+def _items(v) -> list:
+    return v if isinstance(v, list) else json.loads(b"[" + v + b"]")
+
+# ---------- Decode ----------
+def _stride(v: bytes, n: int) -> tuple[int, int]:
+    """(stride, item length) if the n items of a raw span are fixed width, else (0, 0)."""
+    j = v.find(b",")
+    if j < 0:
+        j = len(v)
+    k = j + 1
+    while k < len(v) and v[k] in b" \t\r\n":
+        k += 1
+    return (k, j) if len(v) == (n - 1) * k + j else (0, 0)
+
+def _stamps(v, n: int) -> np.ndarray:
+    """All n stamps as datetime64; ValueError/TypeError if any is not plain ISO or unix seconds."""
+    if not isinstance(v, list):
+        stride, width = _stride(v, n)
+        if stride and width > 2 and v[:1] == b'"':
+            # item i sits at i * stride: view the span as (quote, stamp, quote, separator) records
+            cells = np.frombuffer(v + b"," * (n * stride - len(v)), dtype=[
+                ("q0", "S1"), ("stamp", f"S{width - 2}"), ("q1", "S1"), ("sep", f"V{stride - width}")])
+            if (cells["q0"] != b'"').any() or (cells["q1"] != b'"').any():
+                raise ValueError("stamps are not fixed-width strings")
+            return cells["stamp"].astype("datetime64[s]")
+        v = _items(v)
+    if v and isinstance(v[0], (int, float)):
+        return np.asarray(v, dtype=np.int64).astype("datetime64[s]")
+    return np.array(v, dtype="datetime64[s]")
+
+def _fill_times(out: np.ndarray, v) -> None:
+    """Write ns-since-epoch stamps into `out`."""
+    n = len(out)
+    if n == 0:
+        return
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")  # NumPy only warns on "Z"/offset stamps; leave those to pandas
+            out[:] = _stamps(v, n).astype("datetime64[ns]").view(np.int64)
+        return
+    except (ValueError, TypeError, Warning):
+        pass
+    # unreadable or zoned stamps: pandas parses what it can, the rest become NaT
+    items = _items(v)
+    unit = "s" if any(isinstance(x, (int, float)) for x in items[:1]) else None
+    stamps = pd.to_datetime(pd.Series(items, dtype=object), errors="coerce", utc=True, unit=unit)
+    out[:] = stamps.dt.tz_localize(None).to_numpy("datetime64[ns]").view(np.int64)
+
+def _arrow_floats(v: bytes) -> Optional[np.ndarray]:
+    """A raw array span as float64 (null → NaN), via Arrow's CSV number parser (one value per line)."""
+    import pyarrow as pa
+    from pyarrow import csv
+    try:
+        table = csv.read_csv(pa.py_buffer(v.replace(b",", b"\n")),
+                             read_options=csv.ReadOptions(column_names=["v"]),
+                             convert_options=csv.ConvertOptions(column_types={"v": pa.float64()}))
+    except pa.ArrowInvalid:
+        return None
+    return table.column(0).to_numpy()
+
+def _fill_values(out: np.ndarray, v) -> None:
+    n = len(out)
+    if n == 0:
+        return
+    if not isinstance(v, list):
+        vals = _arrow_floats(v)
+        if vals is not None and len(vals) == n:
+            out[:] = vals
+            return
+        v = _items(v)  # something the CSV reader does not take; let json decide
+    out[:] = np.asarray(v, dtype=np.float64)
+
+def decode_hourly(js: Payload, variables: Sequence[str] = HOURLY, to_utc: bool = False,
+                  ) -> tuple[np.ndarray, np.ndarray, dict[str, np.ndarray], np.ndarray]:
+    """
+    Decode every location of a response into preallocated columns.
+    Returns (offsets, time_ns, {variable: float64}, utc_offset_s). Location i owns rows
+    offsets[i]:offsets[i + 1], and its wall clock is UTC + utc_offset_s[i]. Times are
+    wall clock, or UTC with `to_utc`. Missing variables come back as NaN.
+    """
+    blocks = _blocks(js)
+    lengths = np.array([_length(b.get("time", [])) for b, _ in blocks], dtype=np.int64)
+    utc_offsets = np.array([o for _, o in blocks], dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    total = int(offsets[-1])
+    times = np.empty(total, dtype=np.int64)
+    values = {name: np.empty(total, dtype=np.float64) for name in variables}
+    for (b, utc_offset), lo, hi in zip(blocks, offsets[:-1], offsets[1:]):
+        _fill_times(times[lo:hi], b.get("time", []))
+        if to_utc and utc_offset:
+            seg = times[lo:hi]
+            seg[seg != np.iinfo(np.int64).min] -= utc_offset * 1_000_000_000  # NaT stays NaT
+        for name in variables:
+            v = b.get(name)
+            if v is None:
+                values[name][lo:hi] = np.nan
+            elif _length(v) != hi - lo:
+                raise ValueError(f"hourly {name!r} has {_length(v)} values for {hi - lo} timestamps")
+            else:
+                _fill_values(values[name][lo:hi], v)
+    return offsets, times, values, utc_offsets
+
+def hourly_frame(js: Payload, variables: Sequence[str] = HOURLY, utc: bool = True,
+                 locations: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Hourly frame [time, *variables] of a response: one dict, a list of them, or raw bytes.
+    With `utc` the API's wall-clock stamps are converted to tz-aware UTC (what the raw
+    store holds); without it they stay tz-naive local wall clock.
+    With `locations` (one name per location in the response) a categorical `location`
+    column is prepended.
+    """
+    offsets, times, values, _ = decode_hourly(js, variables, to_utc=utc)
+    time = pd.DatetimeIndex(times.view("datetime64[ns]"))
+    df = pd.DataFrame({"time": time.tz_localize("UTC") if utc else time, **values}, copy=False)
+    if locations is not None:
+        names = list(locations)
+        if len(names) != len(offsets) - 1:
+            raise RuntimeError(f"expected {len(names)} locations in response, got {len(offsets) - 1}")
+        codes, cats = pd.factorize(pd.Index(names, dtype=object))
+        df.insert(0, "location", pd.Categorical.from_codes(np.repeat(codes, np.diff(offsets)), categories=cats))
+    return df
@@ -0,0 +1,313 @@
+# src/http_cache.py
+"""
+On-disk cache for Open-Meteo GET responses, plus record/replay of fixtures.
+
+Entries are keyed on the endpoint and its normalized query parameters (sorted keys,
+list values comma-joined, numbers in canonical form), so `latitude=40.7128` and
+`latitude="40.71280"` share an entry. Each entry is one file: a JSON header line
+(validators, fetch time) followed by the raw response body.
+
+Modes (`--http-cache` on the fetching scripts, or WEATHER_HTTP=<mode>):
+
+    cache   serve entries younger than the TTL; revalidate older ones with
+            If-None-Match / If-Modified-Since; fall back to a stale entry when the
+            network is down. The directory is capped by LRU eviction.
+    off     always fetch, store nothing.
+    record  always fetch and write the response as a fixture (no TTL, no eviction).
+    replay  serve fixtures only; a request without one raises `CacheMiss`.
+
+Fixture keys leave out the host, so recorded runs can also be replayed over HTTP by
+the stand-in server, e.g. for the batch ingest path:
+
+    python -m src.http_cache serve --port 8765
+    python -m src ingest --locations locs.csv --url http://127.0.0.1:8765/v1/forecast --http-cache off
+"""
+from __future__ import annotations
+import argparse, hashlib, json, os, threading, time
+import datetime as dt
+from pathlib import Path
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+from .paths import CACHE, DATA
+
+ENV_MODE = "WEATHER_HTTP"
+ENV_TTL = "WEATHER_HTTP_TTL"
+ENV_FIXTURES = "WEATHER_FIXTURES"
+MODES = ("cache", "off", "record", "replay")
+DEFAULT_ROOT = CACHE / "http"
+DEFAULT_FIXTURES = DATA / "fixtures" / "http"
+SUFFIX = ".resp"
+
+
+class CacheMiss(LookupError):
+    """Replay mode was asked for a request that has no recorded fixture."""
+
+
+# ---------- Keys ----------
+def _canonical_token(tok: str) -> str:
+    tok = tok.strip()
+    if any(c in tok for c in ".eE"):
+        try:
+            return repr(float(tok))
+        except ValueError:
+            pass
+    return tok
+
+def _canonical_value(v) -> str:
+    if isinstance(v, (list, tuple)):
+        v = ",".join(str(x) for x in v)
+    elif isinstance(v, bool):
+        v = "true" if v else "false"
+    return ",".join(_canonical_token(t) for t in str(v).split(","))
+
+def normalize_params(params: dict) -> str:
+    """Canonical query string: sorted keys, comma-joined values, None dropped."""
+    items = sorted((str(k), _canonical_value(v)) for k, v in params.items() if v is not None)
+    return "&".join(f"{k}={v}" for k, v in items)
+
+def request_key(url: str, params: dict, host: bool = True) -> str:
+    parts = urlsplit(url)
+    where = f"{parts.scheme}://{parts.netloc}{parts.path}" if host else parts.path
+    return hashlib.sha256(f"{where}?{normalize_params(params)}".encode()).hexdigest()[:32]
+
+
+# ---------- Entries ----------
+def _read(path: Path) -> Optional[tuple[dict, bytes]]:
+    try:
+        with open(path, "rb") as fh:
+            meta = json.loads(fh.readline())
+            return meta, fh.read()
+    except (FileNotFoundError, OSError, ValueError):
+        return None
+
+def _write(path: Path, meta: dict, body: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # unique temp name: fetch_many writes from several threads
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "wb") as fh:
+        fh.write(json.dumps(meta).encode() + b"\n")
+        fh.write(body)
+    os.replace(tmp, path)
+
+
+class ResponseCache:
+    def __init__(self, mode: str = "cache", root: Path | str = DEFAULT_ROOT,
+                 fixtures: Path | str = DEFAULT_FIXTURES, ttl: float = 3600.0,
+                 max_bytes: int = 256 * 2**20):
+        self.stats = {"hit": 0, "revalidated": 0, "miss": 0, "stale": 0, "recorded": 0, "replayed": 0}
+        self._lock = threading.Lock()
+        self.configure(mode, root, fixtures, ttl, max_bytes)
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        mode = os.getenv(ENV_MODE, "").strip().lower() or "cache"
+        if mode in ("0", "false", "no"):
+            mode = "off"
+        return cls(mode if mode in MODES else "cache", ttl=float(os.getenv(ENV_TTL, "3600")),
+                   fixtures=os.getenv(ENV_FIXTURES) or DEFAULT_FIXTURES)
+
+    def configure(self, mode: Optional[str] = None, root: Optional[Path | str] = None,
+                  fixtures: Optional[Path | str] = None, ttl: Optional[float] = None,
+                  max_bytes: Optional[int] = None) -> "ResponseCache":
+        if mode is not None:
+            if mode not in MODES:
+                raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+            self.mode = mode
+        if root is not None:
+            self.root = Path(root)
+        if fixtures is not None:
+            self.fixtures = Path(fixtures)
+        if ttl is not None:
+            self.ttl = ttl
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+        return self
+
+    def _count(self, what: str) -> None:
+        with self._lock:
+            self.stats[what] += 1
+
+    def path(self, url: str, params: dict) -> Path:
+        if self.mode in ("record", "replay"):
+            return self.fixtures / f"{request_key(url, params, host=False)}{SUFFIX}"
+        return self.root / f"{request_key(url, params)}{SUFFIX}"
+
+    # ---------- Fetch ----------
+    def get_json(self, url: str, params: dict, session=None, timeout: float = 30):
+        """GET `url` through the cache and decode the JSON body."""
+        return json.loads(self.get(url, params, session, timeout))
+
+    def get(self, url: str, params: dict, session=None, timeout: float = 30) -> bytes:
+        if self.mode == "off":
+            return self._fetch(url, params, session, timeout)[1]
+        p = self.path(url, params)
+        if self.mode == "replay":
+            entry = _read(p)
+            if entry is None:
+                raise CacheMiss(f"no fixture for {url}?{normalize_params(params)} in {self.fixtures}")
+            self._count("replayed")
+            return entry[1]
+        if self.mode == "record":
+            status, body, meta = self._fetch(url, params, session, timeout)
+            _write(p, meta, body)
+            self._count("recorded")
+            return body
+
+        entry = _read(p)
+        if entry is not None and time.time() - entry[0]["fetched_at"] < self.ttl:
+            os.utime(p)  # LRU recency
+            self._count("hit")
+            return entry[1]
+        headers = {}
+        if entry is not None:
+            if entry[0].get("etag"):
+                headers["If-None-Match"] = entry[0]["etag"]
+            if entry[0].get("last_modified"):
+                headers["If-Modified-Since"] = entry[0]["last_modified"]
+        try:
+            status, body, meta = self._fetch(url, params, session, timeout, headers)
+        except OSError:  # requests' exceptions derive from IOError
+            if entry is None:
+                raise
+            self._count("stale")
+            return entry[1]
+        if status == 304:
+            body = entry[1]
+            meta = {**entry[0], "fetched_at": meta["fetched_at"]}
+            self._count("revalidated")
+        else:
+            self._count("miss")
+        _write(p, meta, body)
+        self.evict(keep=p)
+        return body
+
+    @staticmethod
+    def _fetch(url: str, params: dict, session, timeout: float,
+               headers: Optional[dict] = None) -> tuple[int, bytes, dict]:
+        if session is None:
+            import requests  # network stack is loaded only when something is fetched
+            session = requests
+        r = session.get(url, params=params, headers=headers or None, timeout=timeout)
+        if r.status_code != 304:
+            r.raise_for_status()
+        meta = {
+            "url": url,
+            "params": normalize_params(params),
+            "status": r.status_code,
+            "etag": r.headers.get("ETag"),
+            "last_modified": r.headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+        }
+        return r.status_code, r.content, meta
+
+    # ---------- Maintenance ----------
+    def evict(self, keep: Optional[Path] = None) -> int:
+        """Delete least-recently-used entries until the cache fits max_bytes."""
+        entries = []
+        for e in self.root.glob(f"*{SUFFIX}"):
+            try:
+                st = e.stat()
+            except FileNotFoundError:  # removed by another thread
+                continue
+            entries.append((st.st_mtime, st.st_size, e))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, e in sorted(entries, key=lambda t: t[0]):
+            if total <= self.max_bytes:
+                break
+            if e == keep:
+                continue
+            e.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> int:
+        n = 0
+        for e in self.root.glob(f"*{SUFFIX}"):
+            e.unlink(missing_ok=True)
+            n += 1
+        return n
+
+    def summary(self) -> str:
+        if self.mode == "off":
+            return "[http] cache off"
+        used = {k: v for k, v in self.stats.items() if v}
+        return f"[http] {self.mode}: " + (", ".join(f"{v} {k}" for k, v in used.items()) or "no requests")
+
+
+HTTP_CACHE = ResponseCache.from_env()
+
+def add_http_args(ap) -> None:
+    """Add --http-cache / --http-ttl / --fixtures to an argparse parser."""
+    ap.add_argument("--http-cache", type=str, choices=MODES, default=None,
+                    help=f"Response cache mode (default: {ENV_MODE} or 'cache').")
+    ap.add_argument("--http-ttl", type=float, default=None, help="Seconds before a cached response is revalidated.")
+    ap.add_argument("--fixtures", type=str, default=None, help=f"Record/replay directory (default: {DEFAULT_FIXTURES}).")
+
+def configure_http(args) -> ResponseCache:
+    return HTTP_CACHE.configure(mode=args.http_cache, ttl=args.http_ttl, fixtures=args.fixtures)
+
+
+# ---------- Stand-in server ----------
+def serve(fixtures: Path | str = DEFAULT_FIXTURES, host: str = "127.0.0.1", port: int = 8765) -> None:
+    """Serve recorded fixtures over HTTP (any host/port; 404 for unrecorded requests)."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    root = Path(fixtures)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            params = {k: ",".join(v) for k, v in parse_qs(parts.query, keep_blank_values=True).items()}
+            entry = _read(root / f"{request_key(parts.path, params, host=False)}{SUFFIX}")
+            if entry is None:
+                self.send_error(404, "no fixture for this request")
+                return
+            meta, body = entry
+            etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    n = sum(1 for _ in root.glob(f"*{SUFFIX}"))
+    with ThreadingHTTPServer((host, port), Handler) as srv:
+        print(f"[http] serving {n} fixture(s) from {root} on http://{host}:{port}")
+        srv.serve_forever()
+
+def main():
+    ap = argparse.ArgumentParser(description="Inspect the HTTP response cache or serve recorded fixtures.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    s = sub.add_parser("serve", help="Stand-in Open-Meteo server answering from recorded fixtures.")
+    s.add_argument("--fixtures", type=str, default=str(HTTP_CACHE.fixtures))
+    s.add_argument("--host", type=str, default="127.0.0.1")
+    s.add_argument("--port", type=int, default=8765)
+    sub.add_parser("info", help="Entry counts and sizes of the cache and fixture directories.")
+    sub.add_parser("clear", help="Delete every cached response (fixtures are kept).")
+    args = ap.parse_args()
+
+    if args.cmd == "serve":
+        serve(args.fixtures, args.host, args.port)
+    elif args.cmd == "clear":
+        print(f"[http] removed {HTTP_CACHE.clear()} cached response(s) from {HTTP_CACHE.root}")
+    else:
+        for label, root in (("cache", HTTP_CACHE.root), ("fixtures", HTTP_CACHE.fixtures)):
+            files = list(root.glob(f"*{SUFFIX}"))
+            size = sum(f.stat().st_size for f in files)
+            newest = max((f.stat().st_mtime for f in files), default=None)
+            when = dt.datetime.fromtimestamp(newest).isoformat(timespec="seconds") if newest else "-"
+            print(f"{label:9s} {len(files):6d} entries  {size / 2**20:8.2f} MiB  newest {when}  {root}")
+
+if __name__ == "__main__":
+    main()
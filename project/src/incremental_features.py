@@ -0,0 +1,188 @@
+# src/incremental_features.py
+"""
+Incremental calendar/lag/rolling features for append-only daily data.
+
+Per location and column the state holds the last N values (N = max lag / window),
+a running sum and NaN count per window, and a monotonic deque per window for the
+rolling max. Appending k new days costs O(k) regardless of history length, and
+the rows produced match `features_weather.add_features` on the full history.
+"""
+from __future__ import annotations
+import json
+from collections import deque
+from pathlib import Path
+from typing import Optional, Sequence
+import numpy as np
+import pandas as pd
+
+from .features_weather import BASE_COLS, ROLL_COLS, ROLL_FUNCS, add_calendar_features
+
+_ONE_DAY = np.timedelta64(1, "D")
+
+
+class _Window:
+    """Trailing window of width w: running (compensated) sum, NaN count, max deque."""
+    def __init__(self, w: int):
+        self.w = w
+        self.sum = 0.0
+        self.comp = 0.0
+        self.nans = 0
+        self.maxq: deque = deque()  # (index, value), values decreasing
+
+    def _add(self, v: float) -> None:
+        y = v - self.comp
+        t = self.sum + y
+        self.comp = (t - self.sum) - y
+        self.sum = t
+
+    def push(self, i: int, x: float, leaving: Optional[float]) -> None:
+        if leaving is not None:
+            if leaving != leaving:
+                self.nans -= 1
+            else:
+                self._add(-leaving)
+        if x != x:
+            self.nans += 1
+        else:
+            self._add(x)
+            while self.maxq and self.maxq[-1][1] <= x:
+                self.maxq.pop()
+            self.maxq.append((i, x))
+        while self.maxq and self.maxq[0][0] <= i - self.w:
+            self.maxq.popleft()
+
+    def value(self, f: str, n: int) -> float:
+        # same rule as rolling(w, min_periods=w): every value in the window must be present
+        if n < self.w or self.nans:
+            return np.nan
+        if f == "sum":
+            return self.sum
+        if f == "mean":
+            return self.sum / self.w
+        if f == "max":
+            return self.maxq[0][1]
+        raise ValueError(f"unsupported rolling func '{f}'")
+
+
+class _SeriesState:
+    def __init__(self, depth: int, windows: Sequence[int]):
+        self.n = 0
+        self.hist: deque = deque(maxlen=depth)
+        self.wins = {w: _Window(w) for w in windows}
+
+    def push(self, x: float) -> None:
+        for w, win in self.wins.items():
+            leaving = self.hist[-w] if self.n >= w else None
+            win.push(self.n, x, leaving)
+        self.hist.append(x)
+        self.n += 1
+
+    def lag(self, k: int) -> float:
+        # called before push: hist[-k] is the value k days before the incoming one
+        return self.hist[-k] if len(self.hist) >= k else np.nan
+
+
+class IncrementalFeatures:
+    def __init__(self, lags: Sequence[int] = (1, 2, 3), windows: Sequence[int] = (3, 7, 14),
+                 funcs: Sequence[str] = ROLL_FUNCS, lag_cols: Sequence[str] = BASE_COLS,
+                 roll_cols: Sequence[str] = ROLL_COLS):
+        self.lags, self.windows, self.funcs = list(lags), list(windows), list(funcs)
+        self.lag_cols, self.roll_cols = list(lag_cols), list(roll_cols)
+        self.depth = max([*self.lags, *self.windows, 1])
+        self.states: dict[str, dict[str, _SeriesState]] = {}
+        self.last_date: dict[str, np.datetime64] = {}
+        self.meta: dict = {}  # caller context saved with the state (e.g. timezone)
+
+    def params(self) -> dict:
+        return {"lags": self.lags, "windows": self.windows, "funcs": self.funcs,
+                "lag_cols": self.lag_cols, "roll_cols": self.roll_cols}
+
+    def _new_state(self) -> dict[str, _SeriesState]:
+        cols = dict.fromkeys([*self.lag_cols, *self.roll_cols])
+        return {c: _SeriesState(self.depth, self.windows if c in self.roll_cols else ()) for c in cols}
+
+    def update(self, daily: pd.DataFrame, by: Optional[str] = None) -> pd.DataFrame:
+        """
+        Feature rows for newly appended days (consecutive per location, continuing
+        from the previous call). Columns match `add_features(daily)`.
+        """
+        cols = dict.fromkeys([*self.lag_cols, *self.roll_cols])
+        keys = daily[by].astype(str).to_numpy() if by else np.full(len(daily), "")
+        dates = daily["date"].to_numpy(dtype="datetime64[ns]")
+        vals = {c: daily[c].to_numpy(dtype=np.float64) for c in cols}
+
+        lag_out = {f"{c}_lag{k}": np.empty(len(daily)) for c in self.lag_cols for k in self.lags}
+        roll_out = {f"{c}_roll{w}_{f}": np.empty(len(daily))
+                    for c in self.roll_cols for w in self.windows for f in self.funcs}
+
+        # check continuity before touching any state
+        seen = dict(self.last_date)
+        for key, date in zip(keys, dates):
+            prev = seen.get(key)
+            if prev is not None and date - prev != _ONE_DAY:
+                raise ValueError(f"location {key!r}: expected {prev + _ONE_DAY}, got {date}")
+            seen[key] = date
+        self.last_date = seen
+
+        for i in range(len(daily)):
+            key = keys[i]
+            st = self.states.get(key)
+            if st is None:
+                st = self.states[key] = self._new_state()
+
+            for c in self.lag_cols:
+                s = st[c]
+                for k in self.lags:
+                    lag_out[f"{c}_lag{k}"][i] = s.lag(k)
+            for c in cols:
+                st[c].push(vals[c][i])
+            for c in self.roll_cols:
+                s = st[c]
+                for w in self.windows:
+                    win = s.wins[w]
+                    for f in self.funcs:
+                        roll_out[f"{c}_roll{w}_{f}"][i] = win.value(f, s.n)
+
+        out = add_calendar_features(daily)
+        return out.assign(**lag_out, **roll_out)
+
+    # ---------- Persistence ----------
+    def to_dict(self) -> dict:
+        def series(s: _SeriesState) -> dict:
+            return {"n": s.n, "hist": list(s.hist),
+                    "wins": {str(w): [win.sum, win.comp, win.nans, list(map(list, win.maxq))]
+                             for w, win in s.wins.items()}}
+        return {
+            "params": self.params(),
+            "meta": self.meta,
+            "last_date": {k: str(v) for k, v in self.last_date.items()},
+            "states": {k: {c: series(s) for c, s in st.items()} for k, st in self.states.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "IncrementalFeatures":
+        obj = cls(**d["params"])
+        obj.meta = d.get("meta", {})
+        obj.last_date = {k: np.datetime64(v, "ns") for k, v in d["last_date"].items()}
+        for key, st in d["states"].items():
+            obj.states[key] = obj._new_state()
+            for c, s in st.items():
+                ss = obj.states[key][c]
+                ss.n = s["n"]
+                ss.hist.extend(s["hist"])
+                for w, (total, comp, nans, maxq) in s["wins"].items():
+                    win = ss.wins[int(w)]
+                    win.sum, win.comp, win.nans = total, comp, nans
+                    win.maxq.extend(tuple(p) for p in maxq)
+        return obj
+
+    def save(self, path: Path | str) -> Path:
+        p = Path(path)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        # NaN is valid in Python's json round-trip
+        p.write_text(json.dumps(self.to_dict()))
+        return p
+
+    @classmethod
+    def load(cls, path: Path | str) -> "IncrementalFeatures":
+        return cls.from_dict(json.loads(Path(path).read_text()))
@@ -1,62 +1,204 @@
 # src/ingest_open_meteo.py
 from __future__ import annotations
-import os, argparse, datetime as dt
-import requests
+import os, argparse, threading, time, datetime as dt
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+from urllib.parse import urlsplit
 import pandas as pd
 
-from .paths import RAW, PROC, ensure_dirs
+from .http_cache import HTTP_CACHE, add_http_args, configure_http
+from .hourly_columns import hourly_frame
+from .paths import PROC, ensure_dirs
+from .profiling import PROFILER, add_profile_args, configure_from_args
+from .raw_store import RawStore, location_key
 from .features_weather import resample_hourly_to_daily  # used only if --preview
 
+if TYPE_CHECKING:
+    import requests
+
+FORECAST_URL = os.getenv("OPEN_METEO_URL", "https://api.open-meteo.com/v1/forecast")
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
 def ts():
     return dt.datetime.now().strftime("%Y%m%d-%H%M")
 
-def fetch_open_meteo(latitude: float, longitude: float, timezone: str = "America/New_York", forecast_days: int = 7) -> dict:
-    url = "https://api.open-meteo.com/v1/forecast"
+def _coord(v) -> str:
+    # Open-Meteo accepts comma-separated coordinate lists for multi-location requests
+    if isinstance(v, (list, tuple)):
+        return ",".join(str(x) for x in v)
+    return str(v)
+
+def make_session(pool_size: int = 8, retries: int = 5, backoff: float = 0.5) -> requests.Session:
+    """Session with a sized connection pool and retry/backoff on 429 and 5xx (honours Retry-After)."""
+    import requests  # network stack is loaded only when something is fetched
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUS,
+        allowed_methods=frozenset({"GET"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    s = requests.Session()
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+def fetch_open_meteo(latitude, longitude, timezone: str = "America/New_York", forecast_days: int = 7,
+                     session: Optional[requests.Session] = None, url: str = FORECAST_URL, raw: bool = False):
+    """
+    Fetch one location (returns a dict) or several at once when latitude/longitude are
+    sequences (Open-Meteo then returns a list of dicts, one per coordinate pair).
+    With `raw` the undecoded body is returned for `hourly_columns` to parse.
+    Goes through the HTTP response cache (see `http_cache`).
+    """
     params = {
-        "latitude": latitude,
-        "longitude": longitude,
+        "latitude": _coord(latitude),
+        "longitude": _coord(longitude),
         "hourly": ["temperature_2m", "precipitation"],
         "daily": ["temperature_2m_max", "temperature_2m_min", "precipitation_sum"],
         "forecast_days": forecast_days,
         "timezone": timezone,
     }
-    r = requests.get(url, params=params, timeout=30)
-    r.raise_for_status()
-    return r.json()
-
-def to_hourly_df(js: dict) -> pd.DataFrame:
-    hourly = js.get("hourly", {})
-    df = pd.DataFrame({
-        "time": hourly.get("time", []),
-        "temperature_2m": hourly.get("temperature_2m", []),
-        "precipitation": hourly.get("precipitation", []),
-    })
-    if df.empty:
-        return df
-    # treat timestamps as UTC for downstream safety
-    df["time"] = pd.to_datetime(df["time"], utc=True, errors="coerce")
-    return df
+    if raw:
+        return HTTP_CACHE.get(url, params, session=session, timeout=30)
+    return HTTP_CACHE.get_json(url, params, session=session, timeout=30)
+
+def to_hourly_df(js) -> pd.DataFrame:
+    # wall clock of the requested timezone → true UTC (the response's utc_offset_seconds)
+    return hourly_frame(js, utc=True)
+
+# ---------- Batch mode ----------
+def load_locations(path: Path | str) -> pd.DataFrame:
+    """
+    Read a locations CSV with columns latitude, longitude and optionally location (a name).
+    Returns columns [location, latitude, longitude]; missing names become "lat_lon".
+    """
+    locs = pd.read_csv(path)
+    missing = {"latitude", "longitude"} - set(locs.columns)
+    if missing:
+        raise ValueError(f"locations file missing columns: {sorted(missing)}")
+    if "location" not in locs.columns:
+        locs["location"] = [location_key(a, b) for a, b in zip(locs["latitude"], locs["longitude"])]
+    locs["location"] = locs["location"].astype(str)
+    return locs[["location", "latitude", "longitude"]].drop_duplicates("location").reset_index(drop=True)
+
+class HostLimiter:
+    """Caps the number of in-flight requests per host across worker threads."""
+    def __init__(self, per_host: int):
+        self.per_host = per_host
+        self._lock = threading.Lock()
+        self._sems: dict[str, threading.BoundedSemaphore] = {}
+
+    def __call__(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._sems:
+                self._sems[host] = threading.BoundedSemaphore(self.per_host)
+            return self._sems[host]
+
+def fetch_many(locations: pd.DataFrame, timezone: str = "America/New_York", forecast_days: int = 7,
+               workers: int = 8, per_host: int = 4, batch_size: int = 50,
+               retries: int = 5, backoff: float = 0.5, url: str = FORECAST_URL) -> tuple[pd.DataFrame, dict]:
+    """
+    Fetch hourly data for many locations. Locations are grouped into multi-coordinate
+    requests of `batch_size`, run on a bounded thread pool sharing one pooled session.
+    Returns (long frame [location, time, temperature_2m, precipitation], stats).
+    """
+    chunks = [locations.iloc[i:i + batch_size] for i in range(0, len(locations), batch_size)]
+    session = make_session(pool_size=max(workers, per_host), retries=retries, backoff=backoff)
+    limiter = HostLimiter(per_host)
+
+    def _one(chunk: pd.DataFrame) -> pd.DataFrame:
+        with limiter(url):
+            body = fetch_open_meteo(chunk["latitude"].tolist(), chunk["longitude"].tolist(),
+                                    timezone, forecast_days, session=session, url=url, raw=True)
+        # one preallocated frame per request rather than one per location
+        return hourly_frame(body, locations=chunk["location"].tolist())
+
+    t0 = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            frames = list(ex.map(_one, chunks))
+    finally:
+        session.close()
+    wall = time.perf_counter() - t0
+
+    frames = [f for f in frames if not f.empty]
+    cols = ["location", "time", "temperature_2m", "precipitation"]
+    df = pd.concat(frames, ignore_index=True)[cols] if frames else pd.DataFrame(columns=cols)
+    df = df.sort_values(["location", "time"], kind="stable").reset_index(drop=True)
+    df["location"] = df["location"].astype("category")
+    stats = {
+        "locations": len(locations),
+        "requests": len(chunks),
+        "rows": len(df),
+        "wall_s": round(wall, 3),
+        "req_per_s": round(len(chunks) / wall, 2) if wall > 0 else float("inf"),
+    }
+    return df, stats
 
 def main():
-    ap = argparse.ArgumentParser(description="Ingest hourly weather from Open-Meteo and save to data/raw/.")
+    ap = argparse.ArgumentParser(description="Ingest hourly weather from Open-Meteo into the raw store (data/raw/store).")
     ap.add_argument("--lat", type=float, default=float(os.getenv("LAT", "40.7128")))
     ap.add_argument("--lon", type=float, default=float(os.getenv("LON", "-74.0060")))
     ap.add_argument("--timezone", type=str, default=os.getenv("TIMEZONE", "America/New_York"))
     ap.add_argument("--days", type=int, default=7)
     ap.add_argument("--preview", action="store_true", help="Also write a daily preview CSV (optional).")
+    ap.add_argument("--locations", type=str, default=None,
+                    help="CSV of locations (location, latitude, longitude) for batch mode; overrides --lat/--lon.")
+    ap.add_argument("--workers", type=int, default=8, help="Batch mode: thread pool size.")
+    ap.add_argument("--per-host", type=int, default=4, help="Batch mode: max concurrent requests per host.")
+    ap.add_argument("--batch-size", type=int, default=50, help="Batch mode: coordinates per request.")
+    ap.add_argument("--retries", type=int, default=5, help="Retries on 429/5xx with exponential backoff.")
+    ap.add_argument("--url", type=str, default=FORECAST_URL, help="API endpoint (e.g. a local stub server).")
+    add_http_args(ap)
+    add_profile_args(ap)
     args = ap.parse_args()
+    configure_http(args)
+    configure_from_args(args)
 
     ensure_dirs()
 
-    js = fetch_open_meteo(args.lat, args.lon, args.timezone, args.days)
-    df_hourly = to_hourly_df(js)
+    if args.locations:
+        locs = load_locations(args.locations)
+        with PROFILER.stage("fetch", rows_in=len(locs)) as st:
+            df_all, stats = fetch_many(locs, args.timezone, args.days, workers=args.workers,
+                                       per_host=args.per_host, batch_size=args.batch_size,
+                                       retries=args.retries, url=args.url)
+            st.rows_out = len(df_all)
+        if df_all.empty:
+            raise SystemExit("Open-Meteo returned no hourly data.")
+        with PROFILER.stage("write", rows_in=len(df_all)) as st:
+            up = RawStore().upsert(df_all)
+            st.rows_out = up["rows_written"]
+        print(f"[ingest] {stats['rows']} rows for {stats['locations']} locations → "
+              f"{up['rows_written']} written ({up['rows_new']} new) across {up['partitions']} partition(s)")
+        print(f"[ingest] {stats['requests']} requests in {stats['wall_s']:.2f}s ({stats['req_per_s']:.2f} req/s)")
+        print(HTTP_CACHE.summary())
+        PROFILER.report()
+        return
+
+    with PROFILER.stage("fetch"):
+        js = fetch_open_meteo(args.lat, args.lon, args.timezone, args.days, url=args.url, raw=True)
+    with PROFILER.stage("parse") as st:
+        df_hourly = to_hourly_df(js)
+        st.rows_out = len(df_hourly)
+    print(HTTP_CACHE.summary())
 
     if df_hourly.empty:
         raise SystemExit("Open-Meteo returned no hourly data.")
 
-    raw_path = RAW / f"weather_hourly_{args.lat:.4f}_{args.lon:.4f}_{ts()}.csv"
-    df_hourly.to_csv(raw_path, index=False)
-    print(f"[ingest] Saved hourly → {raw_path}")
+    loc = location_key(args.lat, args.lon)
+    with PROFILER.stage("write", rows_in=len(df_hourly)) as st:
+        up = RawStore().upsert(df_hourly.assign(location=loc))
+        st.rows_out = up["rows_written"]
+    print(f"[ingest] {loc}: {up['rows_written']} hourly rows written ({up['rows_new']} new) → raw store")
 
     if args.preview:
         daily = resample_hourly_to_daily(df_hourly, tz=args.timezone)
@@ -64,5 +206,7 @@ def main():
         daily.to_csv(prev_path, index=False)
         print(f"[ingest] (preview) Saved daily → {prev_path}")
 
+    PROFILER.report()
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
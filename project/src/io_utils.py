@@ -0,0 +1,122 @@
+from __future__ import annotations
+import time
+from pathlib import Path
+from typing import Optional, Sequence
+import numpy as np
+import pandas as pd
+
+def read_csv_dt(path: Path | str, parse_dates: Sequence[str] = ("time",), assume_utc: bool = True) -> pd.DataFrame:
+    """Read a CSV and parse the given columns as datetimes (UTC-aware if assume_utc)."""
+    df = pd.read_csv(path)
+    for c in parse_dates:
+        if c in df.columns:
+            df[c] = pd.to_datetime(df[c], utc=assume_utc, errors="coerce")
+    return df
+
+def write_csv(df: pd.DataFrame, path: Path | str) -> Path:
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(p, index=False)
+    return p
+
+def write_parquet(df: pd.DataFrame, path: Path | str) -> Path:
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(p, index=False)
+    return p
+
+# ---------- Columnar outputs ----------
+FORMATS = ("parquet", "feather", "arrow", "npz", "csv")
+# codecs each writer accepts; the first is its default (used when none/an unsupported one is requested)
+CODECS = {
+    "parquet": ("snappy", "zstd", "gzip", "brotli", "lz4", "none"),
+    "feather": ("lz4", "zstd", "none"),
+    "arrow": ("none",),  # uncompressed so readers can memory-map it zero-copy
+    "npz": ("zlib", "none"),
+    "csv": ("none", "gzip", "bz2", "xz", "zstd"),
+}
+_CSV_EXT = {"gzip": ".gz", "bz2": ".bz2", "xz": ".xz", "zstd": ".zst"}
+
+def _same(x: np.ndarray, a: np.ndarray) -> bool:
+    return bool(((x == a) | (np.isnan(x) & np.isnan(a))).all())
+
+def downcast(df: pd.DataFrame, float_decimals: int = 2, lossy_floats: bool = False) -> pd.DataFrame:
+    """
+    Shrink numeric columns. Integers go to the smallest signed int that fits, which
+    is exact.
+
+    float64 goes to float32 only for columns already at a coarse resolution: every
+    finite value has at most `float_decimals` decimals (e.g. readings to 0.1 °C or
+    0.1 mm), and its float32 copy rounds back to exactly that value. The stored
+    float32 is then off by far less than half a unit of the resolution, and
+    `np.round(x, float_decimals)` on read restores the originals. Derived columns
+    (means, std) fail the check and keep float64.
+
+    `lossy_floats=True` converts every float64 column regardless, keeping about 7
+    significant digits. That is lossy, and off unless the caller opts in.
+    """
+    new = {}
+    for c in df.columns:
+        s = df[c]
+        if s.dtype == np.float64:
+            a = s.to_numpy()
+            b = a.astype(np.float32)
+            if lossy_floats:
+                new[c] = b
+                continue
+            with np.errstate(invalid="ignore", over="ignore"):
+                at_resolution = np.round(a, float_decimals)
+                back = np.round(b.astype(np.float64), float_decimals)
+            if _same(at_resolution, a) and _same(back, a):
+                new[c] = b
+        elif pd.api.types.is_integer_dtype(s.dtype) and not pd.api.types.is_extension_array_dtype(s.dtype):
+            small = pd.to_numeric(s, downcast="integer")
+            if small.dtype != s.dtype:
+                new[c] = small.to_numpy()
+    return df.assign(**new) if new else df
+
+def _codec(fmt: str, compression: Optional[str]) -> str:
+    allowed = CODECS[fmt]
+    return compression if compression in allowed else allowed[0]
+
+def write_table(df: pd.DataFrame, stem: Path | str, fmt: str, compression: Optional[str] = None,
+                level: Optional[int] = None) -> dict:
+    """Write df as `<stem>.<ext>`; returns {format, codec, path, bytes, seconds}."""
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown format '{fmt}' (expected one of {FORMATS})")
+    codec = _codec(fmt, compression)
+    stem = Path(stem)
+    stem.parent.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+    if fmt == "parquet":
+        path = Path(f"{stem}.parquet")
+        df.to_parquet(path, index=False, compression=None if codec == "none" else codec,
+                      compression_level=level)
+    elif fmt == "feather":
+        path = Path(f"{stem}.feather")
+        df.reset_index(drop=True).to_feather(path, compression="uncompressed" if codec == "none" else codec,
+                                             compression_level=level)
+    elif fmt == "arrow":
+        import pyarrow as pa
+        path = Path(f"{stem}.arrow")
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    elif fmt == "npz":
+        path = Path(f"{stem}.npz")
+        arrays = {c: df[c].to_numpy() for c in df.columns}
+        (np.savez_compressed if codec == "zlib" else np.savez)(path, **arrays)
+    else:
+        path = Path(f"{stem}.csv{_CSV_EXT.get(codec, '')}")
+        comp = None if codec == "none" else {"method": codec}
+        if comp and level is not None:
+            comp["level" if codec == "zstd" else "compresslevel"] = level
+        df.to_csv(path, index=False, compression=comp)
+    seconds = time.perf_counter() - t0
+    return {"format": fmt, "codec": codec, "path": path, "bytes": path.stat().st_size, "seconds": seconds}
+
+def read_arrow_mmap(path: Path | str):
+    """Memory-map an Arrow IPC file written by write_table(fmt='arrow'); buffers are zero-copy."""
+    import pyarrow as pa
+    # the returned table keeps the mapping alive for as long as it is referenced
+    return pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
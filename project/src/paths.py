@@ -7,6 +7,8 @@ DATA = ROOT / "data"
 RAW = DATA / "raw"
 PROC = DATA / "processed"
 MODELS = ROOT / "models"
+STORE = RAW / "store"
+CACHE = DATA / "cache"
 
 def ensure_dirs(paths: Iterable[Path] = (RAW, PROC, MODELS)) -> None:
     for p in paths:
@@ -14,4 +16,4 @@ def ensure_dirs(paths: Iterable[Path] = (RAW, PROC, MODELS)) -> None:
 
 def latest_raw(pattern: str = "weather_hourly_*.csv") -> Optional[Path]:
     candidates = sorted(RAW.glob(pattern), key=lambda p: p.stat().st_mtime, reverse=True)
-    return candidates[0] if candidates else None
\ No newline at end of file
+    return candidates[0] if candidates else None
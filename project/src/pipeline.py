@@ -1,18 +1,21 @@
-import os, pathlib, datetime as dt
-import requests
+import argparse, os, pathlib, datetime as dt
 import pandas as pd
 
+from .features_weather import aggregate_daily
+from .http_cache import HTTP_CACHE, add_http_args, configure_http
+from .hourly_columns import hourly_frame
+from .profiling import PROFILER, add_profile_args, configure_from_args
+from .raw_store import RawStore, location_key
+
 # Folders
-DATA_RAW = pathlib.Path("data/raw")
 DATA_PROC = pathlib.Path("data/processed")
-DATA_RAW.mkdir(parents=True, exist_ok=True)
-DATA_PROC.mkdir(parents=True, exist_ok=True)
 
 def ts():
     return dt.datetime.now().strftime("%Y%m%d-%H%M")
 
+@PROFILER.profile("fetch")
 def fetch_open_meteo(latitude: float, longitude: float, timezone: str = "America/New_York") -> dict:
-    url = "https://api.open-meteo.com/v1/forecast"
+    url = os.getenv("OPEN_METEO_URL", "https://api.open-meteo.com/v1/forecast")
     params = {
         "latitude": latitude,
         "longitude": longitude,
@@ -21,57 +24,61 @@ def fetch_open_meteo(latitude: float, longitude: float, timezone: str = "America
         "forecast_days": 7,
         "timezone": timezone,
     }
-    r = requests.get(url, params=params, timeout=30)
-    r.raise_for_status()
-    return r.json()
+    # cached on disk; requests is imported only on an actual fetch
+    return HTTP_CACHE.get_json(url, params, timeout=30)
 
+@PROFILER.profile("parse", rows=len)
 def to_hourly_df(js: dict) -> pd.DataFrame:
-    hourly = js.get("hourly", {})
-    df = pd.DataFrame({
-        "time": hourly.get("time", []),
-        "temperature_2m": hourly.get("temperature_2m", []),
-        "precipitation": hourly.get("precipitation", []),
-    })
-    if df.empty:
-        return df
-    df["time"] = pd.to_datetime(df["time"])
-    return df
+    # local wall-clock hours, tz-naive
+    return hourly_frame(js, utc=False)
+
+SUMMARY_SPEC = {
+    "temp_mean": ("temperature_2m", "mean"),
+    "temp_max": ("temperature_2m", "max"),
+    "temp_min": ("temperature_2m", "min"),
+    "precip_sum": ("precipitation", "sum"),
+}
 
+@PROFILER.profile("resample", rows=len)
 def summarize_daily(df_hourly: pd.DataFrame) -> pd.DataFrame:
     if df_hourly.empty:
         return df_hourly
-    df = df_hourly.copy()
-    df["date"] = df["time"].dt.date
-    out = (
-        df.groupby("date")
-          .agg(
-              temp_mean=("temperature_2m", "mean"),
-              temp_max=("temperature_2m", "max"),
-              temp_min=("temperature_2m", "min"),
-              precip_sum=("precipitation", "sum"),
-          )
-          .reset_index()
-    )
+    # calendar day of the timestamps as given (no tz conversion), observed days only
+    out = aggregate_daily(df_hourly, tz=None, spec=SUMMARY_SPEC, fill_gaps=False)
+    out["date"] = out["date"].dt.date
     return out
 
 def main():
-    # Default to NYC; override by setting LAT/LON in your .env or terminal if you want
-    lat = float(os.getenv("LAT", "40.7128"))
-    lon = float(os.getenv("LON", "-74.0060"))
-    tz  = os.getenv("TIMEZONE", "America/New_York")
+    # Default to NYC; override with LAT/LON/TIMEZONE in your .env or terminal, or the flags
+    ap = argparse.ArgumentParser(description="Fetch the 7-day forecast, store raw hours and write a daily summary.")
+    ap.add_argument("--lat", type=float, default=float(os.getenv("LAT", "40.7128")))
+    ap.add_argument("--lon", type=float, default=float(os.getenv("LON", "-74.0060")))
+    ap.add_argument("--timezone", type=str, default=os.getenv("TIMEZONE", "America/New_York"))
+    add_http_args(ap)
+    add_profile_args(ap)
+    args = ap.parse_args()
+    configure_http(args)
+    configure_from_args(args)
+    lat, lon, tz = args.lat, args.lon, args.timezone
+    DATA_PROC.mkdir(parents=True, exist_ok=True)
 
     js = fetch_open_meteo(lat, lon, tz)
+    print(HTTP_CACHE.summary())
     df_hourly = to_hourly_df(js)
 
-    # Save raw
-    raw_path = DATA_RAW / f"weather_hourly_{ts()}.csv"
-    df_hourly.to_csv(raw_path, index=False)
-    print(f"Saved raw hourly → {raw_path}")
+    # Upsert raw in UTC, like every other writer (only new/revised hours are written)
+    with PROFILER.stage("write", rows_in=len(df_hourly)) as st:
+        raw = hourly_frame(js, utc=True).assign(location=location_key(lat, lon))
+        store = RawStore()  # paths.STORE, the one build_dataset reads, whatever the cwd
+        up = store.upsert(raw)
+        st.rows_out = up["rows_written"]
+    print(f"Saved raw hourly → {store.root} ({up['rows_written']} written, {up['rows_new']} new)")
 
     # Process + save daily summary
     df_daily = summarize_daily(df_hourly)
     proc_path = DATA_PROC / f"weather_daily_{ts()}.csv"
-    df_daily.to_csv(proc_path, index=False)
+    with PROFILER.stage("write", rows_in=len(df_daily)):
+        df_daily.to_csv(proc_path, index=False)
     print(f"Saved processed daily summary → {proc_path}")
 
     # Quick text summary for stakeholder
@@ -83,5 +90,7 @@ def main():
         print(f"- Hottest day: {hottest['date']} (max ≈ {hottest['temp_max']:.1f} °C)")
         print(f"- Wettest day: {wettest['date']} (total precip ≈ {wettest['precip_sum']:.1f} mm)")
 
+    PROFILER.report()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,138 @@
+# src/preprocessing.py
+"""
+Fitted imputer / scaler state for serving-time reuse.
+
+Statistics are learned once (same rules as the stage06 `fill_missing_median` and
+`normalize_data`: NaN-skipping median, min/max or mean/std with ddof=0, constant
+and all-NaN columns left as they are). They are saved to a small binary file
+under models/ and applied to new rows with plain NumPy:
+
+    prep = Preprocessor(fill="median", scale="zscore").fit(train, cols=feature_cols)
+    prep.save(MODELS / "weather_features.prep")
+    ...
+    prep = Preprocessor.load(MODELS / "weather_features.prep")   # tens of µs
+    x = prep.transform_array(row)                                # a few µs per row
+"""
+from __future__ import annotations
+import json, struct
+from pathlib import Path
+from typing import Optional, Sequence
+import numpy as np
+import pandas as pd
+
+from .paths import MODELS
+
+MAGIC = b"WPREP1\n"
+SUFFIX = ".prep"
+_ARRAYS = ("fill_", "center_", "scale_")
+
+
+class Preprocessor:
+    def __init__(self, fill: Optional[str] = "median", scale: Optional[str] = None):
+        if fill not in (None, "median"):
+            raise ValueError("fill must be 'median' or None")
+        if scale not in (None, "minmax", "zscore"):
+            raise ValueError("scale must be 'minmax', 'zscore' or None")
+        self.fill, self.scale = fill, scale
+        self.columns: list[str] = []
+
+    # ---------- Fit ----------
+    def fit(self, df: pd.DataFrame, cols: Optional[Sequence[str]] = None) -> "Preprocessor":
+        if cols is None:
+            cols = df.select_dtypes(include="number").columns
+        self.columns = [c for c in cols if c in df.columns and pd.api.types.is_numeric_dtype(df[c])]
+        x = np.empty((len(df), len(self.columns)), dtype=np.float64, order="F")
+        for j, c in enumerate(self.columns):
+            x[:, j] = df[c].to_numpy(dtype=np.float64, na_value=np.nan)
+        k = x.shape[1]
+        self.fill_ = np.full(k, np.nan)
+        self.center_, self.scale_ = np.zeros(k), np.ones(k)
+        for j in range(k):
+            col = x[:, j]
+            col = col[~np.isnan(col)]
+            if not len(col):
+                continue
+            if self.fill == "median":
+                self.fill_[j] = np.median(col)
+                # scaling statistics are taken after the fill, as in fill -> normalize
+                col = x[:, j]
+                np.copyto(col, self.fill_[j], where=np.isnan(col))
+            if self.scale == "minmax":
+                lo, hi = col.min(), col.max()
+                if lo != hi:
+                    self.center_[j], self.scale_[j] = lo, hi - lo
+            elif self.scale == "zscore":
+                mu, sigma = col.mean(), col.std()
+                if sigma != 0:
+                    self.center_[j], self.scale_[j] = mu, sigma
+        self._prepare()
+        return self
+
+    def _prepare(self) -> None:
+        self._missing_fill = np.isnan(self.fill_)
+        self._has_scale = bool(((self.center_ != 0) | (self.scale_ != 1)).any())
+
+    # ---------- Apply ----------
+    def transform_array(self, x) -> np.ndarray:
+        """NumPy fast path: one row (k,) or a batch (n, k) in `columns` order."""
+        x = np.array(x, dtype=np.float64)  # always a copy; the caller's data is not modified
+        if self.fill == "median":
+            nan = x != x
+            if nan.any():
+                np.copyto(x, self.fill_, where=nan & ~self._missing_fill)
+        if self._has_scale:
+            x -= self.center_
+            x /= self.scale_
+        return x
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        missing = [c for c in self.columns if c not in df.columns]
+        if missing:
+            raise KeyError(f"columns not in frame: {missing}")
+        x = np.empty((len(df), len(self.columns)), dtype=np.float64)
+        for j, c in enumerate(self.columns):
+            x[:, j] = df[c].to_numpy(dtype=np.float64, na_value=np.nan)
+        out = df.copy()
+        out[self.columns] = self.transform_array(x)
+        return out
+
+    # ---------- Persistence ----------
+    def save(self, path: Path | str) -> Path:
+        """Write MAGIC, a length-prefixed JSON header and the float64 arrays (atomic)."""
+        p = Path(path)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        header = json.dumps({"fill": self.fill, "scale": self.scale, "columns": self.columns}).encode()
+        body = np.concatenate([getattr(self, a) for a in _ARRAYS]).astype("<f8").tobytes()
+        tmp = p.with_name(p.name + ".tmp")
+        tmp.write_bytes(MAGIC + struct.pack("<I", len(header)) + header + body)
+        tmp.replace(p)
+        return p
+
+    @classmethod
+    def load(cls, path: Path | str) -> "Preprocessor":
+        buf = Path(path).read_bytes()
+        if not buf.startswith(MAGIC):
+            raise ValueError(f"{path} is not a preprocessor file")
+        off = len(MAGIC)
+        (n,) = struct.unpack_from("<I", buf, off)
+        meta = json.loads(buf[off + 4:off + 4 + n])
+        obj = cls(meta["fill"], meta["scale"])
+        obj.columns = meta["columns"]
+        arrays = np.frombuffer(buf, dtype="<f8", offset=off + 4 + n).reshape(len(_ARRAYS), -1)
+        for a, values in zip(_ARRAYS, arrays):
+            setattr(obj, a, values.copy())
+        obj._prepare()
+        return obj
+
+
+class MedianImputer(Preprocessor):
+    def __init__(self):
+        super().__init__(fill="median", scale=None)
+
+class Scaler(Preprocessor):
+    def __init__(self, method: str = "zscore"):
+        super().__init__(fill=None, scale=method)
+
+
+def default_path(name: str) -> Path:
+    return MODELS / f"{name}{SUFFIX}"
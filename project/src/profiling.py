@@ -0,0 +1,185 @@
+# src/profiling.py
+"""
+Stage timing and memory instrumentation.
+
+    with PROFILER.stage("resample", rows_in=len(dfh)) as st:
+        daily = resample_hourly_to_daily(dfh)
+        st.rows_out = len(daily)
+
+    @PROFILER.profile("fetch")
+    def fetch_open_meteo(...): ...
+
+Each stage records wall time, CPU time, the process peak RSS and (optionally) the
+tracemalloc peak inside the stage, plus rows in/out. Records are appended to a
+JSON-lines file and summarised with `report()`.
+
+Disabled by default: `stage()` then returns a shared no-op object and decorated
+functions pay one attribute check. Enable with the `--profile` flag of the
+scripts or WEATHER_PROFILE=1 (or =<path.jsonl>); WEATHER_PROFILE_MEM=1 also
+turns on tracemalloc, which is accurate but slows allocation-heavy code.
+"""
+from __future__ import annotations
+import functools, json, os, socket, sys, time, tracemalloc, uuid
+import datetime as dt
+from pathlib import Path
+from typing import Callable, Optional
+
+from .paths import DATA
+
+ENV_VAR = "WEATHER_PROFILE"
+ENV_MEM = "WEATHER_PROFILE_MEM"
+DEFAULT_SINK = DATA / "profile.jsonl"
+
+def peak_rss_mib() -> Optional[float]:
+    """Process high-water-mark RSS in MiB (None if unavailable)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset / 2**20
+        except (ImportError, AttributeError):
+            return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 2**20 if sys.platform == "darwin" else rss / 1024
+
+
+class _NullStage:
+    __slots__ = ()
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        return False
+    def __setattr__(self, name, value):
+        pass
+
+_NULL = _NullStage()
+
+
+class _Stage:
+    def __init__(self, prof: "Profiler", name: str, rows_in: Optional[int]):
+        self.prof, self.name, self.rows_in = prof, name, rows_in
+        self.rows_out: Optional[int] = None
+
+    def __enter__(self):
+        if self.prof.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        self._cpu = time.process_time()
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._t0
+        cpu = time.process_time() - self._cpu
+        traced = tracemalloc.get_traced_memory()[1] / 2**20 if self.prof.trace_memory else None
+        rss = peak_rss_mib()
+        self.prof._record({
+            "stage": self.name,
+            "wall_s": round(wall, 6),
+            "cpu_s": round(cpu, 6),
+            "peak_rss_mib": None if rss is None else round(rss, 1),
+            "traced_peak_mib": None if traced is None else round(traced, 2),
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "ok": exc_type is None,
+        })
+        return False
+
+
+class Profiler:
+    def __init__(self, enabled: bool = False, sink: Optional[Path | str] = None, trace_memory: bool = False):
+        self.records: list[dict] = []
+        self.run_id = uuid.uuid4().hex[:12]
+        self.configure(enabled, sink, trace_memory)
+
+    @classmethod
+    def from_env(cls) -> "Profiler":
+        val = os.getenv(ENV_VAR, "").strip()
+        enabled = val.lower() not in ("", "0", "false", "no", "off")
+        sink = val if enabled and val.lower() not in ("1", "true", "yes", "on") else None
+        return cls(enabled, sink, os.getenv(ENV_MEM, "") not in ("", "0"))
+
+    def configure(self, enabled: Optional[bool] = None, sink: Optional[Path | str] = None,
+                  trace_memory: Optional[bool] = None) -> "Profiler":
+        if enabled is not None:
+            self.enabled = enabled
+        if sink is not None or not hasattr(self, "sink"):
+            self.sink = Path(sink) if sink else DEFAULT_SINK
+        if trace_memory is not None:
+            self.trace_memory = trace_memory
+        return self
+
+    def stage(self, name: str, rows_in: Optional[int] = None):
+        if not self.enabled:
+            return _NULL
+        return _Stage(self, name, rows_in)
+
+    def profile(self, name: Optional[str] = None, rows: Optional[Callable] = None):
+        """Decorator form; `rows(result)` may report rows out."""
+        def deco(fn):
+            label = name or fn.__name__
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with self.stage(label) as st:
+                    out = fn(*args, **kwargs)
+                    if rows is not None:
+                        st.rows_out = rows(out)
+                return out
+            return wrapper
+        return deco
+
+    def _record(self, rec: dict) -> None:
+        rec = {
+            "ts": dt.datetime.now(dt.timezone.utc).isoformat(timespec="milliseconds"),
+            "run_id": self.run_id,
+            "script": Path(sys.argv[0]).stem if sys.argv and sys.argv[0] else "",
+            "host": socket.gethostname(),
+            **rec,
+        }
+        self.records.append(rec)
+        self.sink.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.sink, "a") as fh:
+            fh.write(json.dumps(rec) + "\n")
+
+    def summary(self):
+        import pandas as pd
+        if not self.records:
+            return pd.DataFrame()
+        df = pd.DataFrame(self.records)
+        total = lambda s: s.sum(min_count=1)  # stays NaN when no row counts were given
+        out = df.groupby("stage", sort=False).agg(
+            calls=("stage", "size"),
+            wall_s=("wall_s", "sum"),
+            cpu_s=("cpu_s", "sum"),
+            rows_in=("rows_in", total),
+            rows_out=("rows_out", total),
+            peak_rss_mib=("peak_rss_mib", "max"),
+            traced_peak_mib=("traced_peak_mib", "max"),
+        )
+        out["share"] = out["wall_s"] / out["wall_s"].sum()
+        return out.round({"wall_s": 4, "cpu_s": 4, "share": 3})
+
+    def report(self, file=None) -> None:
+        """Print the summary table (no-op when disabled or nothing was recorded)."""
+        if not self.enabled or not self.records:
+            return
+        print(f"\n[profile] run {self.run_id} → {self.sink}", file=file)
+        print(self.summary().to_string(), file=file)
+
+
+PROFILER = Profiler.from_env()
+
+def add_profile_args(ap) -> None:
+    """Add --profile / --profile-out / --profile-mem to an argparse parser."""
+    ap.add_argument("--profile", action="store_true", help=f"Record per-stage timing/memory (or set {ENV_VAR}=1).")
+    ap.add_argument("--profile-out", type=str, default=None, help=f"JSON-lines sink (default: {DEFAULT_SINK}).")
+    ap.add_argument("--profile-mem", action="store_true", help="Also trace Python allocations (slower).")
+
+def configure_from_args(args) -> Profiler:
+    if args.profile or args.profile_out or args.profile_mem:
+        PROFILER.configure(enabled=True, sink=args.profile_out, trace_memory=args.profile_mem or None)
+    return PROFILER
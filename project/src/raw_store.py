@@ -0,0 +1,251 @@
+# src/raw_store.py
+"""
+Append-only, partitioned Parquet store for hourly raw weather.
+
+Layout:
+    data/raw/store/_manifest.json
+    data/raw/store/location=<loc>/month=YYYY-MM/part-<stamp>.parquet
+
+Rows are keyed on (location, time). Each upsert writes at most one new part per
+touched partition, holding only new or revised hours. Reads replay a partition's
+parts in manifest order so the last write for a key wins; `compact` folds them
+back into a single file. The manifest records parts, row counts and the latest
+month per location, so lookups never scan the directory.
+"""
+from __future__ import annotations
+import argparse, json, os, datetime as dt
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+from .paths import STORE
+
+KEY = ("location", "time")
+MANIFEST = "_manifest.json"
+
+def location_key(lat: float, lon: float) -> str:
+    return f"{lat:.4f}_{lon:.4f}"
+
+def _stamp() -> str:
+    return dt.datetime.now(dt.timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+
+def _to_utc(v) -> Optional[pd.Timestamp]:
+    if v is None:
+        return None
+    t = pd.Timestamp(v)
+    return t.tz_localize("UTC") if t.tzinfo is None else t.tz_convert("UTC")
+
+def _diff(new: pd.DataFrame, old: pd.DataFrame) -> tuple[pd.DataFrame, int]:
+    """Rows of `new` that are absent from `old` (time-indexed) or carry different values."""
+    vals = [c for c in new.columns if c != "time"]
+    prev = old.reindex(index=new["time"], columns=vals)
+    a, b = new[vals].to_numpy(), prev.to_numpy()
+    same = ((a == b) | (pd.isna(a) & pd.isna(b))).all(axis=1)
+    exists = new["time"].isin(old.index).to_numpy()
+    return new[~(same & exists)], int((~exists).sum())
+
+
+class RawStore:
+    def __init__(self, root: Path | str = STORE):
+        self.root = Path(root)
+
+    # ---------- Manifest ----------
+    def manifest(self) -> dict:
+        p = self.root / MANIFEST
+        if not p.exists():
+            return {"version": 1, "locations": {}}
+        return json.loads(p.read_text())
+
+    def _save_manifest(self, man: dict) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / (MANIFEST + ".tmp")
+        tmp.write_text(json.dumps(man, indent=1, sort_keys=True))
+        os.replace(tmp, self.root / MANIFEST)
+
+    def locations(self) -> list[str]:
+        return sorted(self.manifest()["locations"])
+
+    def latest_partition(self, location: str) -> Optional[Path]:
+        """Directory of the most recent month for `location` (manifest lookup, no scan)."""
+        rec = self.manifest()["locations"].get(location)
+        if not rec or not rec["latest"]:
+            return None
+        return self._part_dir(location, rec["latest"])
+
+    def covered_days(self, location: str, start: dt.date, end: dt.date,
+                     man: Optional[dict] = None) -> set[dt.date]:
+        """
+        UTC days in [start, end] holding all 24 hours for `location`. Months whose manifest
+        row count equals their length are taken as complete without being opened.
+        """
+        rec = (man or self.manifest())["locations"].get(location)
+        if not rec:
+            return set()
+        days: set[dt.date] = set()
+        for mon, entry in rec["partitions"].items():
+            m0 = dt.date(int(mon[:4]), int(mon[5:7]), 1)
+            m1 = (m0 + dt.timedelta(days=31)).replace(day=1)
+            lo, hi = max(m0, start), min(m1 - dt.timedelta(days=1), end)
+            if lo > hi:
+                continue
+            if entry["rows"] >= (m1 - m0).days * 24:
+                days.update(lo + dt.timedelta(days=i) for i in range((hi - lo).days + 1))
+                continue
+            t = self._read_partition(location, mon, entry, columns=["time"])["time"]
+            per_day = t.dt.floor("D").value_counts()
+            days.update(d.date() for d, n in per_day.items() if n >= 24 and lo <= d.date() <= hi)
+        return days
+
+    def _part_dir(self, location: str, month: str) -> Path:
+        return self.root / f"location={location}" / f"month={month}"
+
+    def _read_partition(self, location: str, month: str, entry: dict,
+                        columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        d = self._part_dir(location, month)
+        frames = [pd.read_parquet(d / name, columns=columns) for name in entry["parts"]]
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        return df.drop_duplicates("time", keep="last").sort_values("time").reset_index(drop=True)
+
+    # ---------- Write ----------
+    def upsert(self, df: pd.DataFrame) -> dict:
+        """
+        Merge hourly rows (columns: location, time, measures...) into the store.
+        Only hours that are new or whose values changed are written.
+        """
+        stats = {"rows_in": len(df), "rows_written": 0, "rows_new": 0, "partitions": 0}
+        if df.empty:
+            return stats
+        missing = [c for c in KEY if c not in df.columns]
+        if missing:
+            raise ValueError(f"missing key columns: {missing}")
+        df = df.assign(
+            location=df["location"].astype(str),
+            time=pd.to_datetime(df["time"], utc=True, errors="coerce"),
+        ).dropna(subset=["time"]).drop_duplicates(list(KEY), keep="last")
+        month = df["time"].dt.strftime("%Y-%m")
+
+        man = self.manifest()
+        for (loc, mon), part in df.groupby([df["location"], month], sort=True):
+            part = part.drop(columns="location").sort_values("time")
+            rec = man["locations"].setdefault(loc, {"latest": None, "partitions": {}})
+            entry = rec["partitions"].get(mon)
+            if entry:
+                old = self._read_partition(loc, mon, entry).set_index("time")
+                delta, n_new = _diff(part, old)
+            else:
+                delta, n_new = part, len(part)
+            if delta.empty:
+                continue
+
+            d = self._part_dir(loc, mon)
+            d.mkdir(parents=True, exist_ok=True)
+            name = f"part-{_stamp()}.parquet"
+            delta.to_parquet(d / name, index=False)
+
+            if entry is None:
+                entry = rec["partitions"][mon] = {"parts": [], "rows": 0}
+            entry["parts"].append(name)
+            entry["rows"] += n_new
+            if rec["latest"] is None or mon > rec["latest"]:
+                rec["latest"] = mon
+            stats["rows_written"] += len(delta)
+            stats["rows_new"] += n_new
+            stats["partitions"] += 1
+
+        if stats["partitions"]:
+            self._save_manifest(man)
+        return stats
+
+    def compact(self, location: Optional[str] = None) -> int:
+        """Rewrite every multi-part partition as a single file; returns partitions compacted."""
+        man = self.manifest()
+        stale: list[Path] = []
+        n = 0
+        for loc, rec in man["locations"].items():
+            if location is not None and loc != location:
+                continue
+            for mon, entry in rec["partitions"].items():
+                if len(entry["parts"]) <= 1:
+                    continue
+                df = self._read_partition(loc, mon, entry)
+                d = self._part_dir(loc, mon)
+                name = f"part-{_stamp()}.parquet"
+                df.to_parquet(d / name, index=False)
+                stale.extend(d / p for p in entry["parts"])
+                entry["parts"], entry["rows"] = [name], len(df)
+                n += 1
+        if n:
+            # Manifest first: a crash before cleanup only leaves unreferenced files.
+            self._save_manifest(man)
+            for p in stale:
+                p.unlink(missing_ok=True)
+        return n
+
+    # ---------- Read ----------
+    def iter_read(self, locations: Optional[Iterable[str]] = None, start=None, end=None,
+                  columns: Optional[Sequence[str]] = None) -> Iterator[pd.DataFrame]:
+        """
+        Yield one frame per (location, month) partition, in (location, time) order,
+        holding rows with start <= time < end. Only overlapping months are opened.
+        """
+        t0, t1 = _to_utc(start), _to_utc(end)
+        m0 = t0.strftime("%Y-%m") if t0 is not None else None
+        m1 = t1.strftime("%Y-%m") if t1 is not None else None
+        cols = None if columns is None else ["time", *[c for c in columns if c not in KEY]]
+
+        man = self.manifest()["locations"]
+        for loc in (sorted(man) if locations is None else locations):
+            rec = man.get(loc)
+            if not rec:
+                continue
+            for mon in sorted(rec["partitions"]):
+                if (m0 and mon < m0) or (m1 and mon > m1):
+                    continue
+                df = self._read_partition(loc, mon, rec["partitions"][mon], columns=cols)
+                mask = np.ones(len(df), dtype=bool)
+                if t0 is not None:
+                    mask &= (df["time"] >= t0).to_numpy()
+                if t1 is not None:
+                    mask &= (df["time"] < t1).to_numpy()
+                df = df.loc[mask] if not mask.all() else df
+                if len(df):
+                    df.insert(0, "location", loc)
+                    yield df.reset_index(drop=True)
+
+    def read(self, locations: Optional[Iterable[str]] = None, start=None, end=None,
+             columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Hourly rows for `locations` (default: all) with start <= time < end."""
+        frames = list(self.iter_read(locations, start, end, columns))
+        if not frames:
+            return pd.DataFrame(columns=["location", "time"])
+        return pd.concat(frames, ignore_index=True)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Inspect, compact or import into the partitioned raw store.")
+    ap.add_argument("--root", type=str, default=str(STORE))
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("info", help="List locations, partitions and row counts.")
+    c = sub.add_parser("compact", help="Merge each partition's parts into one file.")
+    c.add_argument("--location", type=str, default=None)
+    i = sub.add_parser("import-csv", help="Upsert legacy weather_hourly_*.csv snapshots.")
+    i.add_argument("files", nargs="+")
+    i.add_argument("--location", type=str, required=True)
+    args = ap.parse_args()
+
+    store = RawStore(args.root)
+    if args.cmd == "info":
+        for loc, rec in sorted(store.manifest()["locations"].items()):
+            rows = sum(e["rows"] for e in rec["partitions"].values())
+            parts = sum(len(e["parts"]) for e in rec["partitions"].values())
+            print(f"{loc}: {len(rec['partitions'])} months, {parts} parts, {rows} rows, latest={rec['latest']}")
+    elif args.cmd == "compact":
+        print(f"[store] Compacted {store.compact(args.location)} partition(s)")
+    elif args.cmd == "import-csv":
+        for f in args.files:
+            stats = store.upsert(pd.read_csv(f).assign(location=args.location))
+            print(f"[store] {f}: {stats['rows_written']} written ({stats['rows_new']} new)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# src/streaming.py
+"""
+Chunked build path for hourly inputs larger than RAM.
+
+Hourly chunks (time-ordered, one location) are folded into per-day accumulators;
+completed days flow into a feature stream that carries just enough trailing rows
+to continue lags, rolling windows and next-day targets across chunk boundaries.
+Output rows match the in-memory build (up to float summation order on days that
+straddle a chunk boundary).
+"""
+from __future__ import annotations
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+from .features_weather import aggregate_daily, add_features, add_target
+
+# partial per-day state; mean is finalised as t_sum / t_n
+PARTIAL_SPEC = {
+    "t_max": ("temperature_2m", "max"),
+    "t_min": ("temperature_2m", "min"),
+    "t_sum": ("temperature_2m", "sum"),
+    "t_n": ("temperature_2m", "count"),
+    "p_sum": ("precipitation", "sum"),
+}
+_MERGE = {"t_max": "max", "t_min": "min", "t_sum": "sum", "t_n": "sum", "p_sum": "sum"}
+
+def iter_hourly_csv(path: Path | str, chunksize: int = 500_000, since=None) -> Iterator[pd.DataFrame]:
+    """Hourly CSV chunks with UTC `time`; with `since`, earlier rows are dropped per chunk
+    (a chunk can come out empty), so at most one chunk of old rows is held at a time."""
+    if since is not None:
+        since = pd.Timestamp(since)
+        since = since.tz_localize("UTC") if since.tz is None else since
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        chunk["time"] = pd.to_datetime(chunk["time"], utc=True, errors="coerce")
+        if since is not None:
+            chunk = chunk[chunk["time"] >= since]
+        yield chunk
+
+def _finalize(part: pd.DataFrame) -> pd.DataFrame:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(part["t_n"] > 0, part["t_sum"] / part["t_n"], np.nan)
+    return pd.DataFrame({
+        "date": part["date"].to_numpy(),
+        "temp_max_c": part["t_max"].to_numpy(),
+        "temp_min_c": part["t_min"].to_numpy(),
+        "temp_mean_c": mean,
+        "precip_mm": part["p_sum"].to_numpy(),
+    })
+
+
+class DailyAccumulator:
+    """Folds hourly chunks into daily rows; the last (possibly incomplete) day stays open."""
+    def __init__(self, tz: Optional[str] = "America/New_York"):
+        self.tz = tz
+        self.open: Optional[pd.DataFrame] = None
+
+    def push(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        part = aggregate_daily(chunk, tz=self.tz, spec=PARTIAL_SPEC, fill_gaps=True)
+        if part.empty:
+            return _finalize(part)
+        if self.open is not None:
+            if part["date"].iloc[0] < self.open["date"].iloc[0]:
+                raise ValueError("streaming requires hourly input ordered by time")
+            part = pd.concat([self.open, part], ignore_index=True)
+            part = part.groupby("date", sort=True).agg(_MERGE)
+            # fill any whole days missing between the open day and this chunk
+            full = pd.date_range(part.index[0], part.index[-1], freq="D")
+            if len(full) != len(part):
+                part = part.reindex(full).fillna({"t_sum": 0.0, "t_n": 0.0, "p_sum": 0.0})
+            part = part.rename_axis("date").reset_index()
+        self.open = part.iloc[[-1]].reset_index(drop=True)
+        return _finalize(part.iloc[:-1])
+
+    def flush(self) -> pd.DataFrame:
+        out = _finalize(self.open) if self.open is not None else _finalize(pd.DataFrame(columns=["date", *PARTIAL_SPEC]))
+        self.open = None
+        return out
+
+
+class FeatureStream:
+    """
+    Incremental add_features + add_target over consecutive daily batches.
+
+    Keeps the last `back` daily rows as context (max lag, longest window - 1) plus
+    the `horizon` newest rows whose next-day target is not known yet.
+    """
+    horizon = 1
+
+    def __init__(self, task: str, lags: Sequence[int] = (1, 2, 3), windows: Sequence[int] = (3, 7, 14)):
+        self.task, self.lags, self.windows = task, list(lags), list(windows)
+        self.back = max(max(self.lags, default=0), max(self.windows, default=1) - 1)
+        self.buf: Optional[pd.DataFrame] = None
+        self.pending = 0
+
+    def _features(self, ctx: pd.DataFrame) -> pd.DataFrame:
+        return add_target(add_features(ctx, lags=self.lags, windows=self.windows), self.task)
+
+    def push(self, daily: pd.DataFrame) -> pd.DataFrame:
+        if daily.empty and self.buf is None:
+            return daily
+        ctx = daily if self.buf is None else pd.concat([self.buf, daily], ignore_index=True)
+        start = 0 if self.buf is None else len(self.buf) - self.pending
+        stop = max(len(ctx) - self.horizon, start)
+        out = self._features(ctx).iloc[start:stop]
+        self.pending = len(ctx) - stop
+        self.buf = ctx.iloc[max(len(ctx) - self.back - self.pending, 0):].reset_index(drop=True)
+        return out
+
+    def flush(self) -> pd.DataFrame:
+        if self.buf is None or not self.pending:
+            return pd.DataFrame()
+        out = self._features(self.buf).iloc[len(self.buf) - self.pending:]
+        self.pending = 0
+        return out
+
+
+def build_streaming(chunks: Iterable[pd.DataFrame], task: str, tz: Optional[str] = "America/New_York",
+                    lags: Sequence[int] = (1, 2, 3), windows: Sequence[int] = (3, 7, 14)) -> pd.DataFrame:
+    """Stream hourly chunks to the final (NaN-free) supervised frame."""
+    acc = DailyAccumulator(tz)
+    feats = FeatureStream(task, lags, windows)
+    parts = []
+    for chunk in chunks:
+        parts.append(feats.push(acc.push(chunk)).dropna())
+    parts.append(feats.push(acc.flush()).dropna())
+    parts.append(feats.flush().dropna())
+    parts = [p for p in parts if len(p)]
+    if not parts:
+        return pd.DataFrame()
+    return pd.concat(parts, ignore_index=True)
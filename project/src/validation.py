@@ -0,0 +1,17 @@
+from __future__ import annotations
+import pandas as pd
+
+REQUIRED_HOURLY = ("time", "temperature_2m", "precipitation")
+
+def validate_weather_df(df: pd.DataFrame, required=REQUIRED_HOURLY) -> None:
+    """Raise ValueError if the hourly frame is empty, lacks columns, or has non-numeric measures."""
+    if df.empty:
+        raise ValueError("hourly frame is empty")
+    missing = [c for c in required if c not in df.columns]
+    if missing:
+        raise ValueError(f"missing columns: {missing}")
+    for c in required:
+        if c != "time" and not pd.api.types.is_numeric_dtype(df[c]):
+            raise ValueError(f"column '{c}' must be numeric")
+    if df["time"].isna().all():
+        raise ValueError("no parseable timestamps in 'time'")
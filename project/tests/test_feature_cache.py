@@ -0,0 +1,26 @@
+import pandas as pd
+import pytest
+
+from src.feature_cache import FeatureCache
+
+
+@pytest.mark.parametrize("damage", [
+    lambda b: b[:len(b) // 2],                # truncated write: ArrowInvalid
+    lambda b: b[:-12] + b"\0" * 8 + b"PAR1",  # corrupt footer: OSError
+    lambda b: b"",
+])
+def test_corrupt_entry_is_a_miss_and_removed(tmp_path, damage):
+    cache = FeatureCache(tmp_path)
+    df = pd.DataFrame({"a": range(100), "b": [0.5] * 100})
+    p = cache.put("features-x", df)
+    pd.testing.assert_frame_equal(cache.get("features-x"), df)
+
+    p.write_bytes(damage(p.read_bytes()))
+    assert cache.get("features-x") is None
+    assert not p.exists()
+    cache.put("features-x", df)
+    pd.testing.assert_frame_equal(cache.get("features-x"), df)
+
+
+def test_missing_entry_is_a_miss(tmp_path):
+    assert FeatureCache(tmp_path).get("nope") is None
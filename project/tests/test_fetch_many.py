@@ -0,0 +1,70 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+import requests
+
+from src.bench.mock_api import MockOpenMeteo, hourly_values
+from src.http_cache import HTTP_CACHE
+from src.ingest_open_meteo import fetch_many
+
+
+@pytest.fixture(autouse=True)
+def no_http_cache(monkeypatch):
+    monkeypatch.setattr(HTTP_CACHE, "mode", "off")  # every call must reach the stub
+
+
+def _locations(n=7):
+    return pd.DataFrame({"location": [f"site{i:02d}" for i in range(n)],
+                         "latitude": 30.0 + np.arange(n) * 0.5, "longitude": -100.0 + np.arange(n)})
+
+
+def test_batches_coordinates_into_multi_location_requests():
+    locs = _locations()
+    with MockOpenMeteo() as api:
+        df, stats = fetch_many(locs, timezone="GMT", forecast_days=2, workers=2, batch_size=3,
+                               url=api.url("forecast"))
+        calls = api.calls
+    assert calls == stats["requests"] == 3  # 3 + 3 + 1 coordinates
+    assert stats["locations"] == 7 and stats["rows"] == len(df) == 7 * 48
+    assert list(df.columns) == ["location", "time", "temperature_2m", "precipitation"]
+    today = np.datetime64(dt.datetime.now(dt.timezone.utc).date())
+    for _, loc in locs.iterrows():
+        site = df[df["location"] == loc["location"]]
+        want = hourly_values(loc["latitude"], loc["longitude"], today, 48)
+        assert site["time"].iloc[0] == pd.Timestamp(str(today), tz="UTC")
+        np.testing.assert_array_equal(site["temperature_2m"].to_numpy(), want["temperature_2m"])
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_failed_requests_are_retried(status):
+    locs = _locations()
+    with MockOpenMeteo(fail_every=2, fail_status=status) as api:
+        df, stats = fetch_many(locs, timezone="GMT", forecast_days=1, workers=1, batch_size=3,
+                               retries=3, backoff=0.01, url=api.url("forecast"))
+        calls = api.calls
+    # calls 2 and 4 fail and are retried, so the 3 batches take 5 calls and lose nothing
+    assert calls == 5
+    assert stats["requests"] == 3 and len(df) == 7 * 24
+    assert df.groupby("location", observed=True).size().eq(24).all()
+
+
+def test_gives_up_after_retries():
+    with MockOpenMeteo(fail_every=1) as api:
+        with pytest.raises(requests.HTTPError):
+            fetch_many(_locations(2), timezone="GMT", forecast_days=1, retries=2, backoff=0.01,
+                       url=api.url("forecast"))
+        assert api.calls == 3  # first try + 2 retries
+
+
+def test_stats_report_wall_time_and_request_rate():
+    latency = 0.05
+    with MockOpenMeteo(latency=latency) as api:
+        _, stats = fetch_many(_locations(), timezone="GMT", forecast_days=1, workers=4, per_host=1,
+                              batch_size=2, url=api.url("forecast"))
+    # per_host=1 serializes the 4 requests, each at least `latency`
+    assert stats["requests"] == 4
+    assert stats["wall_s"] >= 4 * latency
+    assert stats["req_per_s"] == pytest.approx(stats["requests"] / stats["wall_s"], rel=0.02)
+    assert stats["req_per_s"] <= 1 / latency
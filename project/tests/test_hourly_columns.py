@@ -0,0 +1,40 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.bench.mock_api import hourly_values
+from src.bench.parse import irregular_bodies, legacy_parse
+from src.hourly_columns import hourly_frame
+
+
+def _location(lat, lon, utc_offset, offset_first):
+    h = hourly_values(lat, lon, np.datetime64("2024-03-01"), 48)
+    meta = {"latitude": lat, "longitude": lon, "utc_offset_seconds": utc_offset,
+            "timezone": "x", "timezone_abbreviation": "x"}
+    units = {"hourly_units": {"time": "iso8601", "temperature_2m": "°C"}}
+    return {**meta, **units, "hourly": h} if offset_first else {**units, "hourly": h, **meta}
+
+
+@pytest.mark.parametrize("offset_first", [True, False])
+@pytest.mark.parametrize("many", [True, False])
+def test_utc_offset_found_in_any_key_order(offset_first, many):
+    locs = [_location(40.7, -74.0, -5 * 3600, offset_first), _location(48.9, 2.35, 3600, offset_first)]
+    js = locs if many else locs[0]
+    body = json.dumps(js).encode()
+    want = hourly_frame(js)
+    pd.testing.assert_frame_equal(hourly_frame(body), want)
+    local = pd.to_datetime(locs[0]["hourly"]["time"][:1]).tz_localize("UTC")
+    assert want["time"].iloc[0] == local[0] + pd.Timedelta(hours=5)
+    if many:
+        second = want["time"].iloc[48] - pd.to_datetime(locs[1]["hourly"]["time"][0]).tz_localize("UTC")
+        assert second == pd.Timedelta(hours=-1)
+
+
+@pytest.mark.parametrize("name", list(irregular_bodies()))
+def test_irregular_stamps_match_legacy(name):
+    body = irregular_bodies()[name]
+    want = legacy_parse(body, ["x"]).drop(columns="location")
+    pd.testing.assert_frame_equal(hourly_frame(body), want)
+    pd.testing.assert_frame_equal(hourly_frame(json.loads(body)), want)
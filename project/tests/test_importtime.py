@@ -0,0 +1,30 @@
+import os
+
+import pytest
+
+from src.bench.importtime import BUDGETS, measure_command, parse_importtime
+
+# slow CI machines can scale every budget, like `python -m src.bench.importtime --scale`
+SCALE = float(os.getenv("IMPORTTIME_SCALE", "1.0"))
+
+
+def test_parse_importtime_counts_top_level_project_imports():
+    stderr = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       100 |        100 |   numpy.core",
+        "import time:       200 |       5000 | numpy",
+        "import time:       300 |       2000 |   src.paths",
+        "import time:       400 |       3000 | src",
+        "import time:       500 |       1500 | src.cli",
+    ])
+    ms, names = parse_importtime(stderr)
+    assert ms == pytest.approx(4.5)
+    assert names == {"numpy", "src"}
+
+
+@pytest.mark.parametrize("command", list(BUDGETS))
+def test_command_import_budget(command):
+    module, budget, forbidden = BUDGETS[command]
+    ms, loaded = measure_command(module, repeat=3)
+    assert not forbidden & loaded, f"{command} imports {sorted(forbidden & loaded)} at startup"
+    assert ms <= budget * SCALE, f"{command}: {ms:.1f} ms over {budget * SCALE:.0f} ms budget"
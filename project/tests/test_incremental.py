@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+
+from src.bench.synth import hourly_weather
+from src.features_weather import add_features, resample_hourly_to_daily
+from src.incremental_features import IncrementalFeatures
+
+
+@pytest.fixture(scope="module")
+def daily():
+    hourly = hourly_weather(3, 0.4, missing_rate=0.01)
+    return resample_hourly_to_daily(hourly, by="location")
+
+
+def one_site(daily, name=None):
+    name = daily["location"].iloc[0] if name is None else name
+    return daily[daily["location"] == name].drop(columns="location").reset_index(drop=True)
+
+
+@pytest.mark.parametrize("lags,windows", [((1, 2, 3), (3, 7, 14)), ((1, 7), (2, 30))])
+def test_day_by_day_matches_full_recompute(daily, lags, windows):
+    site = one_site(daily)
+    assert len(site) > 100
+    full = add_features(site, lags=lags, windows=windows)
+    inc = IncrementalFeatures(lags, windows)
+    split = len(site) - 60
+    parts = [inc.update(site.iloc[:split])]
+    parts += [inc.update(site.iloc[i:i + 1]) for i in range(split, len(site))]
+    pd.testing.assert_frame_equal(pd.concat(parts, ignore_index=True), full, rtol=1e-9)
+
+
+def test_saved_state_resumes(daily, tmp_path):
+    site = one_site(daily)
+    full = add_features(site)
+    inc = IncrementalFeatures()
+    head = inc.update(site.iloc[:100])
+    inc.save(tmp_path / "state.json")
+    tail = IncrementalFeatures.load(tmp_path / "state.json").update(site.iloc[100:])
+    pd.testing.assert_frame_equal(pd.concat([head, tail], ignore_index=True), full, rtol=1e-9)
+
+
+def test_per_location_state(daily):
+    inc = IncrementalFeatures()
+    first = daily.groupby("location", observed=True).head(50)
+    rest = daily.drop(first.index)
+    got = pd.concat([inc.update(first, by="location"), inc.update(rest, by="location")], ignore_index=True)
+    for name in daily["location"].unique():
+        want = add_features(one_site(daily, name))
+        mine = got[got["location"] == name].drop(columns="location").reset_index(drop=True)
+        pd.testing.assert_frame_equal(mine, want, rtol=1e-9)
+
+
+def test_gap_is_rejected(daily):
+    site = one_site(daily)
+    inc = IncrementalFeatures()
+    inc.update(site.iloc[:10])
+    with pytest.raises(ValueError):
+        inc.update(site.iloc[11:12])
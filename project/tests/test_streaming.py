@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.bench.synth import hourly_weather
+from src.features_weather import TASKS, add_features, add_target, resample_hourly_to_daily
+from src.io_utils import read_csv_dt
+from src.streaming import build_streaming, iter_hourly_csv
+
+
+@pytest.fixture(scope="module")
+def hourly_csv(tmp_path_factory):
+    path = tmp_path_factory.mktemp("raw") / "hourly.csv"
+    hourly_weather(1, 0.5, missing_rate=0.02).drop(columns="location").to_csv(path, index=False)
+    return path
+
+
+def in_memory(path, task, tz):
+    daily = resample_hourly_to_daily(read_csv_dt(path), tz=tz)
+    return add_target(add_features(daily), task).dropna().reset_index(drop=True)
+
+
+@pytest.mark.parametrize("task", TASKS)
+@pytest.mark.parametrize("chunksize", [37, 1000, 24 * 365])
+def test_streamed_matches_in_memory(hourly_csv, task, chunksize):
+    tz = "America/New_York"
+    want = in_memory(hourly_csv, task, tz)
+    got = build_streaming(iter_hourly_csv(hourly_csv, chunksize), task, tz=tz)
+    assert len(got) > 100
+    pd.testing.assert_frame_equal(got, want)
+
+
+def test_streamed_custom_lags_windows_utc(hourly_csv):
+    task = TASKS[0]
+    daily = resample_hourly_to_daily(read_csv_dt(hourly_csv), tz=None)
+    want = add_target(add_features(daily, lags=[1, 5], windows=[2, 10]), task).dropna().reset_index(drop=True)
+    got = build_streaming(iter_hourly_csv(hourly_csv, 500), task, tz=None, lags=[1, 5], windows=[2, 10])
+    pd.testing.assert_frame_equal(got, want)
+
+
+def test_empty_input():
+    empty = pd.DataFrame({"time": pd.Series([], dtype="datetime64[ns, UTC]"),
+                          "temperature_2m": np.array([]), "precipitation": np.array([])})
+    assert build_streaming(iter([empty]), TASKS[0]).empty